@@ -0,0 +1,176 @@
+"""Pagamentos mensais fora do padrão de cada servidor.
+
+Monta uma matriz servidor x mês com o total de proventos (somando os
+tipos de pagamento escolhidos) e compara cada mês com os meses vizinhos
+do próprio servidor: a referência é a mediana da janela centrada no mês
+(sem o próprio mês) e a escala é o desvio absoluto mediano (MAD). O
+z-score robusto
+
+    z = (valor - mediana) / (1,4826 * MAD)
+
+é calculado para a matriz inteira de uma vez (janelas deslizantes do
+NumPy), sem laços por servidor. Meses sem pagamento não são comparados
+(admissões e desligamentos não viram anomalia).
+
+Também são marcados os meses com mais de uma linha de `folha_mensal` para
+o mesmo servidor. Cada anomalia traz os tipos de pagamento do mês, o que
+explica a maioria dos picos (rescisão, 13º, folha complementar).
+
+Para várias bases, concatene-as com uma coluna `ano`: os meses passam a
+ser a sequência (ano, mês).
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# meses de cada lado na janela de referência
+MEIA_JANELA = 3
+
+# |z| a partir do qual um mês é anômalo
+LIMIAR_Z = 3.5
+
+# escala mínima (fração da mediana e valor em reais): salários constantes têm MAD zero
+ESCALA_MINIMA = 0.10
+ESCALA_MINIMA_REAIS = 100.0
+
+# tipos de pagamento que não entram na composição exibida (sempre presentes)
+TIPOS_RECORRENTES = {"folha_mensal", "vale_alimentacao"}
+
+# 13º: picos esperados em todos os servidores, fora da análise padrão do painel
+TIPOS_13_SALARIO = {"adiantamento_13_salario", "fechamento_13_salario"}
+
+
+def tipos_pagamento(df: pd.DataFrame) -> list[str]:
+    return sorted(df["tipo_pagamento"].dropna().unique().tolist())
+
+
+def tipos_padrao(tipos: list[str]) -> tuple[str, ...]:
+    """Tipos analisados por padrão no painel (todos, menos o 13º)."""
+    return tuple(sorted(t for t in tipos if t not in TIPOS_13_SALARIO))
+
+
+def matriz_mensal(df: pd.DataFrame, tipos: list[str] | None = None) -> dict:
+    """Totais de proventos e linhas de folha mensal por servidor (linhas) x mês (colunas)."""
+    base = df if tipos is None else df[df["tipo_pagamento"].isin(tipos)]
+
+    mes = base["mes"].cat.codes.to_numpy(dtype=np.int64)
+    n_meses = len(base["mes"].cat.categories)
+    if "ano" in base.columns:
+        anos = np.sort(base["ano"].unique())
+        periodo = np.searchsorted(anos, base["ano"].to_numpy()) * n_meses + mes
+        rotulos = [f"{m}/{a}" for a in anos for m in base["mes"].cat.categories]
+    else:
+        periodo = mes
+        rotulos = list(base["mes"].cat.categories)
+
+    servidor, ids = pd.factorize(base["id_servidor"])
+    n_periodos = len(rotulos)
+    celula = servidor * n_periodos + periodo
+    tamanho = len(ids) * n_periodos
+
+    total = np.bincount(celula, weights=base["proventos"].fillna(0).to_numpy(), minlength=tamanho)
+    linhas = np.bincount(celula, minlength=tamanho)
+    folha = np.bincount(
+        celula, weights=(base["tipo_pagamento"] == "folha_mensal").to_numpy(dtype=float), minlength=tamanho
+    )
+
+    total = total.reshape(len(ids), n_periodos)
+    # mês sem nenhuma linha do servidor: sem pagamento (não é um zero)
+    total[linhas.reshape(len(ids), n_periodos) == 0] = np.nan
+
+    return {
+        "ids": np.asarray(ids),
+        "periodos": rotulos,
+        "total": total,
+        "linhas_folha": folha.reshape(len(ids), n_periodos).astype(np.int64),
+    }
+
+
+def z_robusto(total: np.ndarray, meia_janela: int = MEIA_JANELA) -> tuple[np.ndarray, np.ndarray]:
+    """Mediana dos vizinhos e z-score robusto de cada célula (NaN sem vizinhos suficientes)."""
+    n, p = total.shape
+    preenchido = np.full((n, p + 2 * meia_janela), np.nan)
+    preenchido[:, meia_janela:meia_janela + p] = total
+
+    # (servidor, mês, posição na janela); a posição central é o próprio mês
+    janelas = sliding_window_view(preenchido, 2 * meia_janela + 1, axis=1).copy()
+    janelas[:, :, meia_janela] = np.nan
+
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        # nanmedian avisa ("All-NaN slice") nas janelas sem nenhum pagamento
+        warnings.simplefilter("ignore", RuntimeWarning)
+        vizinhos = np.sum(~np.isnan(janelas), axis=2)
+        referencia = np.nanmedian(janelas, axis=2)
+        mad = np.nanmedian(np.abs(janelas - referencia[:, :, None]), axis=2)
+
+        escala = np.maximum(1.4826 * mad, ESCALA_MINIMA * np.abs(referencia))
+        escala = np.maximum(escala, ESCALA_MINIMA_REAIS)
+        z = (total - referencia) / escala
+
+    # com menos de dois vizinhos não há referência confiável
+    z[vizinhos < 2] = np.nan
+    return referencia, z
+
+
+def anomalias_mensais(
+    df: pd.DataFrame,
+    tipos: tuple[str, ...] | None = None,
+    limiar: float = LIMIAR_Z,
+    meia_janela: int = MEIA_JANELA,
+) -> pd.DataFrame:
+    """Meses anômalos (|z| >= limiar) ou com folha mensal duplicada, do mais ao menos extremo."""
+    base = df if tipos is None else df[df["tipo_pagamento"].isin(tipos)]
+    matriz = matriz_mensal(base)
+    total = matriz["total"]
+    referencia, z = z_robusto(total, meia_janela)
+
+    duplicada = matriz["linhas_folha"] > 1
+    with np.errstate(invalid="ignore"):
+        marcada = (np.abs(z) >= limiar) | duplicada
+    servidor, periodo = np.nonzero(marcada)
+
+    anomalias = pd.DataFrame({
+        "id_servidor": matriz["ids"][servidor],
+        "mes": np.asarray(matriz["periodos"])[periodo],
+        "valor": total[servidor, periodo],
+        "referencia": referencia[servidor, periodo],
+        "z": z[servidor, periodo],
+        "folha_duplicada": duplicada[servidor, periodo],
+    })
+    anomalias["desvio"] = anomalias["valor"] - anomalias["referencia"]
+
+    # composição e dados cadastrais só para as células marcadas
+    cadastro = base.drop_duplicates(subset="id_servidor").set_index("id_servidor")[["cargo", "categoria_cargo"]]
+    anomalias = anomalias.join(cadastro, on="id_servidor")
+    anomalias["tipos_pagamento"] = _composicao(base, anomalias)
+
+    return (
+        anomalias
+        .assign(pontuacao=lambda d: d["z"].abs().fillna(0))
+        .sort_values(["pontuacao", "folha_duplicada"], ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def _composicao(df: pd.DataFrame, anomalias: pd.DataFrame) -> pd.Series:
+    """Tipos de pagamento não recorrentes de cada (servidor, mês) marcado."""
+    if anomalias.empty:
+        return pd.Series([], dtype="object")
+
+    base = df.assign(
+        mes=df["mes"].astype(str) + ("/" + df["ano"].astype(str) if "ano" in df.columns else "")
+    )
+    chaves = anomalias[["id_servidor", "mes"]].drop_duplicates()
+    extras = (
+        base[~base["tipo_pagamento"].isin(TIPOS_RECORRENTES)]
+        .merge(chaves, on=["id_servidor", "mes"])
+        .groupby(["id_servidor", "mes"])["tipo_pagamento"]
+        .agg(lambda t: ", ".join(sorted(set(t))))
+    )
+    return (
+        anomalias
+        .join(extras, on=["id_servidor", "mes"])["tipo_pagamento"]
+        .fillna("")
+    )
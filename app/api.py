@@ -0,0 +1,254 @@
+"""API HTTP local com os agregados do painel em JSON.
+
+Servidor assíncrono (asyncio, só biblioteca padrão) que expõe os mesmos
+agregados exibidos no painel, para integração com outros sistemas da
+prefeitura:
+
+    GET /categorias/custo      custo anual por categoria de cargo
+    GET /genero                servidores por gênero
+    GET /comissionados         cargos comissionados, salários e quantidades
+    GET /carga-horaria         servidores por carga horária e categoria
+    GET /desligamentos         desligamentos do ano por categoria
+
+Os agregados vêm do registro de bases (`registro.py`), os mesmos derivados
+do painel: a API divide com ele o orçamento de memória e o cache em disco,
+e serve a base padrão do catálogo (o ano de `/desligamentos` é o da base).
+
+Cada resposta carrega um ETag forte derivado do fingerprint da base e da
+versão do código (`cache_disco.versao_codigo`): um deploy que muda um
+cálculo invalida os ETags antigos. Clientes que reenviam o ETag em
+`If-None-Match` recebem `304 Not Modified` sem que nada seja recalculado;
+os agregados só são recomputados quando o arquivo de dados ou o código
+muda. O ETag de uma resposta 200 é o do mesmo estado da base usado para
+montar o corpo.
+
+Uso (a partir da raiz do repositório):
+
+    python app/api.py --porta 8502
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import time
+from email.utils import formatdate
+from http import HTTPStatus
+
+import pandas as pd
+
+import secoes
+from cache_disco import versao_codigo
+from dados import fingerprint_dataset
+from registro import Dataset, RegistroDatasets, registro_global
+
+VERSAO_API = "1"
+
+# intervalo mínimo (s) entre verificações do fingerprint da base
+INTERVALO_FINGERPRINT = 5.0
+
+
+# cada rota recebe `derivado(funcao, *args)` (derivado da base no registro) e a base
+def _comissionados(derivado, dataset: Dataset) -> dict:
+    salarios = derivado(secoes.comissionados_salarios)
+    return {
+        "total_comissionados": salarios["total_comissionados"],
+        "somente_rescisao": salarios["somente_rescisao"],
+        "genero": derivado(secoes.comissionados_genero),
+        "gasto_anual": derivado(secoes.gasto_comissionados),
+        "cargos": salarios["tabela"],
+    }
+
+
+def _desligamentos(derivado, dataset: Dataset) -> dict:
+    # o derivado é compartilhado com o painel: um dict novo em vez de alterá-lo
+    return {**derivado(secoes.desligamentos, dataset.ano), "ano": dataset.ano}
+
+
+ROTAS = {
+    "/categorias/custo": lambda derivado, dataset: derivado(secoes.custo_por_categoria),
+    "/genero": lambda derivado, dataset: derivado(secoes.contagem_genero),
+    "/comissionados": _comissionados,
+    "/carga-horaria": lambda derivado, dataset: derivado(secoes.carga_horaria_categorias),
+    "/desligamentos": _desligamentos,
+}
+
+
+def _para_json(valor):
+    if isinstance(valor, pd.DataFrame):
+        return [
+            {k: _para_json(v) for k, v in registro.items()}
+            for registro in valor.to_dict(orient="records")
+        ]
+    if isinstance(valor, dict):
+        return {k: _para_json(v) for k, v in valor.items()}
+    if valor is pd.NA or valor is None:
+        return None
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    if hasattr(valor, "item"):  # escalares numpy
+        return valor.item()
+    return valor
+
+
+def etag_para(fingerprint: str, rota: str) -> str:
+    # versão do código de api.py e dos módulos de app/ que ele importa (secoes.py...)
+    chave = f"{VERSAO_API}:{versao_codigo(etag_para)}:{fingerprint}:{rota}"
+    return '"' + hashlib.sha1(chave.encode("utf-8")).hexdigest() + '"'
+
+
+class CacheAgregados:
+    """Agregados serializados (ETag e corpo), válidos para um fingerprint da base."""
+
+    def __init__(self, registro: RegistroDatasets | None = None, chave: str | None = None):
+        self.registro = registro or registro_global()
+        self.dataset = self.registro.dataset(chave or self.registro.padrao.chave)
+        self.fingerprint = None
+        self._verificado_em = 0.0
+        # fingerprint -> rota -> (ETag, corpo)
+        self._respostas: dict[str, dict[str, tuple[str, bytes]]] = {}
+        self._lock = asyncio.Lock()
+
+    def fingerprint_atual(self) -> str:
+        agora = time.monotonic()
+        if self.fingerprint is None or agora - self._verificado_em >= INTERVALO_FINGERPRINT:
+            self.fingerprint = fingerprint_dataset(self.dataset.path)
+            self._verificado_em = agora
+        return self.fingerprint
+
+    def etag(self, rota: str) -> str:
+        """ETag do estado atual da base (validação de GET condicional, sem calcular nada)."""
+        return etag_para(self.fingerprint_atual(), rota)
+
+    def _calcular_todas(self) -> tuple[str, dict[str, tuple[str, bytes]]]:
+        """Fingerprint e respostas de todas as rotas, do mesmo estado da base."""
+        chave = self.dataset.chave
+
+        def derivado(funcao, *args):
+            return self.registro.derivado(chave, funcao.__name__, funcao, *args)
+
+        while True:
+            antes = fingerprint_dataset(self.dataset.path)
+            corpos = {
+                rota: json.dumps(_para_json(funcao(derivado, self.dataset)), ensure_ascii=False).encode("utf-8")
+                for rota, funcao in ROTAS.items()
+            }
+            # arquivo trocado durante o cálculo: o registro pode ter lido a versão nova
+            if fingerprint_dataset(self.dataset.path) == antes:
+                return antes, {rota: (etag_para(antes, rota), corpo) for rota, corpo in corpos.items()}
+
+    async def resposta(self, rota: str) -> tuple[str, bytes]:
+        """ETag e corpo da rota, montados a partir do mesmo fingerprint."""
+        respostas = self._respostas.get(self.fingerprint_atual())
+        if respostas is None:
+            async with self._lock:
+                respostas = self._respostas.get(self.fingerprint_atual())
+                if respostas is None:
+                    # agregações fora do event loop
+                    fingerprint, respostas = await asyncio.to_thread(self._calcular_todas)
+                    # só as respostas da versão mais recente ficam guardadas
+                    self._respostas = {fingerprint: respostas}
+        return respostas[rota]
+
+
+class ServidorAPI:
+    def __init__(self, cache: CacheAgregados | None = None):
+        self.cache = cache or CacheAgregados()
+
+    async def _responder(self, writer, status: HTTPStatus, cabecalhos: dict, corpo: bytes = b""):
+        linhas = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        cabecalhos = {
+            "Date": formatdate(usegmt=True),
+            "Content-Length": str(len(corpo)),
+            "Connection": "close",
+            **cabecalhos,
+        }
+        linhas += [f"{k}: {v}" for k, v in cabecalhos.items()]
+        writer.write(("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo)
+        await writer.drain()
+
+    async def _erro(self, writer, status: HTTPStatus):
+        corpo = json.dumps({"erro": status.phrase}).encode("utf-8")
+        await self._responder(writer, status, {"Content-Type": "application/json"}, corpo)
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            linha = (await reader.readline()).decode("latin-1").strip()
+            cabecalhos = {}
+            while True:
+                cabecalho = (await reader.readline()).decode("latin-1").strip()
+                if not cabecalho:
+                    break
+                nome, _, valor = cabecalho.partition(":")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+            partes = linha.split()
+            if len(partes) != 3:
+                await self._erro(writer, HTTPStatus.BAD_REQUEST)
+                return
+
+            metodo, alvo, _ = partes
+            rota = alvo.split("?", 1)[0].rstrip("/") or "/"
+
+            if metodo not in ("GET", "HEAD"):
+                await self._erro(writer, HTTPStatus.METHOD_NOT_ALLOWED)
+                return
+
+            if rota == "/":
+                corpo = json.dumps({"rotas": sorted(ROTAS)}).encode("utf-8")
+                await self._responder(writer, HTTPStatus.OK, {"Content-Type": "application/json"}, corpo)
+                return
+
+            if rota not in ROTAS:
+                await self._erro(writer, HTTPStatus.NOT_FOUND)
+                return
+
+            etag = self.cache.etag(rota)
+            comuns = {
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "Access-Control-Allow-Origin": "*",
+            }
+
+            # GET condicional: valida só com o fingerprint, sem recalcular nada
+            if_none_match = cabecalhos.get("if-none-match", "")
+            if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match == "*":
+                await self._responder(writer, HTTPStatus.NOT_MODIFIED, comuns)
+                return
+
+            # ETag do estado da base que gerou o corpo (pode ser mais novo que o validado acima)
+            comuns["ETag"], corpo = await self.cache.resposta(rota)
+            comuns["Content-Type"] = "application/json; charset=utf-8"
+            if metodo == "HEAD":
+                comuns["Content-Length"] = str(len(corpo))
+                corpo = b""
+            await self._responder(writer, HTTPStatus.OK, comuns, corpo)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host: str, porta: int):
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        print(f"API de agregados em http://{host}:{porta}/")
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8502)
+    args = parser.parse_args()
+
+    # derivados compartilhados no registro: copy-on-write, como no painel
+    pd.set_option("mode.copy_on_write", True)
+
+    try:
+        asyncio.run(ServidorAPI().servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
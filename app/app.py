@@ -1,7 +1,38 @@
 import pandas as pd
-import altair as alt
 import streamlit as st
-from pathlib import Path
+
+from anomalias import anomalias_mensais, tipos_padrao, tipos_pagamento
+from aquecimento import carregar_hll, carregar_resumo, carregar_sketches, iniciar_vigia
+from contagem_distinta import contar
+from dados import LOGO_PATH
+from equidade import NIVEL_CONFIANCA, gap_salarial_genero
+from graficos import (
+    COR_FEMININO,
+    COR_MASCULINO,
+    estatisticas_specs,
+    grafico_comissionados_genero,
+    grafico_custo_categoria,
+    grafico_donut_genero,
+    grafico_gap_genero,
+    grafico_genero,
+    grafico_histograma_salarios,
+    grafico_top_salarios,
+    servidor_singular_plural,
+    spec_grafico,
+    texto_centro_donut,
+)
+from indice_salarios import IndiceSalarios
+from plano import executar_plano
+import secoes
+from registro import registro_global
+from resumo import amostra_df, contagem_genero_df, custo_categoria_df
+from simulador import BaseSimulacao, Regra
+from sketches import ALFA, combinar, meses_disponiveis
+
+# Copy-on-write: a base do registro é compartilhada por todas as sessões;
+# filtros e seleções sobre ela são visões preguiçosas e só as colunas
+# efetivamente alteradas são copiadas, sem nunca modificar a original.
+pd.set_option("mode.copy_on_write", True)
 
 
 st.set_page_config(
@@ -10,15 +41,43 @@ st.set_page_config(
     layout="centered",
 )
 
-DATA_PATH = Path("data/processed/folha-pagamento-2025.parquet")
 CURRENCY_PREFIX = "R$"
 
-#carregar dados do parquet
-@st.cache_data(show_spinner="Carregando dados..")
+# registro das bases (anos/municípios), compartilhado entre as sessões
+registro = registro_global()
+
+# reaquece os caches em segundo plano quando uma base é atualizada
+iniciar_vigia(registro)
+
+if len(registro.datasets) > 1:
+    chave_dataset = st.selectbox(
+        "Base de dados",
+        list(registro.datasets),
+        format_func=lambda chave: registro.dataset(chave).nome,
+    )
+else:
+    chave_dataset = registro.padrao.chave
+
+dataset = registro.dataset(chave_dataset)
+ano = dataset.ano
+
+#carregar dados do parquet (sob demanda, via registro)
 def load_data():
-    return pd.read_parquet(DATA_PATH)
+    with st.spinner("Carregando dados.."):
+        return registro.obter(chave_dataset)
+
+# agregados das seções, guardados junto com a base no registro
+def secao(funcao, *args):
+    return registro.derivado(chave_dataset, funcao.__name__, funcao, *args)
+
+# resumo pré-calculado: permite pintar cabeçalho e KPIs sem ler a base completa
+# (guardado no processo por base e fingerprint; o aquecimento já o deixa pronto)
+resumo = carregar_resumo(registro, chave_dataset)
 
-df = load_data()
+# textos interpretativos só valem para a base em que foram escritos
+def narrativa(texto: str, **kwargs):
+    if dataset.narrativas:
+        st.markdown(texto, **kwargs)
 
 
 # Utilidades de formatação
@@ -31,19 +90,26 @@ def br_money(x: float) -> str:
     
     return f"{CURRENCY_PREFIX} {s}"
 
+def br_pct(x: float) -> str:
+    if pd.isna(x):
+        return "-"
+    return f"{x:.1f}%".replace(".", ",")
+
 def section_divider():
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
-st.image("assets/images/santa-rita-data.png")
+st.image(str(LOGO_PATH))
 
-st.markdown("""
-# Folha Pagamento 2025 - Santa Rita do Passa Quatro(SP)
+# endereço do portal vem do catálogo (cada base tem o seu)
+fonte_link = f"  \n  {dataset.portal}" if dataset.portal else ""
+
+st.markdown(f"""
+# Folha Pagamento {ano} - {dataset.municipio}({dataset.uf})
 
 A disponibilização de dados públicos por meio do **Portal da Transparência** permite avaliar como os recursos municipais são aplicados, especialmente no que diz respeito às despesas com **pessoal**, que representam uma das maiores parcelas do orçamento público.
 
 Fonte dos dados:  
-- Portal da Transparência — Prefeitura de Santa Rita do Passa Quatro/SP  
-  https://www.transparencia.prefsrpq.com.br/transparencia/
+- Portal da Transparência — Prefeitura de {dataset.municipio}/{dataset.uf}{fonte_link}
             
 ## Considerações Éticas e LGPD
 
@@ -57,7 +123,7 @@ Embora os dados utilizados sejam **públicos** e disponibilizados oficialmente p
 ### Abaixo uma amostra dos dados utilizados:
 """)
 
-st.dataframe(df.head(), use_container_width=True, hide_index=True)
+st.dataframe(amostra_df(resumo), use_container_width=True, hide_index=True)
 
 st.divider()
 
@@ -89,14 +155,14 @@ p.kpi-value {
 
 
 # ---------------------
-# Panorama Geral 2025
+# Panorama Geral
 # ---------------------
-st.markdown("""
-# Panorama Geral 2025
+st.markdown(f"""
+# Panorama Geral {ano}
 """)
 
-total_servidores = df["id_servidor"].nunique()
-total_proventos = df["proventos"].sum()
+total_servidores = resumo["total_servidores"]
+total_proventos = resumo["total_proventos"]
 
 total_servidores_str = f"{total_servidores}"
 total_proventos_str = br_money(total_proventos)
@@ -127,10 +193,8 @@ st.markdown("""
 ## Distribuição de servidores por gênero
 """)
 
-df_unico = df.drop_duplicates(subset="id_servidor")
-
-total_masculino = df_unico[df_unico["genero"] == "M"].shape[0]
-total_feminino = df_unico[df_unico["genero"] == "F"].shape[0]
+total_masculino = resumo["genero"].get("M", 0)
+total_feminino = resumo["genero"].get("F", 0)
 
 total_masc_str = f"{total_masculino}"
 total_fem_str = f"{total_feminino}"
@@ -155,63 +219,14 @@ with c4:
 st.markdown("<br><br>", unsafe_allow_html=True)
 
 # gráfico % de gênero
-df_unico = df.drop_duplicates(subset="id_servidor")
+contagem_genero = contagem_genero_df(resumo)
 
-contagem_genero = (
-    df_unico["genero"]
-    .value_counts()
-    .rename_axis("genero")
-    .reset_index(name="total_servidores")
-)
-
-contagem_genero["percentual"] = (
-    contagem_genero["total_servidores"] /
-    contagem_genero["total_servidores"].sum() * 100
-).round(1)
-
-# string já com %
-contagem_genero["percentual_str"] = contagem_genero["percentual"].astype(int).astype(str) + "%"
-
-base = alt.Chart(contagem_genero).encode(
-    x=alt.X("genero:N", title="Gênero", axis=alt.Axis(labelAngle=0)),
-    y=alt.Y("total_servidores:Q", title="Total de Servidores")
-)
-
-bars = base.mark_bar(size=90)
-
-# número absoluto em cima
-labels_top = base.mark_text(
-    dy=-8,
-    fontSize=16,
-    fontWeight="bold"
-).encode(
-    text="total_servidores:Q"
-)
-
-# percentual no meio (com %)
-labels_center = (
-    alt.Chart(contagem_genero)
-    .transform_calculate(y_mid="datum.total_servidores / 2")
-    .mark_text(
-        fontSize=18,
-        fontWeight="bold",
-        color="white"
-    )
-    .encode(
-        x=alt.X("genero:N", axis=alt.Axis(labelAngle=0)),
-        y=alt.Y("y_mid:Q", title=None),
-        text=alt.Text("percentual_str:N")
-    )
-)
-
-chart = (bars + labels_top + labels_center).properties(
-    width=500,
-    height=350
-)
-
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(spec_grafico(grafico_genero, contagem_genero), use_container_width=True)
 st.divider()
 
+# a partir daqui as seções dependem da base completa
+load_data()
+
 
 # ---------------------------------------------
 # percentual de gênero por categoria de cargo
@@ -221,77 +236,10 @@ st.markdown("""
 """)
 st.markdown("<br>", unsafe_allow_html=True)
 
-df_base = df.copy()
-
-# Flag comissionado por LINHA (robusta a NaN e espaços)
-df_base["is_comissionado"] = (
-    df_base["cargo"]
-    .fillna("")
-    .astype(str)
-    .str.strip()
-    .str.lower()
-    .str.endswith(".c")
-)
-
-# Helper: primeiro valor não nulo
-def first_notna(s: pd.Series):
-    s = s.dropna()
-    return s.iloc[0] if len(s) else None
-
-df_unico = (
-    df_base.groupby("id_servidor", as_index=False)
-    .agg(
-        genero=("genero", first_notna),
-        categoria_cargo=("categoria_cargo", first_notna),
-        is_comissionado=("is_comissionado", "any"),
-    )
-)
-
-# Se ANY ".c" => categoria vira comissionado (regra por servidor)
-df_unico.loc[df_unico["is_comissionado"], "categoria_cargo"] = "comissionado"
-
-# padroniza categoria para evitar inconsistências de casing/espaço
-df_unico["categoria_cargo"] = (
-    df_unico["categoria_cargo"]
-    .astype(str)
-    .str.strip()
-    .str.lower()
-    .replace({"nan": None})
-)
-
-# Remove a coluna auxiliar
-df_unico = df_unico.drop(columns=["is_comissionado"])
-
-# Agregações por categoria
-total_categoria = (
-    df_unico.groupby("categoria_cargo")["id_servidor"]
-    .nunique()
-    .reset_index(name="total_categoria")
-)
-
-total_feminino = (
-    df_unico[df_unico["genero"] == "F"]
-    .groupby("categoria_cargo")["id_servidor"]
-    .nunique()
-    .reset_index(name="total_feminino")
-)
-
-perfil = total_categoria.merge(total_feminino, on="categoria_cargo", how="left")
-
-perfil["total_feminino"] = perfil["total_feminino"].fillna(0).astype(int)
-perfil["total_masculino"] = (perfil["total_categoria"] - perfil["total_feminino"]).astype(int)
-
-# evita divisão por zero
-perfil["percentual_feminino"] = (
-    (perfil["total_feminino"] / perfil["total_categoria"].replace({0: pd.NA})) * 100
-).round(1).fillna(0.0)
+# seções declaradas em plano.py, calculadas juntas (fontes compartilhadas)
+plano = secao(executar_plano, ano)
 
-perfil["percentual_masculino"] = (
-    (perfil["total_masculino"] / perfil["total_categoria"].replace({0: pd.NA})) * 100
-).round(1).fillna(0.0)
-
-# Ordena por tamanho da categoria
-perfil = perfil.sort_values("total_categoria", ascending=False)
+perfil = plano["perfil_genero_categoria"]
 
 # ---------------------------------------------
 # Mapa de nomes
@@ -313,12 +261,6 @@ def formatar_categoria(cat: str) -> str:
     cat = str(cat).strip().lower()
     return NOME_CATEGORIA.get(cat, cat)
 
-def servidor_singular_plural(n: int) -> str:
-    return "servidor" if int(n) == 1 else "servidores"
-
-DONUT_DOMAIN = ["Masculino", "Feminino"]
-DONUT_RANGE = ["#0068c9", "#e377c2"]
-
 def donut_genero_categoria(perfil_df: pd.DataFrame, categoria: str):
     categoria = str(categoria).strip().lower()
     subset = perfil_df.loc[perfil_df["categoria_cargo"].astype(str).str.strip().str.lower() == categoria]
@@ -341,41 +283,11 @@ def donut_genero_categoria(perfil_df: pd.DataFrame, categoria: str):
     else:
         pct_f, pct_m = 0.0, 0.0
 
-    donut_df = pd.DataFrame({
-        "genero": ["Masculino", "Feminino"],
-        "percentual": [pct_m, pct_f],
-        "total": [total_m, total_f],
-    })
-
     st.markdown(f"#### {categoria_fmt}")
 
-    donut = (
-        alt.Chart(donut_df)
-        .mark_arc(innerRadius=68, outerRadius=110)
-        .encode(
-            theta=alt.Theta("percentual:Q"),
-            color=alt.Color(
-                "genero:N",
-                scale=alt.Scale(domain=DONUT_DOMAIN, range=DONUT_RANGE),
-                legend=None,
-            ),
-            tooltip=[
-                alt.Tooltip("genero:N", title="Gênero"),
-                alt.Tooltip("total:Q", title="Servidores"),
-                alt.Tooltip("percentual:Q", title="Percentual", format=".1f"),
-            ],
-        )
-        .properties(width=300, height=240)
-    )
-
-    center_text = f"{total_cat}\n{servidor_singular_plural(total_cat)}"
-    center = (
-        alt.Chart(pd.DataFrame({"text": [center_text]}))
-        .mark_text(fontSize=16, fontWeight="bold", lineHeight=18)
-        .encode(text="text:N")
-    )
+    donut = spec_grafico(grafico_donut_genero, total_m, total_f, texto_centro_donut(total_cat))
 
-    st.altair_chart(donut + center, use_container_width=True)
+    st.vega_lite_chart(donut, use_container_width=True)
 
     st.caption(f"F: {pct_f:.1f}% ({total_f}) • M: {pct_m:.1f}% ({total_m})")
 
@@ -414,10 +326,10 @@ st.divider()
 # Custo anual por categoria
 # --------------------------
 
-st.markdown("""
+st.markdown(f"""
 # Custo anual por categoria
             
-Esta análise apresenta o custo total da prefeitura com servidores públicos ao longo de 2025,
+Esta análise apresenta o custo total da prefeitura com servidores públicos ao longo de {ano},
 agrupado por categoria de cargo, considerando **todos os tipos de pagamento disponíveis na base**, incluindo:
 
 - Salário base
@@ -428,78 +340,10 @@ agrupado por categoria de cargo, considerando **todos os tipos de pagamento disp
 - Folhas complementares com encargos
 """)
 st.markdown("<br>", unsafe_allow_html=True)
-custo_anual_categoria = (
-    df.groupby("categoria_cargo")["proventos"]
-    .sum()
-    .reset_index(name="custo_folha_anual_categoria")
-    .sort_values("custo_folha_anual_categoria", ascending=False)
-    .reset_index(drop=False)
-)
-
-custo = custo_anual_categoria.copy()
-
-total_geral = custo["custo_folha_anual_categoria"].sum()
-
-custo["percentual"] = (custo["custo_folha_anual_categoria"] / total_geral * 100).round(2)
-
-def brl_label(v):
-    if v >= 1_000_000:
-        return f"R$ {v/1_000_000:.1f} mi"
-    return f"R$ {v/1_000:.0f} mil"
+custo_anual_categoria = custo_categoria_df(resumo)
 
-custo["valor_str"] = custo["custo_folha_anual_categoria"].apply(brl_label)
-custo["label"] = custo["valor_str"] + " (" + custo["percentual"].map(lambda x: f"{x:.1f}%") + ")"
-
-
-max_v = float(custo["custo_folha_anual_categoria"].max())
-
-base = alt.Chart(custo).encode(
-    y=alt.Y(
-        "categoria_cargo:N",
-        sort="-x",
-        title=None,
-        axis=alt.Axis(labelLimit=0)  # não truncar nomes (se precisar, depois a gente faz wrap)
-    ),
-    x=alt.X(
-        "custo_folha_anual_categoria:Q",
-        title="Custo total anual (R$)",
-        axis=alt.Axis(format="~s"),  # exibe 1M, 2M, etc (apoio visual)
-        scale=alt.Scale(domain=[0, max_v * 1.18])  # folga para não cortar labels
-    ),
-    tooltip=[
-        alt.Tooltip("categoria_cargo:N", title="Categoria"),
-        alt.Tooltip("valor_str:N", title="Custo anual"),
-        alt.Tooltip("percentual:Q", title="% do total", format=".1f"),
-    ]
-)
-
-bars = base.mark_bar(size=28)
-
-labels = base.mark_text(
-    align="left",
-    baseline="middle",
-    dx=10,
-    fontSize=14,
-    fontWeight="bold"
-).encode(
-    text="label:N"
-)
-
-chart = (bars + labels).properties(
-    width=760,
-    height=min(700, 38 * len(custo) + 80),
-    padding={"right": 20},
-    title=alt.TitleParams(
-        text="Custo Anual Por Categoria",
-        anchor="middle",
-        fontSize=16,
-        fontWeight="bold",
-        offset=12
-    )
-)
-
-st.altair_chart(chart, use_container_width=True)
-st.markdown("""
+st.vega_lite_chart(spec_grafico(grafico_custo_categoria, custo_anual_categoria), use_container_width=True)
+narrativa("""
 - **Educação, Saúde e Operacional** concentram a maior parte das despesas anuais, representando
 a espinha dorsal dos serviços públicos essenciais.
 - Áreas como **Cultura, Jurídico e Técnico** possuem impacto financeiro significativamente menor,
@@ -514,9 +358,11 @@ st.divider()
 # -----------------------
 # Top 10 salários geral
 # -----------------------
-st.markdown("""
-# Maiores Salários de 2025
-            
+st.markdown(f"""
+# Maiores Salários de {ano}
+""")
+
+narrativa("""
 O levantamento dos 10 maiores salários pagos pela Prefeitura ao longo de 2025 revela uma forte presença da área da Saúde no topo da remuneração do funcionalismo. 
 As três primeiras posições são ocupadas por profissionais médicos, com destaque para o **Médico PSF**, que lidera o ranking, 
 seguido por outro servidor da mesma função.
@@ -537,82 +383,25 @@ pelos **cargos de direção** do Executivo Municipal.
 
 st.markdown("<br><br>", unsafe_allow_html=True)
 
-df_mensal = df[df["tipo_pagamento"] == "folha_mensal"].copy()
+# Ranking dos 10 maiores salários do ano
+top_10_salarios_geral = plano["top_salarios"]
 
-df_mensal_unico = (
-    df_mensal
-    .sort_values(["id_servidor", "proventos"], ascending=[True, False])
-    .drop_duplicates(subset=["id_servidor"], keep="first")
-    .copy()
-)
-
-# Ranking dos 10 maiores salários de 2025
-top_10_salarios_geral = (
-    df_mensal_unico.groupby(["id_servidor", "cargo", "genero"])["proventos"]
-    .max()
-    .reset_index(name="salario_maximo")
-    .sort_values("salario_maximo", ascending=False)
-    .head(10)
-    .reset_index(drop=True)
-)
-
-# Formatar para exibição
-top_10_salarios_geral["salario_str"] = top_10_salarios_geral["salario_maximo"].apply(br_money)
-
-# ranking numerico
-top_10_salarios_geral["rank"] = top_10_salarios_geral.index + 1
-top_10_salarios_geral["rank_label"] = top_10_salarios_geral["rank"].astype(str) + "º"
-
-df_plot = top_10_salarios_geral.copy()
-
-max_sal = float(df_plot["salario_maximo"].max())
-
-base = alt.Chart(df_plot).encode(
-    y=alt.Y(
-        "rank_label:N",
-        sort=alt.SortField(field="rank", order="ascending"),
-        title=None,
-        axis=alt.Axis(labelAngle=0)
-    ),
-    x=alt.X(
-        "salario_maximo:Q",
-        title="Salário base mensal (R$)",
-        scale=alt.Scale(domain=[0, max_sal * 1.12])
-    ),
-    tooltip=[
-        alt.Tooltip("rank:Q", title="Rank"),
-        alt.Tooltip("cargo:N", title="Cargo"),
-        alt.Tooltip("genero:N", title="Gênero"),
-        alt.Tooltip("salario_str:N", title="Salário Máximo"),
-    ]
+# Formatar para exibição (lista textual)
+top_10_salarios_geral = top_10_salarios_geral.assign(
+    salario_str=top_10_salarios_geral["salario_maximo"].apply(br_money)
 )
 
-bars = base.mark_bar(size=26, color="#0068c9")
+df_plot = top_10_salarios_geral
 
-labels = base.mark_text(
-    align="left",
-    baseline="middle",
-    dx=10,
-    fontSize=14,
-    fontWeight="bold"
-).encode(
-    text="salario_str:N"
+chart = spec_grafico(
+    grafico_top_salarios,
+    plano["top_salarios"],
+    "Top 10 Maiores Salários",
+    cor=COR_MASCULINO,
+    com_genero=True,
 )
 
-chart = (bars + labels).properties(
-    width=720,
-    height=430,
-    padding={"right": 20},
-    title=alt.TitleParams(
-        text="Top 10 Maiores Salários",
-        anchor="middle",
-        fontSize=16,
-        fontWeight="bold",
-        offset=12
-    )
-)
-
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart, use_container_width=True)
 
 # Lista textual para mobile
 st.markdown("**Cargos (por ordem do ranking):**")
@@ -623,91 +412,30 @@ for _, row in df_plot.iterrows():
 # -------------------------
 # Top 10 genero masculino
 # -------------------------
-st.markdown("""
-## Os 10 maiores salários por gênero - 2025
+st.markdown(f"""
+## Os 10 maiores salários por gênero - {ano}
             
 ### Gênero masculino
 """)
 st.markdown("<br>", unsafe_allow_html=True)
-# Filtra apenas servidores do gênero masculino + folha mensal
-df_masc = df[
-    (df["genero"] == "M") &
-    (df["tipo_pagamento"] == "folha_mensal")
-].copy()
-
-# Mantém somente 1 linha por servidor (maior salário mensal observado no ano)
-df_masc_1por = (
-    df_masc.sort_values(["id_servidor", "proventos"], ascending=[True, False])
-           .drop_duplicates(subset=["id_servidor"], keep="first")
-           .copy()
-)
+# Seleciona top 10 salários (folha mensal, 1 linha por servidor)
+top_10_salarios_masc = plano["top_salarios_masculino"]
 
-# Seleciona top 10 salários
-top_10_salarios_masc = (
-    df_masc_1por.groupby(["id_servidor", "cargo"])["proventos"]
-    .max()
-    .reset_index(name="salario_maximo")
-    .sort_values("salario_maximo", ascending=False)
-    .head(10)
-    .reset_index(drop=True)
+# Formatação para exibição (lista textual)
+top_10_salarios_masc = top_10_salarios_masc.assign(
+    salario_str=top_10_salarios_masc["salario_maximo"].apply(br_money)
 )
 
-# Formatação para exibição
-top_10_salarios_masc["salario_str"] = top_10_salarios_masc["salario_maximo"].apply(br_money)
-
-# Ranking numérico
-top_10_salarios_masc["rank"] = top_10_salarios_masc.index + 1
-top_10_salarios_masc["rank_label"] = top_10_salarios_masc["rank"].astype(str) + "º"
-
-
-df_plot = top_10_salarios_masc.copy()
-max_sal = float(df_plot["salario_maximo"].max())
-
-base = alt.Chart(df_plot).encode(
-    y=alt.Y(
-        "rank_label:N",
-        sort=alt.SortField(field="rank", order="ascending"),
-        title=None,
-        axis=alt.Axis(labelAngle=0)
-    ),
-    x=alt.X(
-        "salario_maximo:Q",
-        title="Salário base mensal (R$)",
-        scale=alt.Scale(domain=[0, max_sal * 1.12])
-    ),
-    tooltip=[
-        alt.Tooltip("rank:Q", title="Rank"),
-        alt.Tooltip("cargo:N", title="Cargo"),
-        alt.Tooltip("salario_str:N", title="Salário Máximo"),
-    ]
-)
+df_plot = top_10_salarios_masc
 
-bars = base.mark_bar(size=26, color="#0068c9")
-
-labels = base.mark_text(
-    align="left",
-    baseline="middle",
-    dx=10,
-    fontSize=14,
-    fontWeight="bold"
-).encode(
-    text="salario_str:N"
+chart = spec_grafico(
+    grafico_top_salarios,
+    plano["top_salarios_masculino"],
+    f"Top 10 Maiores Salários — Servidores do Gênero Masculino ({ano})",
+    cor=COR_MASCULINO,
 )
 
-chart = (bars + labels).properties(
-    width=720,
-    height=430,
-    padding={"right": 20},
-    title=alt.TitleParams(
-        text="Top 10 Maiores Salários — Servidores do Gênero Masculino (2025)",
-        anchor="middle",
-        fontSize=16,
-        fontWeight="bold",
-        offset=12
-    )
-)
-
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart, use_container_width=True)
 
 # Lista textual para facilitar leitura no mobile
 st.markdown("**Cargos (por ordem do ranking):**")
@@ -725,92 +453,31 @@ st.markdown("""
 ### Gênero Feminino
 """)
 st.markdown("<br>", unsafe_allow_html=True)
-# Filtra apenas servidores do gênero masculino + folha mensal
-df_fem = df[
-    (df["genero"] == "F") &
-    (df["tipo_pagamento"] == "folha_mensal")
-].copy()
-
-# Mantém somente 1 linha por servidor (maior salário mensal observado no ano)
-df_fem_1por = (
-    df_fem.sort_values(["id_servidor", "proventos"], ascending=[True, False])
-           .drop_duplicates(subset=["id_servidor"], keep="first")
-           .copy()
-)
+# Seleciona top 10 salários (folha mensal, 1 linha por servidor)
+top_10_salarios_fem = plano["top_salarios_feminino"]
 
-# Seleciona top 10 salários
-top_10_salarios_fem = (
-    df_fem_1por.groupby(["id_servidor", "cargo"])["proventos"]
-    .max()
-    .reset_index(name="salario_maximo")
-    .sort_values("salario_maximo", ascending=False)
-    .head(10)
-    .reset_index(drop=True)
+# Formatação para exibição (lista textual)
+top_10_salarios_fem = top_10_salarios_fem.assign(
+    salario_str=top_10_salarios_fem["salario_maximo"].apply(br_money)
 )
 
-# Formatação para exibição
-top_10_salarios_fem["salario_str"] = top_10_salarios_fem["salario_maximo"].apply(br_money)
-
-# Ranking numérico
-top_10_salarios_fem["rank"] = top_10_salarios_fem.index + 1
-top_10_salarios_fem["rank_label"] = top_10_salarios_fem["rank"].astype(str) + "º"
-
-
-df_plot = top_10_salarios_fem.copy()
-max_sal = float(df_plot["salario_maximo"].max())
-
-base = alt.Chart(df_plot).encode(
-    y=alt.Y(
-        "rank_label:N",
-        sort=alt.SortField(field="rank", order="ascending"),
-        title=None,
-        axis=alt.Axis(labelAngle=0)
-    ),
-    x=alt.X(
-        "salario_maximo:Q",
-        title="Salário base mensal (R$)",
-        scale=alt.Scale(domain=[0, max_sal * 1.12])
-    ),
-    tooltip=[
-        alt.Tooltip("rank:Q", title="Rank"),
-        alt.Tooltip("cargo:N", title="Cargo"),
-        alt.Tooltip("salario_str:N", title="Salário Máximo"),
-    ]
-)
+df_plot = top_10_salarios_fem
 
-bars = base.mark_bar(size=26, color="#e377c2")
-
-labels = base.mark_text(
-    align="left",
-    baseline="middle",
-    dx=10,
-    fontSize=14,
-    fontWeight="bold"
-).encode(
-    text="salario_str:N"
-)
-
-chart = (bars + labels).properties(
-    width=720,
-    height=430,
-    padding={"right": 20},
-    title=alt.TitleParams(
-        text="Top 10 Maiores Salários — Servidores do Gênero Feminino (2025)",
-        anchor="middle",
-        fontSize=16,
-        fontWeight="bold",
-        offset=12
-    )
+chart = spec_grafico(
+    grafico_top_salarios,
+    plano["top_salarios_feminino"],
+    f"Top 10 Maiores Salários — Servidores do Gênero Feminino ({ano})",
+    cor=COR_FEMININO,
 )
 
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart, use_container_width=True)
 
 # Lista textual para facilitar leitura no mobile
 st.markdown("**Cargos (por ordem do ranking):**")
 for _, row in df_plot.iterrows():
     st.caption(f"**{int(row['rank'])}º** — {row['cargo']} — Salário: {row['salario_str']}")
 
-st.markdown("""
+narrativa("""
 ## Conclusão — Maiores Salários de 2025
 
 A análise dos maiores salários pagos pela Prefeitura ao longo de 2025 revela um cenário em que a **área da Saúde domina amplamente as primeiras posições**, tanto entre homens quanto entre mulheres. O cargo de **Médico PSF** aparece no topo dos dois rankings, reforçando o peso estratégico desse serviço dentro da administração municipal.
@@ -827,13 +494,375 @@ A combinação desses fatores evidencia que as remunerações mais altas se dist
 """)
 st.divider()
 
+# ------------------------------
+# Distribuição dos salários
+# ------------------------------
+st.markdown("""
+# Distribuição dos salários mensais
+
+Considera o maior salário mensal (folha mensal) de cada servidor no ano. Escolha uma categoria,
+um gênero e a largura das faixas do histograma, e informe um salário para ver em que percentil
+ele se encontra.
+""")
+
+indice_salarios = secao(IndiceSalarios)
+
+GENEROS_FILTRO = {"Todos": None, "Feminino": "F", "Masculino": "M"}
+
+f1, f2 = st.columns(2)
+with f1:
+    categoria_filtro = st.selectbox(
+        "Categoria",
+        [None] + indice_salarios.categorias,
+        format_func=lambda c: "Todas" if c is None else formatar_categoria(c),
+    )
+with f2:
+    genero_filtro = GENEROS_FILTRO[
+        st.radio("Gênero", list(GENEROS_FILTRO), horizontal=True)
+    ]
+
+largura_faixa = st.slider(
+    "Largura da faixa (R$)",
+    min_value=250,
+    max_value=5000,
+    value=1000,
+    step=250,
+)
+salario_consulta = st.number_input(
+    "Salário mensal para comparar (R$)",
+    min_value=0.0,
+    value=round(indice_salarios.quantil(0.5), 2),
+    step=100.0,
+)
+
+total_grupo = indice_salarios.total(categoria_filtro, genero_filtro)
+
+if total_grupo == 0:
+    st.info("Nenhum servidor com folha mensal para esse filtro.")
+else:
+    chart = spec_grafico(
+        grafico_histograma_salarios,
+        indice_salarios.histograma(largura_faixa, categoria_filtro, genero_filtro),
+        "Servidores por faixa de salário mensal",
+        cor=COR_FEMININO if genero_filtro == "F" else COR_MASCULINO,
+        salario_marcado=salario_consulta,
+    )
+    st.vega_lite_chart(chart, use_container_width=True)
+
+    percentil = indice_salarios.percentil(salario_consulta, categoria_filtro, genero_filtro)
+    mediana = indice_salarios.quantil(0.5, categoria_filtro, genero_filtro)
+    q1 = indice_salarios.quantil(0.25, categoria_filtro, genero_filtro)
+    q3 = indice_salarios.quantil(0.75, categoria_filtro, genero_filtro)
+
+    st.caption(
+        f"{total_grupo} {servidor_singular_plural(total_grupo)} no filtro. "
+        f"Mediana: {br_money(mediana)} • Intervalo interquartil: {br_money(q1)} a {br_money(q3)}.\n"
+        f"Um salário de {br_money(salario_consulta)} é maior ou igual ao de {percentil:.1f}% dos servidores do filtro."
+    )
+
+st.markdown("""
+### Mediana e intervalo interquartil por cargo
+""")
+
+salarios_cargo = indice_salarios.por_cargo
+st.dataframe(
+    pd.DataFrame({
+        "Cargo": salarios_cargo["cargo"],
+        "Servidores": salarios_cargo["servidores"],
+        "1º quartil": salarios_cargo["q1"].apply(br_money),
+        "Mediana": salarios_cargo["mediana"].apply(br_money),
+        "3º quartil": salarios_cargo["q3"].apply(br_money),
+        "IQR": salarios_cargo["iqr"].apply(br_money),
+    }),
+    use_container_width=True,
+    hide_index=True,
+)
+
+st.markdown("""
+### Pagamentos mensais por período
+
+Quantis de todos os pagamentos de folha mensal dos meses escolhidos (um servidor conta uma vez por mês),
+com a categoria e o gênero selecionados acima.
+""")
+
+if len(registro.datasets) > 1:
+    chaves_periodo = st.multiselect(
+        "Bases",
+        list(registro.datasets),
+        default=[chave_dataset],
+        format_func=lambda chave: registro.dataset(chave).nome,
+    ) or [chave_dataset]
+else:
+    chaves_periodo = [chave_dataset]
+
+# sketches e contagens de cada base selecionada, mesclados célula a célula
+sketches_salarios = pd.concat(
+    [carregar_sketches(registro, c) for c in chaves_periodo],
+    ignore_index=True,
+)
+hll_servidores = pd.concat([carregar_hll(registro, c) for c in chaves_periodo], ignore_index=True)
+meses_sketch = meses_disponiveis(sketches_salarios)
+
+if meses_sketch:
+    mes_inicio, mes_fim = st.select_slider(
+        "Meses",
+        options=meses_sketch,
+        value=(meses_sketch[0], meses_sketch[-1]),
+    )
+    periodo = meses_sketch[meses_sketch.index(mes_inicio):meses_sketch.index(mes_fim) + 1]
+    sketch_periodo = combinar(
+        sketches_salarios,
+        mes=periodo,
+        categoria_cargo=categoria_filtro,
+        genero=genero_filtro,
+    )
+
+    if sketch_periodo.n == 0:
+        st.info("Nenhum pagamento de folha mensal para esse filtro.")
+    else:
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("1º quartil", br_money(sketch_periodo.quantil(0.25)))
+        p2.metric("Mediana", br_money(sketch_periodo.quantil(0.5)))
+        p3.metric("3º quartil", br_money(sketch_periodo.quantil(0.75)))
+        p4.metric("90º percentil", br_money(sketch_periodo.quantil(0.9)))
+        servidores_periodo = contar(
+            hll_servidores,
+            mes=periodo,
+            tipo_pagamento="folha_mensal",
+            categoria_cargo=categoria_filtro,
+            genero=genero_filtro,
+        )
+        st.caption(
+            f"{sketch_periodo.n} pagamentos a cerca de {servidores_periodo} "
+            f"{servidor_singular_plural(servidores_periodo)} no período. "
+            f"Quantis aproximados (erro relativo de até {ALFA:.0%}); contagem de servidores estimada."
+        )
+st.divider()
+
+# ------------------------------
+# Equidade salarial por gênero
+# ------------------------------
+st.markdown("""
+# Diferença salarial entre gêneros
+
+Compara o salário mensal de homens e mulheres (maior valor de folha mensal de cada servidor no ano)
+em cada categoria e em cada faixa de carga horária. A diferença é calculada em relação ao salário
+masculino: valores positivos indicam que os homens recebem mais.
+""")
+
+gap_genero = secao(gap_salarial_genero)
+
+DIMENSOES_GAP = {"Categoria": "categoria", "Carga horária semanal": "carga_horaria"}
+MEDIDAS_GAP = {"Mediana": "mediana", "Média": "media"}
+
+g1, g2 = st.columns(2)
+with g1:
+    dimensao_gap = DIMENSOES_GAP[st.radio("Comparar por", list(DIMENSOES_GAP), horizontal=True)]
+with g2:
+    medida_gap = MEDIDAS_GAP[st.radio("Medida", list(MEDIDAS_GAP), horizontal=True)]
+
+gap_dimensao = gap_genero[gap_genero["dimensao"].isin(["geral", dimensao_gap])].assign(
+    grupo=lambda d: d["grupo"].where(d["dimensao"] != "categoria", d["grupo"].map(formatar_categoria))
+)
+gap_grafico = gap_dimensao.dropna(subset=[f"ic_{medida_gap}_inf"])
+nome_medida = "Mediana" if medida_gap == "mediana" else "Média"
+
+chart = spec_grafico(
+    grafico_gap_genero,
+    pd.DataFrame({
+        "grupo": gap_grafico["grupo"],
+        "gap": gap_grafico[f"gap_{medida_gap}"],
+        "ic_inf": gap_grafico[f"ic_{medida_gap}_inf"],
+        "ic_sup": gap_grafico[f"ic_{medida_gap}_sup"],
+    }),
+    "Diferença salarial entre homens e mulheres",
+)
+st.vega_lite_chart(chart, use_container_width=True)
+
+st.caption(
+    f"Barras: intervalo de confiança de {NIVEL_CONFIANCA:.0%} (bootstrap). "
+    "Grupos com menos de 3 servidores de algum gênero aparecem só na tabela."
+)
+
+st.dataframe(
+    pd.DataFrame({
+        "Grupo": gap_dimensao["grupo"],
+        "Homens": gap_dimensao["n_masculino"],
+        "Mulheres": gap_dimensao["n_feminino"],
+        f"{nome_medida} (homens)": gap_dimensao[f"{medida_gap}_masculino"].apply(br_money),
+        f"{nome_medida} (mulheres)": gap_dimensao[f"{medida_gap}_feminino"].apply(br_money),
+        "Diferença": gap_dimensao[f"gap_{medida_gap}"].apply(br_pct),
+        "IC inferior": gap_dimensao[f"ic_{medida_gap}_inf"].apply(br_pct),
+        "IC superior": gap_dimensao[f"ic_{medida_gap}_sup"].apply(br_pct),
+    }),
+    use_container_width=True,
+    hide_index=True,
+)
+st.divider()
+
+# ------------------------------
+# Pagamentos fora do padrão
+# ------------------------------
+st.markdown("""
+# Pagamentos mensais fora do padrão
+
+Compara o total recebido por cada servidor em cada mês com os meses vizinhos do próprio servidor
+(mediana e desvio absoluto mediano). Meses muito acima ou abaixo do habitual, e meses com mais de
+uma linha de folha mensal, aparecem na tabela, dos mais aos menos extremos.
+""")
+
+tipos_disponiveis = secao(tipos_pagamento)
+tipos_anomalia = st.multiselect(
+    "Tipos de pagamento considerados",
+    tipos_disponiveis,
+    default=list(tipos_padrao(tipos_disponiveis)),
+    help="O 13º salário dobra o pagamento de quase todos os servidores em dezembro; por padrão fica de fora.",
+)
+
+if not tipos_anomalia:
+    st.info("Escolha ao menos um tipo de pagamento.")
+else:
+    anomalias = secao(anomalias_mensais, tuple(sorted(tipos_anomalia)))
+    duplicadas = int(anomalias["folha_duplicada"].sum())
+
+    st.caption(
+        f"{len(anomalias)} meses marcados, de {anomalias['id_servidor'].nunique()} "
+        f"{servidor_singular_plural(anomalias['id_servidor'].nunique())}; "
+        f"{duplicadas} com folha mensal duplicada."
+    )
+
+    maiores_anomalias = anomalias.head(50)
+    st.dataframe(
+        pd.DataFrame({
+            "Servidor": maiores_anomalias["id_servidor"].str[:8],
+            "Cargo": maiores_anomalias["cargo"],
+            "Mês": maiores_anomalias["mes"],
+            "Valor": maiores_anomalias["valor"].apply(br_money),
+            "Habitual": maiores_anomalias["referencia"].apply(br_money),
+            "Diferença": maiores_anomalias["desvio"].apply(br_money),
+            "z robusto": maiores_anomalias["z"].round(1),
+            "Tipos no mês": maiores_anomalias["tipos_pagamento"],
+            "Folha duplicada": maiores_anomalias["folha_duplicada"],
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+st.divider()
+
+# ------------------------------
+# Simulador de reajustes
+# ------------------------------
+st.markdown("""
+# Simulador de reajustes
+
+Quanto custaria um reajuste? Monte uma ou mais regras (aplicadas em ordem) sobre os pagamentos
+de folha mensal do ano e veja o novo custo anual, a participação de cada categoria e a ordem
+das categorias por custo.
+""")
+
+base_simulacao = secao(BaseSimulacao)
+
+TIPOS_REGRA = {"Reajuste (%)": "percentual", "Piso salarial (R$)": "piso", "Acréscimo fixo (R$)": "acrescimo"}
+VALOR_PADRAO_REGRA = {"percentual": 5.0, "piso": 2000.0, "acrescimo": 100.0}
+ALVOS_REGRA = ["Toda a folha", "Categoria", "Cargo", "Carga horária", "Faixa salarial"]
+
+n_regras = st.number_input("Número de regras", min_value=1, max_value=5, value=1)
+
+regras = []
+for i in range(int(n_regras)):
+    with st.container(border=True):
+        r1, r2, r3 = st.columns(3)
+        with r1:
+            tipo_regra = TIPOS_REGRA[st.selectbox("Regra", list(TIPOS_REGRA), key=f"sim_tipo_{i}")]
+        with r2:
+            valor_regra = st.number_input(
+                "Valor",
+                value=VALOR_PADRAO_REGRA[tipo_regra],
+                step=0.5 if tipo_regra == "percentual" else 100.0,
+                key=f"sim_valor_{i}_{tipo_regra}",
+            )
+        with r3:
+            alvo_regra = st.selectbox("Aplicar a", ALVOS_REGRA, key=f"sim_alvo_{i}")
+
+        filtros_regra = {}
+        if alvo_regra == "Categoria":
+            filtros_regra["categoria"] = st.selectbox(
+                "Categoria", base_simulacao.categorias, format_func=formatar_categoria, key=f"sim_categoria_{i}"
+            )
+        elif alvo_regra == "Cargo":
+            filtros_regra["cargo"] = st.selectbox("Cargo", base_simulacao.cargos, key=f"sim_cargo_{i}")
+        elif alvo_regra == "Carga horária":
+            filtros_regra["carga_min"], filtros_regra["carga_max"] = st.slider(
+                "Carga horária semanal (h)",
+                0,
+                base_simulacao.carga_maxima,
+                (0, base_simulacao.carga_maxima),
+                key=f"sim_carga_{i}",
+            )
+        elif alvo_regra == "Faixa salarial":
+            filtros_regra["salario_min"], filtros_regra["salario_max"] = st.slider(
+                "Faixa de salário mensal (R$)",
+                0.0,
+                base_simulacao.salario_maximo,
+                (0.0, base_simulacao.salario_maximo),
+                step=100.0,
+                key=f"sim_salario_{i}",
+            )
+
+        regras.append(Regra(tipo_regra, valor_regra, **filtros_regra))
+
+simulacao = base_simulacao.simular(regras)
+diferenca_simulacao = simulacao["custo_simulado"] - simulacao["custo_atual"]
+
+s1, s2, s3 = st.columns(3)
+s1.metric("Custo anual atual", br_money(simulacao["custo_atual"]))
+s2.metric(
+    "Custo anual simulado",
+    br_money(simulacao["custo_simulado"]),
+    delta=f"{br_money(diferenca_simulacao)} ({br_pct(diferenca_simulacao / simulacao['custo_atual'] * 100)})",
+    delta_color="inverse",
+)
+s3.metric("Servidores afetados", simulacao["servidores_afetados"])
+
+simulacao_categoria = simulacao["por_categoria"]
+chart = spec_grafico(
+    grafico_custo_categoria,
+    pd.DataFrame({
+        "categoria_cargo": simulacao_categoria["categoria_cargo"].map(formatar_categoria),
+        "custo_folha_anual_categoria": simulacao_categoria["custo_simulado"],
+    }),
+    "Custo Anual Simulado Por Categoria (folha mensal)",
+)
+st.vega_lite_chart(chart, use_container_width=True)
+
+st.dataframe(
+    pd.DataFrame({
+        "Categoria": simulacao_categoria["categoria_cargo"].map(formatar_categoria),
+        "Custo atual": simulacao_categoria["custo_atual"].apply(br_money),
+        "Custo simulado": simulacao_categoria["custo_simulado"].apply(br_money),
+        "Diferença": simulacao_categoria["diferenca"].apply(br_money),
+        "Participação atual": simulacao_categoria["participacao_atual"].apply(br_pct),
+        "Participação simulada": simulacao_categoria["participacao_simulada"].apply(br_pct),
+        "Posição": simulacao_categoria["ranking_atual"].astype(str) + "º → " + simulacao_categoria["ranking_simulado"].astype(str) + "º",
+    }),
+    use_container_width=True,
+    hide_index=True,
+)
+st.caption(
+    f"{simulacao['pagamentos_alterados']} pagamentos mensais alterados. "
+    "Considera apenas a folha mensal (sem 13º, encargos e rescisões)."
+)
+st.divider()
+
 # ---------------------
 # Cargos Comissionados
 # ---------------------
 
 st.markdown("""
 # Cargos Comissionados
+""")
 
+narrativa("""
 Os cargos comissionados representam uma parcela estratégica da estrutura administrativa da Prefeitura. 
 Diferentemente dos cargos efetivos, eles são ocupados por profissionais nomeados diretamente pela gestão, geralmente para funções de confiança, 
 direção, assessoramento ou coordenação de políticas públicas.
@@ -848,21 +877,10 @@ acompanhada do número de pessoas que ocuparam cada função. Essa transparênci
 a máquina pública é organizada e onde estão alocados os cargos de confiança da administração municipal.
 """)
 
-df_cargos_c = df[df["cargo"].str.endswith(".c", na=False)].copy()
+cargos_comissionados_lista = plano["comissionados_lista"]
 
-df_cargos_c_unico = df_cargos_c.drop_duplicates(subset="id_servidor").copy()
-
-cargos_comissionados_lista = (
-    df_cargos_c_unico
-    .groupby("cargo")["id_servidor"]
-    .nunique()
-    .reset_index(name="quantidade_servidores")
-    .sort_values("quantidade_servidores", ascending=False)
-    .reset_index(drop=True)
-)
-
-st.markdown("""
-## Lista de Cargos Comissionados e Quantidade de Servidores (2025)
+st.markdown(f"""
+## Lista de Cargos Comissionados e Quantidade de Servidores ({ano})
 """)
 st.dataframe(
     cargos_comissionados_lista.rename(columns={
@@ -873,7 +891,7 @@ st.dataframe(
     hide_index=True
 )
 
-st.markdown("""
+narrativa("""
 ### O que mostra a lista de cargos comissionados
 
 A distribuição dos cargos comissionados ao longo de 2025 revela uma estrutura voltada principalmente para funções de assessoria e coordenação. 
@@ -895,7 +913,7 @@ responsáveis pela condução estratégica das políticas públicas. Essa divis
 responsabilidades e organiza sua força de trabalho de confiança ao longo do ano.
 """)
 
-st.markdown("""
+narrativa("""
 ### Distribuição por gênero entre os cargos comissionados
 
 Entre os **53 servidores comissionados** que atuaram na Prefeitura ao longo de 2025, a distribuição por gênero mostra 
@@ -909,104 +927,19 @@ desenha a composição da equipe estratégica do governo municipal.
 """)
 st.markdown("<br>", unsafe_allow_html=True)
 
-df_comissionados = df[df["categoria_cargo"] == "comissionado"].drop_duplicates("id_servidor")
-total_masc = (df_comissionados["genero"] == "M").sum()
-total_fem = (df_comissionados["genero"] == "F").sum()
-
-
-total = total_masc + total_fem
-pct_masc = round((total_masc / total) * 100, 1)
-pct_fem = round((total_fem / total) * 100, 1)
-
-
-dados_genero = pd.DataFrame({
-    "genero": ["Masculino", "Feminino"],
-    "quantidade": [total_masc, total_fem],
-    "percentual": [pct_masc, pct_fem]
-})
-
-
-cores_genero = {
-    "Masculino": "#0068c9",
-    "Feminino": "#e377c2"
-}
-
+genero_comissionados = plano["comissionados_genero"]
+total_masc = genero_comissionados["M"]
+total_fem = genero_comissionados["F"]
 
-dados_genero["meio_barra"] = dados_genero["quantidade"] / 2
-dados_genero["percentual_formatado"] = dados_genero["percentual"].round(0).astype(int).astype(str) + "%"
 
-
-cores_genero = {
-    "Masculino": "#0068c9",
-    "Feminino": "#e377c2"
-}
-
-
-chart = (
-    alt.Chart(dados_genero)
-    .mark_bar(size=130)
-    .encode(
-        x=alt.X("genero:N", title="", axis=alt.Axis(labelAngle=0)),
-        y=alt.Y("quantidade:Q", title="Quantidade de Servidores"),
-        color=alt.Color(
-            "genero:N",
-            scale=alt.Scale(domain=list(cores_genero.keys()),
-                            range=list(cores_genero.values())),
-            legend=None
-        ),
-        tooltip=[
-            alt.Tooltip("genero:N", title="Gênero"),
-            alt.Tooltip("quantidade:Q", title="Total"),
-            alt.Tooltip("percentual:Q", title="Percentual (%)", format=".0f")
-        ]
-    )
-    .properties(
-        width=450,
-        height=420,
-        title=alt.TitleParams(
-            text="Distribuição de Servidores Comissionados por Gênero (2025)",
-            anchor="middle",
-            fontSize=16,
-            fontWeight="bold",
-            offset=12
-        )
-    )
+chart = spec_grafico(
+    grafico_comissionados_genero,
+    total_masc,
+    total_fem,
+    f"Distribuição de Servidores Comissionados por Gênero ({ano})",
 )
 
-
-labels_top = (
-    alt.Chart(dados_genero)
-    .mark_text(
-        dy=-12,
-        fontSize=16,
-        fontWeight="bold"
-    )
-    .encode(
-        x="genero:N",
-        y="quantidade:Q",
-        text="quantidade:Q"
-    )
-)
-
-
-labels_inside = (
-    alt.Chart(dados_genero)
-    .mark_text(
-        align="center",
-        baseline="middle",
-        color="white",
-        fontSize=16,
-        fontWeight="bold"
-    )
-    .encode(
-        x="genero:N",
-        y=alt.Y("meio_barra:Q"),
-        text="percentual_formatado:N"
-    )
-)
-
-
-st.altair_chart(chart + labels_top + labels_inside, use_container_width=True)
+st.vega_lite_chart(chart, use_container_width=True)
 st.markdown("<br>", unsafe_allow_html=True)
 
 st.markdown("""
@@ -1014,62 +947,13 @@ st.markdown("""
 """)
 st.markdown("<br>", unsafe_allow_html=True)
 
-df_com_all = df[df["categoria_cargo"] == "comissionado"].copy()
-df_com_all["id_servidor"] = df_com_all["id_servidor"].astype(str)
-df_com_all["cargo"] = df_com_all["cargo"].astype(str)
-
-df_com = df[
-    (df["categoria_cargo"] == "comissionado") &
-    (df["tipo_pagamento"] == "folha_mensal")
-].copy()
+salarios_comissionados = plano["comissionados_salarios"]
+tabela_completa = salarios_comissionados["tabela"]
 
-df_com["proventos"] = pd.to_numeric(df_com["proventos"], errors="coerce")
-df_com = df_com.dropna(subset=["proventos", "id_servidor", "cargo"]).copy()
-df_com["id_servidor"] = df_com["id_servidor"].astype(str)
-df_com["cargo"] = df_com["cargo"].astype(str)
-
-df_com_1por_servidor = (
-    df_com.sort_values(["id_servidor", "proventos"], ascending=[True, False])
-    .drop_duplicates(subset=["id_servidor"], keep="first")
-    .copy()
+tabela_completa = tabela_completa.assign(
+    salario_str=tabela_completa["salario_base_mensal"].apply(br_money)
 )
 
-tabela_competa = (
-    df_com_1por_servidor.groupby("cargo", as_index=False)
-    .agg(
-        salario_base_mensal = ("proventos", "max"),
-        quantidade_pessoas = ("id_servidor", "nunique")
-    )
-)
-
-ids_all = set(df_com_all["id_servidor"].unique())
-ids_fm = set(df_com["id_servidor"].unique())
-faltantes_ids = list(ids_all - ids_fm)
-
-df_faltantes = (
-    df_com_all[df_com_all["id_servidor"].isin(faltantes_ids)][
-        ["id_servidor", "cargo", "tipo_pagamento"]
-    ]
-    .drop_duplicates(subset=["id_servidor"])
-    .copy()
-)
-
-if not df_faltantes.empty:
-    linhas_extra = (
-        df_faltantes.groupby("cargo", as_index=False)
-        .agg(quantidade_pessoas=("id_servidor", "nunique"))
-    )
-    linhas_extra["salario_base_mensal"] = pd.NA
-    tabela_completa = pd.concat([tabela_competa, linhas_extra], ignore_index=True)
-
-tabela_completa["salario_str"] = tabela_completa["salario_base_mensal"].apply(br_money)
-
-tabela_completa = tabela_completa.sort_values(
-    by="salario_base_mensal",
-    ascending=False,
-    na_position="last"
-).reset_index(drop=True)
-
 tabela_exibicao = tabela_completa[
     ["cargo", "salario_str", "quantidade_pessoas"]
 ].rename(
@@ -1082,11 +966,11 @@ tabela_exibicao = tabela_completa[
 
 st.dataframe(tabela_exibicao, use_container_width=True, hide_index=True)
 st.caption(
-    f"Total de Servidores comissionados identificados: {len(ids_all)}.\n"
-    f"Servidores exclusivamente com rescisão em 2025: {len(faltantes_ids)}"
+    f"Total de Servidores comissionados identificados: {salarios_comissionados['total_comissionados']}.\n"
+    f"Servidores exclusivamente com rescisão em {ano}: {salarios_comissionados['somente_rescisao']}"
 )
 
-st.markdown("""
+narrativa("""
 ### Entenda a Estrutura dos Cargos Comissionados em 2025
 
 A lista completa dos cargos comissionados da Prefeitura revela como está distribuída a estrutura de confiança da 
@@ -1114,17 +998,11 @@ mas com um padrão claro: **altas remunerações nos cargos de direção** e **g
 que compõem a espinha administrativa da Prefeitura.
 """)
 
-df_com_gastos = df[df["categoria_cargo"] == "comissionado"].copy()
-
-df_com_gastos["proventos"] = pd.to_numeric(df_com_gastos["proventos"], errors="coerce")
-
-df_com_gastos = df_com_gastos.dropna(subset=["proventos"])
-
-gasto_anual_comissionados = df_com_gastos["proventos"].sum()
+gasto_anual_comissionados = plano["gasto_comissionados"]
 
 gasto_anual_comissionados_str = br_money(gasto_anual_comissionados)
 
-st.markdown("""
+narrativa("""
 ### Quanto custam os cargos comissionados?
 
 Ao longo de 2025, a Prefeitura investiu **R\$ 4.008.750,36** no pagamento de salários, 
@@ -1147,31 +1025,13 @@ st.markdown(f"""
 st.markdown("<br>", unsafe_allow_html=True)
 
 # ============================================
-# CARGA HORÁRIA DOS COMISSIONADOS (2025)
+# CARGA HORÁRIA DOS COMISSIONADOS
 # ============================================
-df_com_unico = (
-    df[df["categoria_cargo"] == "comissionado"]
-    .drop_duplicates(subset="id_servidor")
-    .copy()
-)
+carga_comissionados = plano["carga_horaria_comissionados"]
 
-df_com_unico["carga_horaria_semanal"] = pd.to_numeric(
-    df_com_unico["carga_horaria_semanal"],
-    errors="coerce"
-)
-
-df_ch = df_com_unico.dropna(subset=["carga_horaria_semanal"]).copy()
-
-# metricas
-carga_min = int(df_ch["carga_horaria_semanal"].min())
-carga_max = int(df_ch["carga_horaria_semanal"].max())
-
-# moda
-carga_moda = int(df_ch["carga_horaria_semanal"].mode().iloc[0])
-
-# quantos servidores têm essa carga predominante
-qtd_moda = int((df_ch["carga_horaria_semanal"] == carga_moda).sum())
-total_com = int(df_ch["id_servidor"].nunique())
+carga_min = carga_comissionados["carga_min"]
+carga_max = carga_comissionados["carga_max"]
+carga_moda = carga_comissionados["carga_moda"]
 
 # strings de exibicao
 carga_moda_str = f"{carga_moda}h/sem"
@@ -1220,7 +1080,7 @@ with c3:
 
 st.markdown("<br>", unsafe_allow_html=True)
 
-st.markdown("""
+narrativa("""
 ### O que revela a carga horária dos cargos comissionados
 
 A análise da carga horária semanal dos cargos comissionados mostra um padrão bem definido dentro da Prefeitura. 
@@ -1244,21 +1104,7 @@ st.markdown("""
 # Carga Horária Semanal
 """)
 
-df_unico = df.drop_duplicates(subset="id_servidor").copy()
-
-df_unico["carga_horaria_semanal"] = pd.to_numeric(
-    df_unico["carga_horaria_semanal"],
-    errors="coerce"
-)
-
-cargas_existentes = (
-    df_unico["carga_horaria_semanal"]
-    .dropna()
-    .sort_values()
-    .unique()
-)
-
-st.markdown("""
+narrativa("""
 A Prefeitura de Santa Rita do Passa Quatro adota diferentes modelos de jornada de trabalho entre seus servidores.  
 No levantamento realizado com base nos dados da folha de pagamento de 2025 (considerando cada servidor apenas uma vez), 
 foram encontradas **12 cargas horárias semanais distintas**:
@@ -1296,28 +1142,10 @@ NOME_CATEGORIA = {
 }
 
 
-df_unico = df.drop_duplicates(subset="id_servidor").copy()
-
-df_unico["carga_horaria_semanal"] = pd.to_numeric(
-    df_unico["carga_horaria_semanal"], errors="coerce"
-)
-
+categorias_por_carga = plano["carga_horaria_categorias"]
 
-categorias_por_carga = (
-    df_unico
-    .dropna(subset=["carga_horaria_semanal"])
-    .groupby(["carga_horaria_semanal", "categoria_cargo"])["id_servidor"]
-    .nunique()
-    .reset_index(name="quantidade_servidores")
-)
-
-
-categorias_por_carga["categoria_cargo"] = categorias_por_carga["categoria_cargo"].map(NOME_CATEGORIA)
-
-
-categorias_por_carga = categorias_por_carga.sort_values(
-    ["carga_horaria_semanal", "quantidade_servidores"],
-    ascending=[True, False]
+categorias_por_carga = categorias_por_carga.assign(
+    categoria_cargo=categorias_por_carga["categoria_cargo"].map(NOME_CATEGORIA)
 )
 
 
@@ -1330,7 +1158,7 @@ categorias_por_carga = categorias_por_carga.rename(columns={
 
 st.dataframe(categorias_por_carga, hide_index=True)
 
-st.markdown("""
+narrativa("""
 ## Distribuição das Cargas Horárias por Categoria de Cargo
 
 Após identificar as cargas horárias existentes na Prefeitura, é possível entender como essas jornadas se distribuem entre as diferentes categorias de cargo.  
@@ -1446,48 +1274,28 @@ Essa análise por categoria permite compreender **por que existem jornadas tão
 
 st.divider()
 
-st.markdown("""
-# Desligamento de servidores em 2025
+st.markdown(f"""
+# Desligamento de servidores em {ano}
 """)
 
-df_unico = df.drop_duplicates(subset="id_servidor").copy()
+desligamentos = plano["desligamentos"]
 
-df_unico["data_desligamento"] = pd.to_datetime(
-    df_unico["data_desligamento"],
-    errors="coerce"
+desligados_categoria = desligamentos["por_categoria"].assign(
+    categoria_cargo=lambda d: d["categoria_cargo"].map(NOME_CATEGORIA)
 )
 
-df_desligados_2025 = df_unico[
-    df_unico["data_desligamento"].dt.year == 2025
-].copy()
-
-total_desligados_2025 = df_desligados_2025["id_servidor"].nunique()
-
-total_servidores = df_unico["id_servidor"].nunique()
-
-pct_desligados = round((total_desligados_2025 / total_servidores) * 100, 2)
-
-desligados_categoria = (
-    df_desligados_2025.groupby("categoria_cargo")["id_servidor"]
-    .nunique()
-    .reset_index(name="quantidade_servidores")
-    .sort_values("quantidade_servidores", ascending=False)
-)
-
-desligados_categoria["categoria_cargo"] = desligados_categoria["categoria_cargo"].map(NOME_CATEGORIA)
-
 desligados_categoria = desligados_categoria.rename(columns={
     "categoria_cargo": "Categoria",
     "quantidade_servidores": "Desligados"
 })
 
-st.markdown("""
-### Desligamentos por Categoria de Cargo (2025)
+st.markdown(f"""
+### Desligamentos por Categoria de Cargo ({ano})
 """)
 
 st.dataframe(desligados_categoria, hide_index=True)
 
-st.markdown("""
+narrativa("""
 ### Resumo dos Desligamentos em 2025
 
 Em 2025, a Prefeitura de Santa Rita do Passa Quatro registrou **15 desligamentos** no quadro de servidores.  
@@ -1504,39 +1312,13 @@ st.divider()
 # Servidores com mais tempo de serviço
 # -------------------------------------
 
-df_unico = df.drop_duplicates(subset="id_servidor").copy()
-
-df_unico["data_admissao"] = pd.to_datetime(
-    df_unico["data_admissao"],
-    errors="coerce"
-)
-
-hoje = pd.Timestamp.today()
-
-df_unico["tempo_trabalho_anos"] = (
-    (hoje - df_unico["data_admissao"]).dt.days / 365.25
-).round(0)
-
-servidor_mais_antigo = (
-    df_unico[df_unico["genero"] == "M"]
-    .sort_values("tempo_trabalho_anos", ascending=False)
-    .head(1)
-)
-
-servidora_mais_antiga = (
-    df_unico[df_unico["genero"] == "F"]
-    .sort_values("tempo_trabalho_anos", ascending=False)
-    .head(1)
-)
-
-mais_antigos = pd.concat([
-    servidor_mais_antigo,
-    servidora_mais_antiga
-], axis=0)
+mais_antigos = secao(secoes.servidores_mais_antigos)
 
 st.markdown("""
 # Servidores Mais Antigos da Administração Municipal
+""")
 
+narrativa("""
 O levantamento realizado a partir da base de dados da folha de pagamento de 2025 identificou os servidores 
 com maior tempo de trabalho prestado ao município de Santa Rita do Passa Quatro. A análise considerou apenas vínculos únicos, 
 evitando qualquer duplicidade por `id_servidor`, e calculou o tempo total de serviço com base na data de admissão registrada.
@@ -1569,7 +1351,7 @@ sustentam o funcionamento dos serviços públicos da cidade.
 
 st.divider()
 
-st.markdown("""
+narrativa("""
 # Conclusão Geral
 
 A análise da folha de pagamento da Prefeitura de Santa Rita do Passa Quatro relativa ao ano de 2025 fornece 
@@ -1591,3 +1373,9 @@ análise dos comissionados, tempo de serviço e desligamentos — o estudo cumpr
 O cidadão passa a ter uma visão clara não apenas dos gastos, mas de como o município organiza seu corpo funcional e 
 prioriza suas áreas de atuação.
 """)
+
+# diagnóstico dos caches (?diagnostico na URL)
+if "diagnostico" in st.query_params:
+    st.divider()
+    st.markdown("### Diagnóstico dos caches")
+    st.json({**registro.estatisticas(), "specs_graficos": estatisticas_specs()})
@@ -0,0 +1,246 @@
+"""Aquecimento dos caches do painel.
+
+Calcula antecipadamente, para a visão padrão de uma base, tudo o que a
+primeira execução do painel faria: leitura do parquet, resumo, sketches e
+HyperLogLogs pré-calculados, agregados de todas as seções e specs dos gráficos. Os
+specs ficam no cache de `graficos.spec_grafico`, com os mesmos argumentos
+que o painel usa, e os pré-calculados no cache do processo de
+`carregar_resumo` / `carregar_sketches` / `carregar_hll`, os mesmos que o
+painel consulta.
+Assim nenhum visitante paga por uma execução fria.
+
+`iniciar_vigia` mantém uma thread em segundo plano que verifica o
+fingerprint das bases e repete o aquecimento quando um arquivo muda.
+O painel inicia a vigia na primeira execução; `app/servidor.py` aquece
+antes mesmo de o servidor começar a aceitar conexões.
+"""
+import logging
+import threading
+import time
+
+import pandas as pd
+
+import secoes
+from cache import CacheLimitado
+from anomalias import anomalias_mensais, tipos_padrao, tipos_pagamento
+from contagem_distinta import caminho_hll, ler_hll, tabela_hll
+from dados import fingerprint_dataset
+from equidade import gap_salarial_genero
+from graficos import (
+    COR_FEMININO,
+    COR_MASCULINO,
+    grafico_comissionados_genero,
+    grafico_custo_categoria,
+    grafico_donut_genero,
+    grafico_genero,
+    grafico_histograma_salarios,
+    grafico_top_salarios,
+    spec_grafico,
+    texto_centro_donut,
+)
+from indice_salarios import IndiceSalarios
+from plano import executar_plano
+from registro import Dataset, RegistroDatasets
+from resumo import caminho_resumo, contagem_genero_df, custo_categoria_df, gerar_resumo, ler_resumo
+from simulador import BaseSimulacao
+from sketches import caminho_sketches, ler_sketches, tabela_sketches
+
+log = logging.getLogger(__name__)
+
+# intervalo (s) entre verificações do fingerprint das bases
+INTERVALO_VIGIA = 30.0
+
+# resumo, sketches e HyperLogLogs por base e fingerprint, compartilhados pelas sessões do processo
+_pre_calculados = CacheLimitado(max_entradas=64, ttl=None)
+
+
+def secoes_padrao(dataset: Dataset) -> list[tuple]:
+    """Derivados calculados pela visão padrão do painel (função, *args)."""
+    return [
+        (executar_plano, dataset.ano),
+        (IndiceSalarios,),
+        (gap_salarial_genero,),
+        (BaseSimulacao,),
+        (secoes.servidores_mais_antigos,),
+    ]
+
+
+def _pre_calculado(nome: str, chave: str, fingerprint: str, carregar):
+    chave_cache = f"{nome}:{chave}:{fingerprint}"
+    valor = _pre_calculados.obter(chave_cache)
+    if valor is None:
+        valor = carregar()
+        _pre_calculados.guardar(chave_cache, valor)
+    return valor
+
+
+def carregar_resumo(registro: RegistroDatasets, chave: str) -> dict:
+    """Resumo da base: arquivo pré-calculado ou, se desatualizado, derivado da base."""
+    dataset = registro.dataset(chave)
+    fingerprint = fingerprint_dataset(dataset.path)
+
+    def carregar():
+        resumo = ler_resumo(fingerprint, caminho_resumo(dataset.path))
+        if resumo is None:
+            resumo = registro.derivado(chave, gerar_resumo.__name__, gerar_resumo)
+        return resumo
+
+    return _pre_calculado("resumo", chave, fingerprint, carregar)
+
+
+def carregar_sketches(registro: RegistroDatasets, chave: str) -> pd.DataFrame:
+    """Sketches de salário da base: arquivo pré-calculado ou, se desatualizado, derivados da base."""
+    dataset = registro.dataset(chave)
+    fingerprint = fingerprint_dataset(dataset.path)
+
+    def carregar():
+        tabela = ler_sketches(fingerprint, caminho_sketches(dataset.path))
+        if tabela is None:
+            tabela = registro.derivado(
+                chave, tabela_sketches.__name__, tabela_sketches, dataset.municipio, dataset.uf, dataset.ano
+            )
+        return tabela
+
+    return _pre_calculado("sketches", chave, fingerprint, carregar)
+
+
+def carregar_hll(registro: RegistroDatasets, chave: str) -> pd.DataFrame:
+    """HyperLogLogs de servidores da base: arquivo pré-calculado ou, se desatualizado, derivados da base."""
+    dataset = registro.dataset(chave)
+    fingerprint = fingerprint_dataset(dataset.path)
+
+    def carregar():
+        tabela = ler_hll(fingerprint, caminho_hll(dataset.path))
+        if tabela is None:
+            tabela = registro.derivado(
+                chave, tabela_hll.__name__, tabela_hll, dataset.municipio, dataset.uf, dataset.ano
+            )
+        return tabela
+
+    return _pre_calculado("hll", chave, fingerprint, carregar)
+
+
+def _specs_graficos(registro: RegistroDatasets, chave: str, resumo: dict) -> int:
+    """Specs dos gráficos da visão padrão, com os mesmos argumentos de `app.py`."""
+    def derivado(funcao, *args):
+        return registro.derivado(chave, funcao.__name__, funcao, *args)
+
+    ano = registro.dataset(chave).ano
+    plano = derivado(executar_plano, ano)
+    indice = derivado(IndiceSalarios)
+    genero_com = plano["comissionados_genero"]
+
+    specs = [
+        spec_grafico(grafico_genero, contagem_genero_df(resumo)),
+        spec_grafico(grafico_custo_categoria, custo_categoria_df(resumo)),
+        spec_grafico(
+            grafico_top_salarios, plano["top_salarios"], "Top 10 Maiores Salários", cor=COR_MASCULINO, com_genero=True
+        ),
+        spec_grafico(
+            grafico_top_salarios,
+            plano["top_salarios_masculino"],
+            f"Top 10 Maiores Salários — Servidores do Gênero Masculino ({ano})",
+            cor=COR_MASCULINO,
+        ),
+        spec_grafico(
+            grafico_top_salarios,
+            plano["top_salarios_feminino"],
+            f"Top 10 Maiores Salários — Servidores do Gênero Feminino ({ano})",
+            cor=COR_FEMININO,
+        ),
+        # filtros e faixa padrão do histograma; salário marcado na mediana
+        spec_grafico(
+            grafico_histograma_salarios,
+            indice.histograma(1000, None, None),
+            "Servidores por faixa de salário mensal",
+            cor=COR_MASCULINO,
+            salario_marcado=round(indice.quantil(0.5), 2),
+        ),
+        spec_grafico(
+            grafico_comissionados_genero,
+            genero_com["M"],
+            genero_com["F"],
+            f"Distribuição de Servidores Comissionados por Gênero ({ano})",
+        ),
+    ]
+
+    for linha in plano["perfil_genero_categoria"].itertuples():
+        total = int(linha.total_categoria)
+        specs.append(spec_grafico(
+            grafico_donut_genero, int(linha.total_masculino), int(linha.total_feminino), texto_centro_donut(total)
+        ))
+    return len(specs)
+
+
+def aquecer(registro: RegistroDatasets, chave: str | None = None) -> float:
+    """Aquece base, resumo, agregados e gráficos; devolve a duração em segundos."""
+    chave = chave or registro.padrao.chave
+    dataset = registro.dataset(chave)
+    t0 = time.perf_counter()
+
+    registro.obter(chave)
+    resumo = carregar_resumo(registro, chave)
+    carregar_sketches(registro, chave)
+    carregar_hll(registro, chave)
+
+    for funcao, *args in secoes_padrao(dataset):
+        registro.derivado(chave, funcao.__name__, funcao, *args)
+
+    # anomalias com os tipos de pagamento marcados por padrão (dependem da base)
+    tipos = registro.derivado(chave, tipos_pagamento.__name__, tipos_pagamento)
+    registro.derivado(chave, anomalias_mensais.__name__, anomalias_mensais, tipos_padrao(tipos))
+
+    n_graficos = _specs_graficos(registro, chave, resumo)
+
+    duracao = time.perf_counter() - t0
+    log.info("Cache aquecido para %s em %.2f s (%d gráficos)", dataset.nome, duracao, n_graficos)
+    return duracao
+
+
+class _Vigia(threading.Thread):
+    def __init__(self, registro: RegistroDatasets, intervalo: float):
+        super().__init__(name="aquecimento-vigia", daemon=True)
+        self.registro = registro
+        self.intervalo = intervalo
+        self.fingerprints: dict[str, str] = {}
+
+    def _chaves_vigiadas(self) -> list[str]:
+        # a base padrão e as que já estão carregadas (as que alguém está usando)
+        chaves = [self.registro.padrao.chave]
+        chaves += [c for c in self.registro.estatisticas()["carregadas"] if c not in chaves]
+        return chaves
+
+    def run(self):
+        # as versões atuais já foram (ou estão sendo) aquecidas por quem iniciou a vigia
+        for chave in self._chaves_vigiadas():
+            self.fingerprints[chave] = fingerprint_dataset(self.registro.dataset(chave).path)
+
+        while True:
+            time.sleep(self.intervalo)
+            for chave in self._chaves_vigiadas():
+                try:
+                    fingerprint = fingerprint_dataset(self.registro.dataset(chave).path)
+                    if self.fingerprints.get(chave) != fingerprint:
+                        aquecer(self.registro, chave)
+                        self.fingerprints[chave] = fingerprint
+                except Exception:
+                    # arquivo em meio a uma troca, por exemplo: tenta de novo no próximo ciclo
+                    log.exception("Falha ao aquecer o cache de %s", chave)
+
+
+_vigia: _Vigia | None = None
+_lock_vigia = threading.Lock()
+
+
+def iniciar_vigia(registro: RegistroDatasets, intervalo: float = INTERVALO_VIGIA) -> bool:
+    """Inicia (uma única vez por processo) a thread que reaquece após mudanças na base.
+
+    Devolve True se a vigia foi iniciada nesta chamada.
+    """
+    global _vigia
+    with _lock_vigia:
+        if _vigia is not None:
+            return False
+        _vigia = _Vigia(registro, intervalo)
+        _vigia.start()
+        return True
@@ -0,0 +1,151 @@
+"""Cache limitado para os agregados das seções do painel.
+
+Cada entrada tem prazo de validade (TTL) e o cache como um todo é limitado
+em número de entradas e em bytes. Ao passar de um dos limites, as entradas
+expiradas saem primeiro e depois as menos usadas recentemente, até caber;
+a memória ocupada fica estável mesmo com meses de processo no ar e muitas
+combinações de filtros.
+
+As chaves não serializam os argumentos: DataFrames e Series entram por um
+hash do conteúdo (`pd.util.hash_pandas_object`), calculado uma vez por
+objeto, e os demais valores pela sua representação.
+"""
+import hashlib
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+MAX_ENTRADAS = 256
+TTL_SEGUNDOS = 6 * 3600
+MAX_BYTES = 256 * 2**20
+
+
+def tamanho_em_memoria(obj) -> int:
+    """Estimativa (bytes) do espaço ocupado por uma base ou agregado."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        uso = obj.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(obj, pd.DataFrame) else uso)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(tamanho_em_memoria(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(tamanho_em_memoria(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+# hash de conteúdo por objeto vivo (id -> hash), removido quando o objeto morre
+_hashes_pandas: dict[int, str] = {}
+
+
+def _hash_pandas(obj) -> str:
+    h = _hashes_pandas.get(id(obj))
+    if h is None:
+        conteudo = pd.util.hash_pandas_object(obj, index=True).to_numpy()
+        cabecalho = repr((type(obj).__name__, obj.shape, list(getattr(obj, "columns", [])), str(obj.dtypes)))
+        h = hashlib.sha1(cabecalho.encode("utf-8") + conteudo.tobytes()).hexdigest()
+        _hashes_pandas[id(obj)] = h
+        weakref.finalize(obj, _hashes_pandas.pop, id(obj), None)
+    return h
+
+
+def chave_conteudo(valor) -> str:
+    """Chave barata e estável para um argumento de função de seção."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return _hash_pandas(valor)
+    if isinstance(valor, (list, tuple)):
+        return "(" + ",".join(chave_conteudo(v) for v in valor) + ")"
+    if isinstance(valor, dict):
+        return "{" + ",".join(f"{k!r}:{chave_conteudo(v)}" for k, v in sorted(valor.items())) + "}"
+    return repr(valor)
+
+
+class CacheLimitado:
+    """LRU com TTL, limite de entradas e limite de bytes."""
+
+    def __init__(
+        self,
+        max_entradas: int = MAX_ENTRADAS,
+        ttl: float | None = TTL_SEGUNDOS,
+        max_bytes: int = MAX_BYTES,
+    ):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        # chave -> (valor, tamanho, expira_em)
+        self._entradas: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_em_uso = 0
+
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.descartes = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def _remover(self, chave: str):
+        _, tamanho, _ = self._entradas.pop(chave)
+        self.bytes_em_uso -= tamanho
+
+    def obter(self, chave: str, padrao=None):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[2] < time.monotonic():
+                self._remover(chave)
+                self.expirados += 1
+                entrada = None
+
+            if entrada is None:
+                self.faltas += 1
+                return padrao
+
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[0]
+
+    def guardar(self, chave: str, valor):
+        tamanho = tamanho_em_memoria(valor)
+        expira_em = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            # um valor maior que o cache inteiro não é guardado
+            if tamanho > self.max_bytes:
+                return
+            self._entradas[chave] = (valor, tamanho, expira_em)
+            self.bytes_em_uso += tamanho
+            self._respeitar_limites()
+
+    def _respeitar_limites(self):
+        if len(self._entradas) > self.max_entradas or self.bytes_em_uso > self.max_bytes:
+            agora = time.monotonic()
+            for chave in [c for c, (_, _, expira_em) in self._entradas.items() if expira_em < agora]:
+                self._remover(chave)
+                self.expirados += 1
+
+        while len(self._entradas) > self.max_entradas or self.bytes_em_uso > self.max_bytes:
+            self._remover(next(iter(self._entradas)))
+            self.descartes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_em_uso = 0
+
+    def estatisticas(self) -> dict:
+        consultas = self.acertos + self.faltas
+        return {
+            "entradas": len(self._entradas),
+            "bytes_em_uso": self.bytes_em_uso,
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "expirados": self.expirados,
+            "descartes": self.descartes,
+            "taxa_acerto": round(self.acertos / consultas, 4) if consultas else None,
+        }
@@ -0,0 +1,238 @@
+"""Cache em disco dos agregados das seções, entre reinícios do processo.
+
+Cada resultado derivado de uma base é gravado em
+
+    data/cache/<fingerprint da base>-<versão do código>/<chave>/
+
+com os DataFrames em parquet (Arrow) e os demais valores em `valor.json`.
+Objetos que não cabem nesse formato (índices e bases de simulação, com
+arrays numpy) declaram `persistir_em_disco = False` e ficam só em memória:
+são recalculados da base, em milissegundos, depois de um reinício.
+A versão do código é o hash dos arquivos-fonte do módulo da função e de
+todos os módulos de `app/` dos quais ele depende, direta ou indiretamente
+(por exemplo `plano.py`, `secoes.py` e `categorias_cargo.py` para o plano
+das seções): mudar um cálculo ou uma regra invalida os resultados antigos
+sem precisar limpar nada à mão. Por isso as entradas não expiram por
+tempo: uma entrada só deixa de valer quando a base ou o código mudam, e
+aí o caminho já é outro. Os diretórios de versões antigas são apagados
+quando passam de `MAX_VERSOES`. Um processo recém-iniciado, ou uma nova
+réplica, lê os agregados prontos em milissegundos em vez de recalculá-los.
+
+O diretório pode ser trocado pela variável de ambiente `FOLHA_CACHE_DIR`.
+"""
+import ast
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(os.environ.get("FOLHA_CACHE_DIR", "data/cache"))
+DIRETORIO_APP = Path(__file__).resolve().parent
+
+# muda quando o formato gravado em disco muda
+VERSAO_FORMATO = "2"
+
+# diretórios (fingerprint x versão do código) mantidos; os mais antigos são apagados
+MAX_VERSOES = 16
+
+_versoes_modulo: dict[str, str] = {}
+
+
+def _importados(fonte: str) -> set[str]:
+    """Módulos importados no nível do módulo em `fonte` (`import x`, `from x import y`).
+
+    Imports dentro de funções ficam de fora: no repositório eles só aparecem
+    nos `main()` das linhas de comando, que não entram nos cálculos.
+    """
+    nomes = set()
+    pendentes = list(ast.parse(fonte).body)
+    while pendentes:
+        no = pendentes.pop()
+        if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        pendentes.extend(ast.iter_child_nodes(no))
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name.split(".")[0] for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes.add(no.module.split(".")[0])
+    return nomes
+
+
+def dependencias_app(modulo: str) -> list[Path]:
+    """Arquivo de `modulo` e os módulos de `app/` que ele importa, direta ou indiretamente."""
+    vistos, pendentes = set(), [Path(sys.modules[modulo].__file__).resolve()]
+    while pendentes:
+        arquivo = pendentes.pop()
+        if arquivo in vistos:
+            continue
+        vistos.add(arquivo)
+        for nome in _importados(arquivo.read_text(encoding="utf-8")):
+            dependencia = DIRETORIO_APP / f"{nome}.py"
+            if dependencia.exists():
+                pendentes.append(dependencia)
+    return sorted(vistos)
+
+
+def versao_codigo(funcao) -> str:
+    """Hash dos arquivos-fonte do módulo que define `funcao` e de suas dependências em `app/`."""
+    modulo = funcao.__module__
+    versao = _versoes_modulo.get(modulo)
+    if versao is None:
+        h = hashlib.sha1(VERSAO_FORMATO.encode("utf-8"))
+        for arquivo in dependencias_app(modulo):
+            h.update(f"\n# {arquivo.name}\n".encode("utf-8"))
+            h.update(arquivo.read_bytes())
+        versao = h.hexdigest()[:12]
+        _versoes_modulo[modulo] = versao
+    return versao
+
+
+def persistir_em_disco(funcao) -> bool:
+    """Se o resultado de `funcao` vai para o disco; `persistir_em_disco = False` na função ou classe desliga."""
+    return getattr(funcao, "persistir_em_disco", True)
+
+
+_ESCALARES = (str, int, float, bool, type(None), np.generic)
+
+
+def _json(valor) -> bool:
+    if isinstance(valor, _ESCALARES):
+        return True
+    if isinstance(valor, (list, tuple)):
+        return all(_json(v) for v in valor)
+    if isinstance(valor, dict):
+        return all(isinstance(k, str) and _json(v) for k, v in valor.items())
+    return False
+
+
+def gravavel(valor) -> bool:
+    """Se `valor` cabe no formato em disco: DataFrame, valor JSON ou dict (aninhado) de DataFrames e valores JSON."""
+    if isinstance(valor, pd.DataFrame) or _json(valor):
+        return True
+    return isinstance(valor, dict) and all(isinstance(k, str) and gravavel(v) for k, v in valor.items())
+
+
+def _gravar_valor(valor, destino: Path):
+    if isinstance(valor, pd.DataFrame):
+        valor.to_parquet(destino / "df.parquet")
+        return
+    if isinstance(valor, dict):
+        escalares, tabelas, dicts = {}, [], []
+        for campo, v in valor.items():
+            if isinstance(v, pd.DataFrame):
+                v.to_parquet(destino / f"{campo}.parquet")
+                tabelas.append(campo)
+            elif not _json(v):
+                # dict com DataFrames (uma seção do plano, por exemplo): subdiretório
+                (destino / campo).mkdir()
+                _gravar_valor(v, destino / campo)
+                dicts.append(campo)
+            else:
+                escalares[campo] = v.item() if hasattr(v, "item") else v
+        conteudo = {"tipo": "dict", "escalares": escalares, "tabelas": tabelas, "dicts": dicts}
+    else:
+        conteudo = {"tipo": "valor", "valor": valor.item() if hasattr(valor, "item") else valor}
+
+    (destino / "valor.json").write_text(json.dumps(conteudo, ensure_ascii=False), encoding="utf-8")
+
+
+def _ler_valor(origem: Path):
+    if (origem / "df.parquet").exists():
+        return pd.read_parquet(origem / "df.parquet")
+
+    conteudo = json.loads((origem / "valor.json").read_text(encoding="utf-8"))
+    if conteudo["tipo"] == "valor":
+        return conteudo["valor"]
+
+    valor = dict(conteudo["escalares"])
+    for campo in conteudo["tabelas"]:
+        valor[campo] = pd.read_parquet(origem / f"{campo}.parquet")
+    for campo in conteudo["dicts"]:
+        valor[campo] = _ler_valor(origem / campo)
+    return valor
+
+
+class CacheDisco:
+    """Resultados derivados por (fingerprint da base, versão do código, chave)."""
+
+    def __init__(self, diretorio: Path = CACHE_DIR):
+        self.diretorio = Path(diretorio)
+
+        self.acertos = 0
+        self.faltas = 0
+        self.gravacoes = 0
+        self.ignorados = 0
+        self.erros = 0
+
+    def _caminho(self, fingerprint: str, funcao, chave: str) -> Path:
+        nome = hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
+        return self.diretorio / f"{fingerprint}-{versao_codigo(funcao)}" / nome
+
+    def obter(self, fingerprint: str, funcao, chave: str, padrao=None):
+        caminho = self._caminho(fingerprint, funcao, chave)
+        try:
+            if not caminho.is_dir():
+                self.faltas += 1
+                return padrao
+            valor = _ler_valor(caminho)
+        except (OSError, ValueError, KeyError):
+            # entrada corrompida ou gravada por outra versão: recalcula
+            self.erros += 1
+            return padrao
+
+        self.acertos += 1
+        return valor
+
+    def guardar(self, fingerprint: str, funcao, chave: str, valor):
+        if not gravavel(valor):
+            # objeto fora do formato (sem `persistir_em_disco = False`): fica só em memória
+            self.ignorados += 1
+            return
+
+        caminho = self._caminho(fingerprint, funcao, chave)
+        novo_diretorio = not caminho.parent.exists()
+        tmp = None
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            # grava em um diretório temporário e troca de uma vez (leitores nunca veem meia entrada)
+            tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=caminho.parent))
+            _gravar_valor(valor, tmp)
+            if caminho.exists():
+                shutil.rmtree(caminho, ignore_errors=True)
+            os.replace(tmp, caminho)
+        except (OSError, TypeError, ValueError):
+            # falha de gravação (disco cheio, tipo sem suporte no parquet): fica só em memória
+            self.erros += 1
+            if tmp is not None:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        self.gravacoes += 1
+        if novo_diretorio:
+            self.podar()
+
+    def podar(self, max_versoes: int = MAX_VERSOES):
+        """Apaga os diretórios (base x versão do código) menos recentes."""
+        versoes = sorted(
+            (d for d in self.diretorio.iterdir() if d.is_dir()),
+            key=lambda d: d.stat().st_mtime,
+            reverse=True,
+        )
+        for antigo in versoes[max_versoes:]:
+            shutil.rmtree(antigo, ignore_errors=True)
+
+    def estatisticas(self) -> dict:
+        return {
+            "diretorio": str(self.diretorio),
+            "acertos": self.acertos,
+            "faltas": self.faltas,
+            "gravacoes": self.gravacoes,
+            "ignorados": self.ignorados,
+            "erros": self.erros,
+        }
@@ -0,0 +1,342 @@
+"""Categorização dos cargos por regras compiladas.
+
+As regras de cada município ficam em um dicionário (ou JSON) com cinco
+tipos, aplicados nesta ordem de prioridade:
+
+- `sufixos`: marcadores no fim do cargo (`.C` = comissionado);
+- `exatos`: cargo normalizado inteiro;
+- `prefixos`: início do cargo (vale o prefixo mais longo);
+- `palavras`: palavra inteira em qualquer posição (vale a primeira no texto);
+- `regex`: expressões regulares, na ordem em que aparecem.
+
+`ClassificadorCargos` compila as regras uma vez (dicionário para os
+exatos, trie para os prefixos, uma única expressão regular para todas as
+palavras-chave) e classifica apenas os cargos distintos: a série é
+fatorizada, cada cargo único é normalizado e classificado, e o resultado
+volta às linhas pelo código (`take`). O custo acompanha o número de
+cargos distintos, não o número de pagamentos.
+
+Para outro município, basta um JSON com as mesmas chaves:
+
+    python app/categorias_cargo.py --regras regras-outro-municipio.json
+
+O comando lista os cargos que nenhuma regra alcança.
+"""
+import argparse
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+TIPOS_REGRA = ("sufixos", "exatos", "prefixos", "palavras", "regex")
+
+CATEGORIA_COMISSIONADO = "comissionado"
+
+REGRAS_PADRAO = {
+    # cargos de confiança: o portal marca o fim do nome com ".c"
+    "sufixos": {
+        ".C": CATEGORIA_COMISSIONADO,
+    },
+    "exatos": {
+        # ADMINISTRATIVO / GESTAO
+        "AGENTE ADMINISTRATIVO": "administrativo",
+        "OFICIAL ADMINISTRATIVO": "administrativo",
+        "CONTADOR": "administrativo",
+        "CONTROLADOR INTERNO": "administrativo",
+        "GESTOR DE PLANEJAMENTO": "administrativo",
+        "FISCAL": "administrativo",
+
+        # SAUDE
+        "AGENTE COMUNITARIO DE SAUDE.": "saude",
+        "AGENTE DE COMBATE AS ENDEMIAS": "saude",
+        "AGENTE DE SERVICOS DE SAUDE": "saude",
+        "AGENTE DE VIGILANCIA SANITARIA": "saude",
+        "AUXILIAR DE DENTISTA PSF": "saude",
+        "AUXILIAR DE ENFERMAGEM": "saude",
+        "AUXILIAR DE FARMACIA": "saude",
+        "AUXILIAR DE MEDICOS DENTISTA": "saude",
+        "CIRURGIAO DENTISTA PSF": "saude",
+        "DENTISTA": "saude",
+        "ENFERMEIRO": "saude",
+        "FARMACEUTICO": "saude",
+        "FISIOTERAPEUTA": "saude",
+        "FONOAUDIOLOGA": "saude",
+        "MEDICO": "saude",
+        "MEDICO ANESTESISTA": "saude",
+        "MEDICO CARDIOLOGISTA": "saude",
+        "MEDICO CIRURGIAO": "saude",
+        "MEDICO CLINICO GERAL": "saude",
+        "MEDICO DO TRABALHO": "saude",
+        "MEDICO ENDOCRINOLOGISTA": "saude",
+        "MEDICO GINECOLOGISTA/OBSTETRA": "saude",
+        "MEDICO NEUROLOGISTA ADULTO": "saude",
+        "MEDICO ORTOPEDISTA / TRAUMATOLOGISTA": "saude",
+        "MEDICO PEDIATRA": "saude",
+        "MEDICO PRONTO ATENDIMENTO": "saude",
+        "MEDICO PSF": "saude",
+        "MEDICO PSIQUIATRA ADULTO": "saude",
+        "MEDICO UROLOGISTA": "saude",
+        "NUTRICIONISTA": "saude",
+        "TECNICO EM ENFERMAGEM": "saude",
+        "TECNICO EM NUTRICAO": "saude",
+        "VETERINARIO": "saude",
+
+        # EDUCACAO
+        "AGENTE DE DESENVOLVIMENTO INFANTIL": "educacao",
+        "AUXILIAR DE CRECHE": "educacao",
+        "INSPETOR DE ALUNOS": "educacao",
+        "MERENDEIRA": "educacao",
+        "MONITOR DE EDUCACAO FISICA": "educacao",
+        "MESTRE DE MUSICA": "educacao",
+        "PROFESSOR": "educacao",
+        "PROFESSOR DE EDUCACAO FISICA": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA I - PEB I": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA I - PEB I - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - ARTE - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - CIENCIAS - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - EDUCACAO FISICA PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - GEOGRAFIA - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - INFORMATICA": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - INGLES - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - MATEMATICA - PD": "educacao",
+        "PROFESSOR DE EDUCACAO BASICA II - PORTUGUES - PD": "educacao",
+        "PROFESSOR DE EDUCACAO INFANTIL - PEI - PD": "educacao",
+        "PROFESSOR DE EDUCACAO INFANTIL -PEI": "educacao",
+        "PROFESSOR DE ENSINO ESPECIAL": "educacao",
+        "PROFESSOR DE SALA DE APOIO (PSA) EDUCACAO ESPECIAL - PD": "educacao",
+        "PROFESSOR DE SALA DE APOIO (PSA-EDUC.ESPECIAL)": "educacao",
+        "PROFESSOR EDUC.INFANTIL(CRECHE)-PEI-C": "educacao",
+        "PROFESSOR EDUCACAO BASICA II - ARTE": "educacao",
+        "PROFESSOR EDUCACAO BASICA II - EDUCACAO FISICA": "educacao",
+        "PROFESSOR EDUCACAO BASICA II - GEOGRAFIA": "educacao",
+        "PROFESSOR EDUCACAO BASICA II - LINGUA PORTUGUESA": "educacao",
+        "PROFESSOR ENS FUND-CICLO I - II": "educacao",
+        "PROFESSOR ENS FUND-CICLO III - IV": "educacao",
+        "PROFESSOR SALA DE APOIO (PSA) EDUCACAO ESPECIAL": "educacao",
+
+        # ASSISTENCIA SOCIAL
+        "ASSISTENTE SOCIAL": "assistencia_social",
+        "ATENDENTE SOCIAL": "assistencia_social",
+        "ORIENTADOR SOCIAL": "assistencia_social",
+        "CONSELHEIRO TUTELAR.": "assistencia_social",
+        "AUXILIAR DE CUIDADOR DE CRIANCA - ABRIGO INSTITUCIONAL": "assistencia_social",
+        "SUPERVISOR DE VISITAS": "assistencia_social",
+        "PSICOLOGO": "assistencia_social",
+        "PSICOLOGO INFANTIL": "assistencia_social",
+
+        # OPERACIONAL / SERVICOS GERAIS
+        "AJUDANTE DE ENCANADOR": "operacional",
+        "AJUDANTE DE PEDREIRO": "operacional",
+        "AJUDANTE DE SERVICOS DIVERSOS": "operacional",
+        "AUXILIAR DE MANUTENCAO": "operacional",
+        "AUXILIAR DE SERVICOS EXTERNOS": "operacional",
+        "BORRACHEIRO": "operacional",
+        "CARPINTEIRO": "operacional",
+        "COVEIRO": "operacional",
+        "ELETRICISTA": "operacional",
+        "ENCANADOR": "operacional",
+        "JARDINEIRO": "operacional",
+        "LEITURISTA": "operacional",
+        "LIXEIRO": "operacional",
+        "MECANICO II": "operacional",
+        "MOTORISTA": "operacional",
+        "OPERADOR DA EBA": "operacional",
+        "OPERADOR DE MAQUINA II": "operacional",
+        "OPERADOR DE VACA MECANICA": "operacional",
+        "PADEIRO": "operacional",
+        "PEDREIRO": "operacional",
+        "SERVENTE": "operacional",
+        "VIGIA": "operacional",
+
+        # TECNICO
+        "TECNICO EM INFORMATICA": "tecnico",
+        "TECNICO EM QUIMICA INDUSTRIAL (ETE)": "tecnico",
+        "TECNICO SEGURANCA DO TRABALHO": "tecnico",
+
+        # CULTURA / TURISMO
+        "BIBLIOTECARIA": "cultura",
+        "TURISMOLOGO": "cultura",
+
+        # JURIDICO
+        "PROCURADOR JURIDICO": "juridico",
+
+        # POLITICO / ALTA GESTAO
+        "PREFEITO": "politico",
+        "VICE PREFEITO": "politico",
+    },
+    # alcançam grafias novas dos cargos já conhecidos
+    "prefixos": {
+        "PROFESSOR": "educacao",
+        "MEDICO": "saude",
+        "AGENTE COMUNITARIO DE SAUDE": "saude",
+        "CONSELHEIRO TUTELAR": "assistencia_social",
+    },
+    "palavras": {
+        "ENFERMAGEM": "saude",
+        "ENFERMEIRO": "saude",
+        "DENTISTA": "saude",
+        "FARMACIA": "saude",
+        "CRECHE": "educacao",
+        "ALUNOS": "educacao",
+        "PSICOLOGO": "assistencia_social",
+    },
+    "regex": {
+        r"^(VICE[ -])?PREFEITO$": "politico",
+    },
+}
+
+
+def normalizar_cargo(texto: str) -> str:
+    """Sem acentos, maiúsculo e com espaços simples (o `cargo_norm` da preparação)."""
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = texto.encode("ASCII", "ignore").decode("ASCII")
+    return re.sub(r"\s+", " ", texto.upper().strip())
+
+
+def carregar_regras(path: Path) -> dict:
+    regras = json.loads(Path(path).read_text(encoding="utf-8"))
+    desconhecidos = set(regras) - set(TIPOS_REGRA)
+    if desconhecidos:
+        raise ValueError(f"Tipos de regra desconhecidos: {', '.join(sorted(desconhecidos))}")
+    return regras
+
+
+def categorias_regras(regras: dict) -> list[str]:
+    """Categorias que as regras podem atribuir."""
+    return sorted({categoria for tipo in TIPOS_REGRA for categoria in regras.get(tipo, {}).values()})
+
+
+class _Trie:
+    """Trie de prefixos; `buscar` devolve a categoria do prefixo mais longo."""
+
+    def __init__(self, prefixos: dict[str, str]):
+        self.raiz: dict = {}
+        for prefixo, categoria in prefixos.items():
+            no = self.raiz
+            for caractere in prefixo:
+                no = no.setdefault(caractere, {})
+            no[None] = categoria
+
+    def buscar(self, texto: str) -> str | None:
+        no, encontrada = self.raiz, None
+        for caractere in texto:
+            no = no.get(caractere)
+            if no is None:
+                break
+            encontrada = no.get(None, encontrada)
+        return encontrada
+
+
+class ClassificadorCargos:
+    def __init__(self, regras: dict | None = None):
+        regras = REGRAS_PADRAO if regras is None else regras
+        normalizar = lambda d: {normalizar_cargo(k): v for k, v in d.items()}
+
+        self.sufixos = normalizar(regras.get("sufixos", {}))
+        self.exatos = normalizar(regras.get("exatos", {}))
+        self._prefixos = _Trie(normalizar(regras.get("prefixos", {})))
+
+        self.palavras = normalizar(regras.get("palavras", {}))
+        # uma única expressão para todas as palavras-chave (as mais longas primeiro)
+        alternativas = sorted(self.palavras, key=len, reverse=True)
+        self._palavras = (
+            re.compile(r"\b(?:" + "|".join(map(re.escape, alternativas)) + r")\b") if alternativas else None
+        )
+        self._regex = [(re.compile(padrao), categoria) for padrao, categoria in regras.get("regex", {}).items()]
+
+    def classificar(self, cargo: str) -> tuple[str | None, str | None]:
+        """Categoria e tipo da regra que a definiu (None, None se nenhuma regra alcança)."""
+        texto = normalizar_cargo(cargo)
+        for sufixo, categoria in self.sufixos.items():
+            if texto.endswith(sufixo):
+                return categoria, "sufixos"
+        if texto in self.exatos:
+            return self.exatos[texto], "exatos"
+        categoria = self._prefixos.buscar(texto)
+        if categoria is not None:
+            return categoria, "prefixos"
+        if self._palavras is not None:
+            encontrada = self._palavras.search(texto)
+            if encontrada:
+                return self.palavras[encontrada.group(0)], "palavras"
+        for padrao, categoria in self._regex:
+            if padrao.search(texto):
+                return categoria, "regex"
+        return None, None
+
+    def classificar_distintos(self, cargo: pd.Series) -> tuple[np.ndarray, pd.DataFrame]:
+        """Códigos de cada linha e a classificação de cada cargo distinto."""
+        codigos, distintos = pd.factorize(cargo)
+        classificados = [self.classificar(str(c)) for c in distintos]
+        tabela = pd.DataFrame({
+            "cargo": np.asarray(distintos, dtype="object"),
+            "cargo_norm": [normalizar_cargo(str(c)) for c in distintos],
+            "categoria_cargo": [c for c, _ in classificados],
+            "regra": [r for _, r in classificados],
+        })
+        return codigos, tabela
+
+    def categorizar(self, cargo: pd.Series) -> pd.Series:
+        """Categoria de cada linha (NaN para cargos sem regra e cargos nulos)."""
+        codigos, tabela = self.classificar_distintos(cargo)
+        categorias = np.append(tabela["categoria_cargo"].to_numpy(dtype="object"), None)
+        # código -1 (cargo nulo) aponta para o None acrescentado no fim
+        return pd.Series(categorias.take(codigos), index=cargo.index, name="categoria_cargo", dtype="object")
+
+    def comissionado(self, cargo: pd.Series) -> pd.Series:
+        """Linhas cujo cargo tem marcador de comissionado."""
+        codigos, distintos = pd.factorize(cargo)
+        marcados = [
+            any(normalizar_cargo(str(c)).endswith(s) for s, cat in self.sufixos.items() if cat == CATEGORIA_COMISSIONADO)
+            for c in distintos
+        ]
+        return pd.Series(np.append(np.asarray(marcados, dtype=bool), False).take(codigos), index=cargo.index)
+
+    def relatorio_nao_mapeados(self, cargo: pd.Series) -> pd.DataFrame:
+        """Cargos que nenhuma regra alcança, com o número de linhas de cada um."""
+        codigos, tabela = self.classificar_distintos(cargo)
+        tabela["linhas"] = np.bincount(codigos[codigos >= 0], minlength=len(tabela))
+        return (
+            tabela.loc[tabela["categoria_cargo"].isna(), ["cargo", "cargo_norm", "linhas"]]
+            .sort_values(["linhas", "cargo_norm"], ascending=[False, True])
+            .reset_index(drop=True)
+        )
+
+
+@lru_cache(maxsize=1)
+def classificador_padrao() -> ClassificadorCargos:
+    return ClassificadorCargos(REGRAS_PADRAO)
+
+
+def main():
+    from dados import ler_folha
+    from registro import carregar_catalogo
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--regras", type=Path, help="JSON de regras (padrão: regras de Santa Rita)")
+    args = parser.parse_args()
+
+    regras = carregar_regras(args.regras) if args.regras else None
+    os.chdir(RAIZ_REPO)
+    classificador = ClassificadorCargos(regras)
+
+    for dataset in carregar_catalogo():
+        cargo = ler_folha(dataset.path)["cargo"]
+        _, tabela = classificador.classificar_distintos(cargo)
+        nao_mapeados = classificador.relatorio_nao_mapeados(cargo)
+
+        print(f"{dataset.nome}: {len(tabela)} cargos distintos")
+        print(tabela["regra"].fillna("sem regra").value_counts().to_string())
+        if len(nao_mapeados):
+            print(nao_mapeados.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Contrato de dados da base tratada.
+
+A validação era feita olhando `.info()`, `.describe()`, `isna().sum()` e
+`value_counts()` nos notebooks, e o painel reconvertia colunas com
+`errors="coerce"` e `dropna` por precaução. O contrato declara o que a
+base garante e é verificado na preparação (etapa `validar` do
+`pipeline.py`), antes de o parquet ser gravado:
+
+- esquema: colunas e tipos de `ingestao.ESQUEMA`;
+- `obrigatorio`: colunas sem nulos;
+- `permitidos`: valores aceitos (tipo de pagamento, gênero, categoria...);
+- `intervalo`: mínimo/máximo (valores não negativos, datas no ano);
+- `ordem`: uma coluna não maior que outra (admissão <= desligamento);
+- `identidade`: `liquido = proventos - descontos` (nulos contam como 0);
+- `unico`: combinação de colunas sem repetição (uma folha mensal por
+  servidor por mês).
+
+Cada regra é uma máscara booleana calculada em uma passada vetorizada
+(`pyarrow.compute`) sobre a tabela Arrow, sem conversão para pandas. Regras
+com severidade `erro` reprovam a base; `aviso` só entra no relatório
+(situações reais do portal, como homônimos com dois vínculos). A base atual
+é verificada em poucos milissegundos, dentro de `ORCAMENTO_SEGUNDOS`.
+
+    python app/contrato.py
+    python app/contrato.py /tmp/folha-sintetica.parquet
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from categorias_cargo import REGRAS_PADRAO, categorias_regras
+from indice_genero import GENEROS
+from ingestao import ESQUEMA
+from layout_parquet import COLUNA_POSICAO
+from preparacao import ORDEM_MESES, TIPOS_PAGAMENTO
+from secoes import ANO_REFERENCIA
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+TIPOS_REGRA = ("obrigatorio", "permitidos", "intervalo", "ordem", "identidade", "unico")
+SEVERIDADES = ("erro", "aviso")
+
+# proventos é nulo em algumas linhas do portal; data_desligamento só para desligados
+COLUNAS_OBRIGATORIAS = (
+    "id_servidor",
+    "genero",
+    "cargo",
+    "categoria_cargo",
+    "tipo_pagamento",
+    "descontos",
+    "liquido",
+    "carga_horaria_semanal",
+    "data_admissao",
+    "status_servidor",
+    "mes",
+)
+
+# tempo máximo da validação completa na escala atual
+ORCAMENTO_SEGUNDOS = 1.0
+
+
+@dataclass(frozen=True)
+class Regra:
+    tipo: str
+    colunas: tuple[str, ...]
+    valores: tuple | None = None
+    minimo: object = None
+    maximo: object = None
+    tolerancia: float = 0.0
+    # só as linhas com `coluna == valor` são verificadas
+    filtro: tuple[str, object] | None = None
+    severidade: str = "erro"
+
+    def __post_init__(self):
+        if self.tipo not in TIPOS_REGRA:
+            raise ValueError(f"Tipo de regra desconhecido: {self.tipo!r} (use {', '.join(TIPOS_REGRA)})")
+        if self.severidade not in SEVERIDADES:
+            raise ValueError(f"Severidade desconhecida: {self.severidade!r} (use {', '.join(SEVERIDADES)})")
+
+    @property
+    def nome(self) -> str:
+        nome = f"{self.tipo}({', '.join(self.colunas)})"
+        return f"{nome} onde {self.filtro[0]} = {self.filtro[1]}" if self.filtro else nome
+
+
+def contrato_padrao(ano: int = ANO_REFERENCIA, regras_cargo: dict = REGRAS_PADRAO) -> list[Regra]:
+    inicio_ano, fim_ano = f"{ano}-01-01", f"{ano}-12-31"
+    return [
+        *[Regra("obrigatorio", (coluna,)) for coluna in COLUNAS_OBRIGATORIAS],
+        Regra("permitidos", ("tipo_pagamento",), valores=tuple(TIPOS_PAGAMENTO.values())),
+        Regra("permitidos", ("genero",), valores=GENEROS),
+        Regra("permitidos", ("categoria_cargo",), valores=tuple(categorias_regras(regras_cargo))),
+        Regra("permitidos", ("status_servidor",), valores=("ATIVO", "DESLIGADO")),
+        Regra("permitidos", ("mes",), valores=tuple(ORDEM_MESES)),
+        Regra("intervalo", ("proventos",), minimo=0.0),
+        Regra("intervalo", ("descontos",), minimo=0.0),
+        # descontos maiores que os proventos do mês (acerto de faltas, p. ex.)
+        Regra("intervalo", ("liquido",), minimo=0.0, severidade="aviso"),
+        Regra("intervalo", ("carga_horaria_semanal",), minimo=1, maximo=168),
+        Regra("intervalo", ("data_admissao",), minimo="1900-01-01", maximo=fim_ano),
+        Regra("intervalo", ("data_desligamento",), minimo=inicio_ano, maximo=fim_ano),
+        Regra("ordem", ("data_admissao", "data_desligamento")),
+        Regra("identidade", ("proventos", "descontos", "liquido"), tolerancia=0.01),
+        # id_servidor é o hash do nome: homônimos e servidores com dois vínculos repetem
+        Regra("unico", ("id_servidor", "mes"), filtro=("tipo_pagamento", "folha_mensal"), severidade="aviso"),
+    ]
+
+
+CONTRATO_PADRAO = contrato_padrao()
+
+
+# ---------------------------------------------
+# Verificações (máscara das linhas que violam a regra)
+# ---------------------------------------------
+def _mascara(valores) -> np.ndarray:
+    return pc.fill_null(valores, False).to_numpy(zero_copy_only=False)
+
+
+def _escalar(valor, tipo: pa.DataType):
+    if pa.types.is_timestamp(tipo):
+        return pa.scalar(pd.Timestamp(valor), type=tipo)
+    return pa.scalar(valor, type=tipo)
+
+
+def _obrigatorio(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    mascara = np.zeros(len(tabela), dtype=bool)
+    for coluna in regra.colunas:
+        mascara |= _mascara(pc.is_null(tabela[coluna]))
+    return mascara
+
+
+def _permitidos(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    coluna = tabela[regra.colunas[0]]
+    if pa.types.is_dictionary(coluna.type):
+        coluna = coluna.cast(coluna.type.value_type)
+    valores = pa.array(regra.valores, type=coluna.type)
+    return _mascara(pc.and_(pc.is_valid(coluna), pc.invert(pc.is_in(coluna, value_set=valores))))
+
+
+def _intervalo(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    coluna = tabela[regra.colunas[0]]
+    mascara = pa.chunked_array([pa.array(np.zeros(len(tabela), dtype=bool))])
+    if regra.minimo is not None:
+        mascara = pc.or_(mascara, pc.less(coluna, _escalar(regra.minimo, coluna.type)))
+    if regra.maximo is not None:
+        mascara = pc.or_(mascara, pc.greater(coluna, _escalar(regra.maximo, coluna.type)))
+    return _mascara(mascara)
+
+
+def _ordem(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    antes, depois = regra.colunas
+    return _mascara(pc.greater(tabela[antes], tabela[depois]))
+
+
+def _identidade(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    proventos, descontos, liquido = (pc.fill_null(tabela[c], 0.0) for c in regra.colunas)
+    diferenca = pc.abs(pc.subtract(pc.subtract(proventos, descontos), liquido))
+    return _mascara(pc.greater(diferenca, regra.tolerancia))
+
+
+def _unico(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    # cada coluna vira códigos inteiros; a combinação é um único inteiro por linha
+    chave = np.zeros(len(tabela), dtype=np.int64)
+    for c in regra.colunas:
+        codificada = pc.dictionary_encode(tabela[c]).combine_chunks()
+        codigos = pc.fill_null(codificada.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64)
+        chave = chave * (len(codificada.dictionary) + 1) + codigos + 1
+
+    mascara = np.zeros(len(tabela), dtype=bool)
+    linhas = np.flatnonzero(_filtro(tabela, regra))
+    _, primeiras = np.unique(chave[linhas], return_index=True)
+    # repetições além da primeira ocorrência (como `duplicated`)
+    mascara[linhas] = True
+    mascara[linhas[primeiras]] = False
+    return mascara
+
+
+_VERIFICACOES = {
+    "obrigatorio": _obrigatorio,
+    "permitidos": _permitidos,
+    "intervalo": _intervalo,
+    "ordem": _ordem,
+    "identidade": _identidade,
+    "unico": _unico,
+}
+
+
+def _filtro(tabela: pa.Table, regra: Regra) -> np.ndarray:
+    if regra.filtro is None:
+        return np.ones(len(tabela), dtype=bool)
+    coluna, valor = regra.filtro
+    return _mascara(pc.equal(tabela[coluna], valor))
+
+
+def verificar_esquema(tabela: pa.Table, esquema: pa.Schema = ESQUEMA) -> list[str]:
+    """Colunas ausentes ou com tipo diferente do esperado (colunas extras são aceitas)."""
+    problemas = []
+    for campo in esquema:
+        if campo.name not in tabela.column_names:
+            problemas.append(f"{campo.name}: ausente")
+            continue
+        tipo = tabela.schema.field(campo.name).type
+        # texto gravado com dicionário continua sendo texto
+        if pa.types.is_dictionary(tipo) and not pa.types.is_dictionary(campo.type):
+            tipo = tipo.value_type
+        if tipo != campo.type:
+            problemas.append(f"{campo.name}: {tipo} (esperado {campo.type})")
+    return problemas
+
+
+# ---------------------------------------------
+# Validação
+# ---------------------------------------------
+@dataclass
+class Relatorio:
+    tabela: pd.DataFrame
+    linhas: int
+    segundos: float
+
+    @property
+    def erros(self) -> pd.DataFrame:
+        return self.tabela[(self.tabela["severidade"] == "erro") & (self.tabela["violacoes"] > 0)]
+
+    @property
+    def aprovado(self) -> bool:
+        return self.erros.empty
+
+    def exigir(self) -> "Relatorio":
+        """Levanta ValueError se alguma regra de severidade `erro` foi violada."""
+        if not self.aprovado:
+            falhas = "; ".join(f"{r.regra}: {r.violacoes} linhas" for r in self.erros.itertuples())
+            raise ValueError(f"Base fora do contrato: {falhas}")
+        return self
+
+
+def _como_tabela(dados) -> pa.Table:
+    if isinstance(dados, pa.Table):
+        return dados
+    if isinstance(dados, pd.DataFrame):
+        return pa.Table.from_pandas(dados, preserve_index=False)
+    return pq.read_table(dados)
+
+
+def validar(dados, contrato: list[Regra] = CONTRATO_PADRAO, esquema: pa.Schema = ESQUEMA) -> Relatorio:
+    """Verifica o contrato sobre um DataFrame, uma tabela Arrow ou um parquet.
+
+    O exemplo de cada regra é a posição da primeira linha que a viola, na
+    ordem original da base (antes do agrupamento do layout).
+    """
+    inicio = time.perf_counter()
+    tabela = _como_tabela(dados)
+    for i, campo in enumerate(tabela.schema):
+        # coluna só com nulos (sem tipo na conversão do pandas): os nulos são apontados pelas regras
+        if pa.types.is_null(campo.type) and campo.name in esquema.names:
+            tabela = tabela.set_column(i, campo.name, tabela[i].cast(esquema.field(campo.name).type))
+    posicoes = tabela[COLUNA_POSICAO].to_numpy() if COLUNA_POSICAO in tabela.column_names else None
+
+    problemas = verificar_esquema(tabela, esquema)
+    linhas = [
+        {"regra": f"esquema({problema})", "severidade": "erro", "violacoes": 1, "exemplo": None}
+        for problema in problemas
+    ]
+    fora_do_esquema = {problema.split(":")[0] for problema in problemas}
+    for regra in contrato:
+        if any(c not in tabela.column_names or c in fora_do_esquema for c in regra.colunas):
+            # coluna ausente ou com outro tipo: já aparece na verificação do esquema
+            continue
+        mascara = _VERIFICACOES[regra.tipo](tabela, regra) & _filtro(tabela, regra)
+        violacoes = np.flatnonzero(mascara)
+        exemplo = None
+        if len(violacoes):
+            exemplo = int(posicoes[violacoes].min() if posicoes is not None else violacoes[0])
+        linhas.append({
+            "regra": regra.nome,
+            "severidade": regra.severidade,
+            "violacoes": len(violacoes),
+            "exemplo": exemplo,
+        })
+
+    relatorio = pd.DataFrame(linhas, columns=["regra", "severidade", "violacoes", "exemplo"])
+    relatorio["exemplo"] = relatorio["exemplo"].astype("Int64")
+    return Relatorio(relatorio, tabela.num_rows, time.perf_counter() - inicio)
+
+
+def main():
+    from dados import DATA_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("parquet", type=Path, nargs="?", help="base tratada (padrão: a base do painel)")
+    parser.add_argument("--ano", type=int, default=ANO_REFERENCIA, help="ano de referência das datas")
+    args = parser.parse_args()
+
+    path = args.parquet.resolve() if args.parquet else None
+    os.chdir(RAIZ_REPO)
+
+    relatorio = validar(path or DATA_PATH, contrato_padrao(args.ano))
+    with pd.option_context("display.width", 120):
+        print(relatorio.tabela.to_string(index=False))
+
+    situacao = "aprovada" if relatorio.aprovado else "REPROVADA"
+    orcamento = "" if relatorio.segundos <= ORCAMENTO_SEGUNDOS else f" (acima do orçamento de {ORCAMENTO_SEGUNDOS:.1f} s)"
+    print(f"{relatorio.linhas:,} linhas, base {situacao} em {relatorio.segundos * 1000:.0f} ms{orcamento}")
+    sys.exit(0 if relatorio.aprovado else 1)
+
+
+if __name__ == "__main__":
+    main()
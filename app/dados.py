@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from layout_parquet import restaurar_ordem
+from preparacao import ORDEM_MESES
+
+
+# FOLHA_DATA_PATH permite apontar o painel para outra base (ex.: sintética)
+DATA_PATH = Path(os.environ.get("FOLHA_DATA_PATH", "data/processed/folha-pagamento-2025.parquet"))
+LOGO_PATH = Path("assets/images/santa-rita-data.png")
+
+
+# bytes finais do arquivo usados no fingerprint (o rodapé do parquet
+# guarda esquema, row groups e estatísticas de cada coluna)
+BYTES_FINGERPRINT = 64 * 1024
+
+
+def fingerprint_dataset(path: Path = DATA_PATH) -> str:
+    """Identificador barato da versão do arquivo de dados.
+
+    Combina o tamanho do arquivo com o hash dos seus últimos bytes (o
+    rodapé do parquet). Não depende do tamanho da base nem do mtime, então
+    permanece estável entre clones e deploys do mesmo arquivo.
+    """
+    path = Path(path)
+    tamanho = path.stat().st_size
+
+    h = hashlib.sha1(str(tamanho).encode("utf-8"))
+    with open(path, "rb") as f:
+        f.seek(max(0, tamanho - BYTES_FINGERPRINT))
+        h.update(f.read())
+
+    return h.hexdigest()[:16]
+
+
+def ler_folha(path: Path = DATA_PATH, filtros=None) -> pd.DataFrame:
+    """Base tratada, na ordem original das linhas.
+
+    `filtros` (formato de `pd.read_parquet`) é aplicado na leitura: com o
+    layout agrupado, os row groups descartados pelas estatísticas nem
+    chegam a ser descomprimidos.
+    """
+    return tipar_folha(restaurar_ordem(pd.read_parquet(path, filters=filtros)))
+
+
+def tipar_folha(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante os tipos da base: datas, carga horária inteira e `mes` ordenado.
+
+    O parquet já guarda esses tipos; a conversão só acontece quando a
+    coluna chega diferente (leitura filtrada sem algum mês, arquivos
+    antigos), então em geral não custa nada.
+    """
+    tipos_mes = pd.CategoricalDtype(ORDEM_MESES, ordered=True)
+    conversoes = {}
+    if "mes" in df.columns and df["mes"].dtype != tipos_mes:
+        conversoes["mes"] = pd.Categorical(df["mes"].astype("string"), categories=ORDEM_MESES, ordered=True)
+    for coluna in ("data_admissao", "data_desligamento"):
+        if coluna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            conversoes[coluna] = pd.to_datetime(df[coluna], errors="coerce")
+    if "carga_horaria_semanal" in df.columns and df["carga_horaria_semanal"].dtype != "Int64":
+        conversoes["carga_horaria_semanal"] = pd.to_numeric(df["carga_horaria_semanal"], errors="coerce").astype("Int64")
+    return df.assign(**conversoes) if conversoes else df
+
+
+def copia_compartilhada(df: pd.DataFrame) -> pd.DataFrame:
+    """Cópia de uma base compartilhada para quem a recebe.
+
+    Com copy-on-write (ligado pelos pontos de entrada do painel, `app.py` e
+    `servidor.py`) é uma cópia rasa: os dados não são duplicados e o que
+    quem recebe alterar fica só na cópia dele. Sem copy-on-write (notebooks,
+    scripts) a cópia é completa, para que uma atribuição no lugar não altere
+    a base guardada.
+    """
+    return df.copy(deep=not pd.get_option("mode.copy_on_write"))
+
+
+# bases já lidas neste processo: caminho -> (fingerprint, DataFrame)
+_CARREGADAS: dict[Path, tuple[str, pd.DataFrame]] = {}
+_LOCK_CARREGADAS = threading.Lock()
+
+
+def carregar_folha(path: Path = DATA_PATH) -> pd.DataFrame:
+    """Base tratada e tipada, lida uma vez por processo.
+
+    Para os notebooks e scripts: a primeira chamada lê o parquet, as
+    seguintes devolvem a mesma base (`copia_compartilhada`) enquanto o
+    fingerprint do arquivo não mudar. O painel lê pelo `registro`, que
+    aplica o próprio orçamento de memória sobre `ler_folha`.
+    """
+    path = Path(path).resolve()
+    fingerprint = fingerprint_dataset(path)
+
+    with _LOCK_CARREGADAS:
+        carregada = _CARREGADAS.get(path)
+        if carregada is None or carregada[0] != fingerprint:
+            carregada = _CARREGADAS[path] = (fingerprint, ler_folha(path))
+    return copia_compartilhada(carregada[1])
@@ -0,0 +1,454 @@
+"""Verificação diferencial dos motores otimizados contra a referência pandas.
+
+Os números publicados no painel (total de proventos, gasto com
+comissionados, rankings de salários...) vêm das funções de `secoes.py`,
+em pandas. Todo caminho mais rápido para as mesmas seções é um "motor":
+
+- `arrow`: kernels do `pyarrow.compute` sobre a tabela Arrow da base;
+- `leitura_filtrada`: a mesma função de `secoes.py`, sobre a leitura do
+  parquet só com as linhas que a seção usa (row groups descartados pelo
+  layout agrupado, `layout_parquet.py`);
+- `resumo`: o resumo pré-calculado da primeira pintura (`resumo.py`);
+- `hll`: contagens distintas por HyperLogLog (`contagem_distinta.py`);
+- `plano`: as seções declaradas em `plano.py`, executadas juntas.
+
+Cada seção roda na referência e em cada motor que a implementa, sobre a
+base real e sobre bases sintéticas (`teste_carga.gerar_base_sintetica`). Os
+resultados são comparados com tolerância por tipo de valor (dinheiro em
+float, contagens) e o relatório traz, por seção e motor, se bateu, a
+primeira diferença e o ganho de tempo (mediana de várias execuções).
+
+Um novo motor é um `Motor` em `MOTORES`: uma função que prepara a estrutura
+dele a partir da base e uma função por seção. A preparação fica fora da
+medição por seção quando é só uma conversão da base (tabela Arrow, caminho
+do parquet). Nos motores pré-calculados (`resumo`, `hll`, `plano`) é ela
+que calcula as seções: o tempo de cada seção inclui a preparação inteira,
+e uma linha `(todas)` compara a preparação mais todas as consultas com a
+soma dos tempos da referência nas mesmas seções.
+
+    python app/diferencial.py
+    python app/diferencial.py --sintetico 5 20 --motores arrow leitura_filtrada
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import secoes
+from contagem_distinta import PRECISAO, contar, tabela_hll
+from dados import ler_folha
+from layout_parquet import LAYOUTS, escrever_folha
+from plano import PLANO_PADRAO, executar_plano
+from resumo import contagem_genero_df, custo_categoria_df, gerar_resumo
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+
+# ---------------------------------------------
+# Referência (pandas)
+# ---------------------------------------------
+SECOES = {
+    "total_servidores": lambda df: int(df["id_servidor"].nunique()),
+    "total_proventos": lambda df: float(df["proventos"].sum()),
+    "contagem_genero": secoes.contagem_genero,
+    "perfil_genero_categoria": secoes.perfil_genero_categoria,
+    "custo_por_categoria": secoes.custo_por_categoria,
+    "top_salarios": secoes.top_salarios,
+    "top_salarios_feminino": partial(secoes.top_salarios, genero="F"),
+    "top_salarios_masculino": partial(secoes.top_salarios, genero="M"),
+    "comissionados_lista": secoes.comissionados_lista,
+    "comissionados_genero": secoes.comissionados_genero,
+    "comissionados_salarios": secoes.comissionados_salarios,
+    "gasto_comissionados": secoes.gasto_comissionados,
+    "carga_horaria_comissionados": secoes.carga_horaria_comissionados,
+    "carga_horaria_categorias": secoes.carga_horaria_categorias,
+    "desligamentos": secoes.desligamentos,
+}
+
+
+def _por_chave(*colunas: str):
+    """A ordem das linhas não faz parte do resultado: compara ordenado pela chave."""
+    return lambda r: r.sort_values(list(colunas)).reset_index(drop=True)
+
+
+# normalização aplicada à referência e aos motores antes da comparação
+NORMALIZACOES = {
+    "contagem_genero": _por_chave("genero"),
+    "custo_por_categoria": _por_chave("categoria_cargo"),
+}
+
+
+@dataclass(frozen=True)
+class Tolerancia:
+    # dinheiro e demais floats: |a - b| <= dinheiro_abs + dinheiro_rel * |a|
+    dinheiro_abs: float = 0.01
+    dinheiro_rel: float = 1e-9
+    # contagens: |a - b| <= contagem_rel * a
+    contagem_rel: float = 0.0
+
+
+@dataclass(frozen=True)
+class Motor:
+    nome: str
+    # (base, parquet da base) -> estrutura usada pelas seções do motor
+    preparar: object
+    secoes: dict = field(default_factory=dict)
+    tolerancia: Tolerancia = Tolerancia()
+    # a preparação já calcula as seções: entra no tempo medido
+    pre_calculado: bool = False
+
+
+# ---------------------------------------------
+# Motor Arrow
+# ---------------------------------------------
+def _soma(valores) -> float:
+    return pc.sum(valores, min_count=0).as_py()
+
+
+def _primeiro_por_servidor(tabela: pa.Table, colunas: list[str]) -> pa.Table:
+    """Primeira linha de cada servidor (como `drop_duplicates`), na ordem da tabela."""
+    agregado = tabela.group_by("id_servidor", use_threads=False).aggregate([(c, "first") for c in colunas])
+    return agregado.rename_columns(["id_servidor", *colunas])
+
+
+def _arrow_contagem_genero(tabela: pa.Table) -> pd.DataFrame:
+    contagens = pc.value_counts(_primeiro_por_servidor(tabela, ["genero"])["genero"])
+    return (
+        pd.DataFrame({
+            "genero": contagens.field("values").to_pylist(),
+            "total_servidores": contagens.field("counts").to_numpy(),
+        })
+        .sort_values("total_servidores", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def _arrow_custo_por_categoria(tabela: pa.Table) -> pd.DataFrame:
+    custo = (
+        tabela.group_by("categoria_cargo")
+        .aggregate([("proventos", "sum", pc.ScalarAggregateOptions(min_count=0))])
+        .sort_by([("proventos_sum", "descending")])
+    )
+    return pd.DataFrame({
+        "categoria_cargo": custo["categoria_cargo"].to_pylist(),
+        "custo_folha_anual_categoria": custo["proventos_sum"].to_numpy(),
+    })
+
+
+def _arrow_gasto_comissionados(tabela: pa.Table) -> float:
+    return float(_soma(tabela.filter(pc.equal(tabela["categoria_cargo"], "comissionado"))["proventos"]))
+
+
+def _arrow_top_salarios(tabela: pa.Table, genero: str | None = None, n: int = 10) -> pd.DataFrame:
+    filtro = pc.equal(tabela["tipo_pagamento"], "folha_mensal")
+    if genero is not None:
+        filtro = pc.and_(filtro, pc.equal(tabela["genero"], genero))
+
+    # maior salário de cada servidor: ordena por servidor e salário e fica com a primeira linha
+    mensal = tabela.filter(filtro).sort_by([("id_servidor", "ascending"), ("proventos", "descending")])
+    colunas = ["cargo", "proventos"] + (["genero"] if genero is None else [])
+    unico = _primeiro_por_servidor(mensal, colunas)
+
+    top = unico.sort_by([("proventos", "descending"), ("id_servidor", "ascending")]).slice(0, n)
+    resultado = pd.DataFrame({
+        "id_servidor": top["id_servidor"].to_pylist(),
+        "cargo": top["cargo"].to_pylist(),
+        **({"genero": top["genero"].to_pylist()} if genero is None else {}),
+        "salario_maximo": top["proventos"].to_numpy(),
+    })
+    resultado["rank"] = resultado.index + 1
+    return resultado
+
+
+MOTOR_ARROW = Motor(
+    "arrow",
+    preparar=lambda df, path: pa.Table.from_pandas(df, preserve_index=False),
+    secoes={
+        "total_servidores": lambda t: pc.count_distinct(t["id_servidor"]).as_py(),
+        "total_proventos": lambda t: float(_soma(t["proventos"])),
+        "contagem_genero": _arrow_contagem_genero,
+        "custo_por_categoria": _arrow_custo_por_categoria,
+        "top_salarios": _arrow_top_salarios,
+        "top_salarios_feminino": partial(_arrow_top_salarios, genero="F"),
+        "top_salarios_masculino": partial(_arrow_top_salarios, genero="M"),
+        "gasto_comissionados": _arrow_gasto_comissionados,
+    },
+)
+
+
+# ---------------------------------------------
+# Motor de leitura filtrada (pushdown no parquet)
+# ---------------------------------------------
+def _filtrada(funcao, filtros):
+    return lambda path: funcao(ler_folha(path, filtros=filtros))
+
+
+_COMISSIONADOS = [("categoria_cargo", "==", "comissionado")]
+_FOLHA_MENSAL = [("tipo_pagamento", "==", "folha_mensal")]
+
+MOTOR_LEITURA_FILTRADA = Motor(
+    "leitura_filtrada",
+    preparar=lambda df, path: path,
+    secoes={
+        "top_salarios": _filtrada(secoes.top_salarios, _FOLHA_MENSAL),
+        "top_salarios_feminino": _filtrada(partial(secoes.top_salarios, genero="F"), _FOLHA_MENSAL),
+        "top_salarios_masculino": _filtrada(partial(secoes.top_salarios, genero="M"), _FOLHA_MENSAL),
+        "comissionados_genero": _filtrada(secoes.comissionados_genero, _COMISSIONADOS),
+        "comissionados_salarios": _filtrada(secoes.comissionados_salarios, _COMISSIONADOS),
+        "gasto_comissionados": _filtrada(secoes.gasto_comissionados, _COMISSIONADOS),
+        "carga_horaria_comissionados": _filtrada(secoes.carga_horaria_comissionados, _COMISSIONADOS),
+    },
+)
+
+
+# ---------------------------------------------
+# Motores pré-calculados
+# ---------------------------------------------
+MOTOR_RESUMO = Motor(
+    "resumo",
+    preparar=lambda df, path: gerar_resumo(df),
+    secoes={
+        "total_servidores": lambda r: r["total_servidores"],
+        "total_proventos": lambda r: r["total_proventos"],
+        "contagem_genero": contagem_genero_df,
+        "custo_por_categoria": custo_categoria_df,
+    },
+    pre_calculado=True,
+)
+
+
+def _hll_contagem_genero(tabela: pd.DataFrame) -> pd.DataFrame:
+    generos = sorted(tabela["genero"].dropna().unique())
+    return pd.DataFrame({"genero": generos, "total_servidores": [contar(tabela, genero=g) for g in generos]})
+
+
+MOTOR_HLL = Motor(
+    "hll",
+    preparar=lambda df, path: tabela_hll(df, "", "", 0),
+    secoes={
+        "total_servidores": lambda tabela: contar(tabela),
+        "contagem_genero": _hll_contagem_genero,
+    },
+    # três erros padrão do HyperLogLog
+    tolerancia=Tolerancia(contagem_rel=3 * 1.04 / np.sqrt(2**PRECISAO)),
+    pre_calculado=True,
+)
+
+
+MOTOR_PLANO = Motor(
+    "plano",
+    preparar=lambda df, path: executar_plano(df),
+    secoes={s.nome: (lambda nome: lambda resultados: resultados[nome])(s.nome) for s in PLANO_PADRAO.secoes},
+    pre_calculado=True,
+)
+
+
+MOTORES = {m.nome: m for m in (MOTOR_ARROW, MOTOR_LEITURA_FILTRADA, MOTOR_RESUMO, MOTOR_HLL, MOTOR_PLANO)}
+
+
+# ---------------------------------------------
+# Comparação
+# ---------------------------------------------
+def _inteiro(valor) -> bool:
+    return isinstance(valor, (int, np.integer)) and not isinstance(valor, (bool, np.bool_))
+
+
+def _comparar_numeros(esperado: np.ndarray, obtido: np.ndarray, contagem: bool, tolerancia: Tolerancia) -> np.ndarray:
+    """Posições fora da tolerância (nulos só batem com nulos)."""
+    nulos = np.isnan(esperado) | np.isnan(obtido)
+    if contagem:
+        limite = tolerancia.contagem_rel * np.abs(esperado)
+    else:
+        limite = tolerancia.dinheiro_abs + tolerancia.dinheiro_rel * np.abs(esperado)
+    fora = np.abs(esperado - obtido) > limite
+    return np.where(nulos, np.isnan(esperado) != np.isnan(obtido), fora)
+
+
+def _comparar_tabelas(esperado: pd.DataFrame, obtido: pd.DataFrame, tolerancia: Tolerancia, caminho: str) -> list[str]:
+    if list(esperado.columns) != list(obtido.columns):
+        return [f"{caminho}: colunas {list(obtido.columns)} (esperado {list(esperado.columns)})"]
+    if len(esperado) != len(obtido):
+        return [f"{caminho}: {len(obtido)} linhas (esperado {len(esperado)})"]
+
+    diferencas = []
+    for coluna in esperado.columns:
+        a, b = esperado[coluna].reset_index(drop=True), obtido[coluna].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b) and not pd.api.types.is_bool_dtype(a):
+            fora = _comparar_numeros(
+                a.to_numpy(dtype="float64", na_value=np.nan),
+                b.to_numpy(dtype="float64", na_value=np.nan),
+                pd.api.types.is_integer_dtype(a),
+                tolerancia,
+            )
+        else:
+            fora = (a.astype(str) != b.astype(str)).to_numpy()
+        if fora.any():
+            i = int(np.flatnonzero(fora)[0])
+            diferencas.append(f"{caminho}[{i}].{coluna}: {b.iloc[i]!r} (esperado {a.iloc[i]!r})")
+    return diferencas
+
+
+def comparar(esperado, obtido, tolerancia: Tolerancia = Tolerancia(), caminho: str = "") -> list[str]:
+    """Diferenças entre dois resultados de seção (vazia quando batem)."""
+    if isinstance(esperado, dict):
+        if not isinstance(obtido, dict) or set(esperado) != set(obtido):
+            return [f"{caminho}: chaves {sorted(obtido) if isinstance(obtido, dict) else type(obtido).__name__}"]
+        return [d for k in esperado for d in comparar(esperado[k], obtido[k], tolerancia, f"{caminho}.{k}")]
+    if isinstance(esperado, pd.DataFrame):
+        if not isinstance(obtido, pd.DataFrame):
+            return [f"{caminho}: {type(obtido).__name__} (esperado DataFrame)"]
+        return _comparar_tabelas(esperado, obtido, tolerancia, caminho)
+    if _inteiro(esperado) or isinstance(esperado, (float, np.floating)):
+        fora = _comparar_numeros(
+            np.array([esperado], dtype="float64"),
+            np.array([obtido], dtype="float64"),
+            _inteiro(esperado),
+            tolerancia,
+        )
+        return [f"{caminho}: {obtido!r} (esperado {esperado!r})"] if fora[0] else []
+    return [] if esperado == obtido else [f"{caminho}: {obtido!r} (esperado {esperado!r})"]
+
+
+def _normalizar(secao: str, resultado):
+    normalizar = NORMALIZACOES.get(secao)
+    return normalizar(resultado) if normalizar and isinstance(resultado, pd.DataFrame) else resultado
+
+
+# ---------------------------------------------
+# Execução
+# ---------------------------------------------
+def _medir(funcao, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, float(np.median(tempos))
+
+
+def verificar(
+    df: pd.DataFrame,
+    path: Path | None = None,
+    motores: list[Motor] | None = None,
+    repeticoes: int = 3,
+) -> tuple[pd.DataFrame, dict]:
+    """Compara cada motor com a referência, seção a seção.
+
+    `path` é o parquet de `df` (usado pela leitura filtrada); sem ele, a base
+    é gravada em um arquivo temporário com o layout agrupado, o que a leitura
+    filtrada pressupõe. Devolve o relatório por seção e motor (com a linha
+    `(todas)` dos motores pré-calculados) e o tempo de preparação de cada
+    motor (mediana, nos pré-calculados).
+    """
+    motores = list(MOTORES.values()) if motores is None else motores
+
+    with tempfile.TemporaryDirectory() as pasta:
+        if path is None:
+            path = Path(pasta) / "base.parquet"
+            escrever_folha(df, path, LAYOUTS["agrupado"])
+
+        preparados, preparo = {}, {}
+        for motor in motores:
+            preparados[motor.nome], preparo[motor.nome] = _medir(
+                lambda: motor.preparar(df, path), repeticoes if motor.pre_calculado else 1
+            )
+
+        linhas = []
+        for secao, referencia in SECOES.items():
+            implementacoes = [m for m in motores if secao in m.secoes]
+            if not implementacoes:
+                continue
+            esperado, tempo_ref = _medir(lambda: referencia(df), repeticoes)
+            esperado = _normalizar(secao, esperado)
+
+            for motor in implementacoes:
+                estrutura = preparados[motor.nome]
+                obtido, consulta = _medir(lambda: motor.secoes[secao](estrutura), repeticoes)
+                diferencas = comparar(esperado, _normalizar(secao, obtido), motor.tolerancia, secao)
+                linhas.append(_linha(
+                    secao,
+                    motor,
+                    not diferencas,
+                    tempo_ref,
+                    consulta,
+                    diferencas[0] if diferencas else "",
+                    preparo[motor.nome] if motor.pre_calculado else 0.0,
+                ))
+
+        for motor in motores:
+            if not motor.pre_calculado:
+                continue
+            # o motor inteiro (uma preparação, todas as consultas) contra as seções separadas
+            proprias = [linha for linha in linhas if linha["motor"] == motor.nome]
+            linhas.append(_linha(
+                "(todas)",
+                motor,
+                all(linha["ok"] for linha in proprias),
+                sum(linha["referencia_ms"] for linha in proprias) / 1000,
+                sum(linha["consulta_ms"] for linha in proprias) / 1000,
+                "",
+                preparo[motor.nome],
+            ))
+
+    return pd.DataFrame(linhas), preparo
+
+
+def _linha(secao: str, motor: Motor, ok: bool, tempo_ref: float, consulta: float, diferenca: str, preparo: float = 0.0) -> dict:
+    tempo = preparo + consulta
+    return {
+        "secao": secao,
+        "motor": motor.nome,
+        "ok": ok,
+        "referencia_ms": tempo_ref * 1000,
+        "consulta_ms": consulta * 1000,
+        "motor_ms": tempo * 1000,
+        "ganho": tempo_ref / tempo if tempo > 0 else float("inf"),
+        "diferenca": diferenca,
+    }
+
+
+def main():
+    from dados import DATA_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sintetico", type=int, nargs="*", default=[5], help="fatores das bases sintéticas (0 = nenhuma)")
+    parser.add_argument("--motores", nargs="*", choices=list(MOTORES), help="motores verificados (padrão: todos)")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções por medição (mediana)")
+    args = parser.parse_args()
+
+    os.chdir(RAIZ_REPO)
+    motores = [MOTORES[m] for m in args.motores] if args.motores else None
+
+    real = ler_folha(DATA_PATH)
+    # o parquet publicado usa o layout padrão: a leitura filtrada lê uma cópia agrupada
+    bases = [("real", real, None)]
+    fatores = [f for f in args.sintetico if f > 1]
+    if fatores:
+        from teste_carga import gerar_base_sintetica
+        bases += [(f"sintetica {f}x", gerar_base_sintetica(real, f), None) for f in fatores]
+
+    falhas = 0
+    for nome, df, path in bases:
+        relatorio, preparo = verificar(df, path, motores, args.repeticoes)
+        falhas += int((~relatorio.loc[relatorio["secao"] != "(todas)", "ok"]).sum())
+
+        print(f"\n{nome}: {len(df):,} linhas")
+        print("preparação: " + ", ".join(f"{m} {s * 1000:.0f} ms" for m, s in preparo.items()))
+        with pd.option_context("display.width", 160, "display.max_colwidth", 80, "display.float_format", "{:,.1f}".format):
+            print(relatorio.to_string(index=False))
+
+    print(f"\n{'todas as seções batem' if not falhas else f'{falhas} divergência(s)'}")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Diferença salarial entre gêneros, com intervalos de confiança por bootstrap.
+
+Usa o salário mensal de cada servidor (o maior valor de `folha_mensal` no
+ano, o mesmo critério do índice de salários) e compara homens e mulheres
+em cada categoria e em cada faixa de carga horária. A diferença é
+expressa em relação ao salário masculino:
+
+    diferença (%) = (homens - mulheres) / homens * 100
+
+Valores positivos indicam que os homens recebem mais.
+
+Os intervalos de confiança vêm de um bootstrap estratificado (as
+reamostragens mantêm o número de homens e de mulheres do grupo). Cada
+lote de reamostragens é uma matriz de índices (reamostragens x servidores)
+calculada de uma vez com NumPy; os lotes de todos os grupos são divididos
+entre processos com joblib. As sementes de cada lote derivam de uma única
+semente, então o resultado não depende do número de processos.
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from indice_salarios import salarios_por_servidor
+
+N_REAMOSTRAS = 2000
+NIVEL_CONFIANCA = 0.95
+
+# reamostragens por tarefa: limita a matriz de índices a ~TAMANHO_LOTE x n_servidores
+TAMANHO_LOTE = 250
+
+# mínimo de servidores de cada gênero para calcular o intervalo
+MIN_POR_GENERO = 3
+
+# abaixo deste total de elementos reamostrados o bootstrap roda no próprio processo
+MIN_TRABALHO_PARALELO = 2_000_000
+
+FAIXAS_CARGA = [(0, 20, "até 20h"), (21, 30, "21 a 30h"), (31, 40, "31 a 40h"), (41, 999, "mais de 40h")]
+
+
+def faixa_carga_horaria(carga: pd.Series) -> pd.Series:
+    carga = pd.to_numeric(carga, errors="coerce")
+    faixa = pd.Series(pd.NA, index=carga.index, dtype="object")
+    for minimo, maximo, rotulo in FAIXAS_CARGA:
+        faixa[carga.between(minimo, maximo)] = rotulo
+    return faixa
+
+
+def salarios_genero(df: pd.DataFrame) -> pd.DataFrame:
+    """Salário mensal, gênero, categoria e faixa de carga horária por servidor."""
+    servidores = salarios_por_servidor(df)
+
+    carga = (
+        df.dropna(subset=["carga_horaria_semanal"])
+        .drop_duplicates(subset="id_servidor")
+        .set_index("id_servidor")["carga_horaria_semanal"]
+    )
+    servidores["faixa_carga"] = faixa_carga_horaria(servidores["id_servidor"].map(carga))
+    return servidores[servidores["genero"].isin(["M", "F"])].reset_index(drop=True)
+
+
+def _diferenca(homens: np.ndarray, mulheres: np.ndarray) -> np.ndarray:
+    """Diferença em % do valor masculino; NaN quando ele é 0 (evita divisão por zero)."""
+    homens = np.asarray(homens, dtype="float64")
+    razao = np.full_like(homens, np.nan)
+    np.divide(homens - mulheres, homens, out=razao, where=homens != 0)
+    diferenca = razao * 100
+    return diferenca if diferenca.ndim else float(diferenca)
+
+
+def _lote_bootstrap(
+    masculino: np.ndarray,
+    feminino: np.ndarray,
+    n_reamostras: int,
+    semente: np.random.SeedSequence,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Diferenças de média e de mediana em `n_reamostras` reamostragens."""
+    rng = np.random.default_rng(semente)
+    idx_m = rng.integers(0, len(masculino), size=(n_reamostras, len(masculino)))
+    idx_f = rng.integers(0, len(feminino), size=(n_reamostras, len(feminino)))
+
+    amostras_m = masculino[idx_m]
+    amostras_f = feminino[idx_f]
+
+    media = _diferenca(amostras_m.mean(axis=1), amostras_f.mean(axis=1))
+    mediana = _diferenca(np.median(amostras_m, axis=1), np.median(amostras_f, axis=1))
+    return media, mediana
+
+
+def _grupos(servidores: pd.DataFrame) -> list[tuple[str, str, pd.DataFrame]]:
+    grupos = [("geral", "Todos", servidores)]
+    for categoria, grupo in servidores.groupby("categoria_cargo"):
+        grupos.append(("categoria", categoria, grupo))
+    for _, _, rotulo in FAIXAS_CARGA:
+        grupo = servidores[servidores["faixa_carga"] == rotulo]
+        if len(grupo):
+            grupos.append(("carga_horaria", rotulo, grupo))
+    return grupos
+
+
+def gap_salarial_genero(
+    df: pd.DataFrame,
+    n_reamostras: int = N_REAMOSTRAS,
+    nivel: float = NIVEL_CONFIANCA,
+    semente: int = 0,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """Diferença de média e de mediana salarial (M x F) por categoria e por faixa de carga horária."""
+    servidores = salarios_genero(df)
+
+    linhas, tarefas = [], []
+    raiz = np.random.SeedSequence(semente)
+    for dimensao, grupo_nome, grupo in _grupos(servidores):
+        masculino = grupo.loc[grupo["genero"] == "M", "salario"].to_numpy(dtype="float64")
+        feminino = grupo.loc[grupo["genero"] == "F", "salario"].to_numpy(dtype="float64")
+
+        linha = {
+            "dimensao": dimensao,
+            "grupo": grupo_nome,
+            "n_masculino": len(masculino),
+            "n_feminino": len(feminino),
+            "media_masculino": masculino.mean() if len(masculino) else np.nan,
+            "media_feminino": feminino.mean() if len(feminino) else np.nan,
+            "mediana_masculino": np.median(masculino) if len(masculino) else np.nan,
+            "mediana_feminino": np.median(feminino) if len(feminino) else np.nan,
+        }
+        linha["gap_media"] = _diferenca(linha["media_masculino"], linha["media_feminino"])
+        linha["gap_mediana"] = _diferenca(linha["mediana_masculino"], linha["mediana_feminino"])
+        linhas.append(linha)
+
+        if min(len(masculino), len(feminino)) < MIN_POR_GENERO:
+            continue
+        # uma semente por grupo, dividida em uma por lote
+        sementes = raiz.spawn(1)[0].spawn(-(-n_reamostras // TAMANHO_LOTE))
+        for i, semente_lote in enumerate(sementes):
+            tamanho = min(TAMANHO_LOTE, n_reamostras - i * TAMANHO_LOTE)
+            tarefas.append((len(linhas) - 1, masculino, feminino, tamanho, semente_lote))
+
+    trabalho = sum(t[3] * (len(t[1]) + len(t[2])) for t in tarefas)
+    paralelo = Parallel(n_jobs=n_jobs if trabalho >= MIN_TRABALHO_PARALELO else 1)
+    resultados = paralelo(delayed(_lote_bootstrap)(m, f, n, s) for _, m, f, n, s in tarefas)
+
+    por_linha: dict[int, list] = {}
+    for (i, *_), resultado in zip(tarefas, resultados):
+        por_linha.setdefault(i, []).append(resultado)
+
+    cauda = (1 - nivel) / 2 * 100
+    for i, linha in enumerate(linhas):
+        lotes = por_linha.get(i)
+        if not lotes:
+            linha.update(ic_media_inf=np.nan, ic_media_sup=np.nan, ic_mediana_inf=np.nan, ic_mediana_sup=np.nan)
+            continue
+        medias = np.concatenate([m for m, _ in lotes])
+        medianas = np.concatenate([md for _, md in lotes])
+        linha["ic_media_inf"], linha["ic_media_sup"] = np.percentile(medias, [cauda, 100 - cauda])
+        linha["ic_mediana_inf"], linha["ic_mediana_sup"] = np.percentile(medianas, [cauda, 100 - cauda])
+
+    return pd.DataFrame(linhas)
@@ -0,0 +1,272 @@
+"""Exportação estática do painel.
+
+Executa `app/app.py` uma única vez de forma headless (API de testes do
+Streamlit) e grava um site estático equivalente, que pode ser servido por
+qualquer servidor web ou CDN, sem uma sessão Python por visitante:
+
+    site/
+    ├── index.html           # página completa (textos, cards e tabelas)
+    ├── specs/grafico-NN.json  # specs Vega-Lite com os dados já agregados
+    ├── dados/tabela-NN.csv    # tabelas exibidas na página
+    └── assets/images/       # logo
+
+Os gráficos são desenhados no navegador pelo vega-embed (carregado via CDN).
+Os controles interativos (seletores, sliders, campos numéricos) não existem
+no site: cada um vira uma nota com o valor usado, e as seções que dependem
+dele mostram o resultado para esse valor. Um tipo de elemento que o
+exportador não conhece interrompe a exportação, em vez de sumir da página.
+
+Uso (a partir da raiz do repositório):
+
+    python app/exportar_site.py
+    python app/exportar_site.py --saida /var/www/santa-rita-data
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+from pathlib import Path
+
+import mistune
+import pyarrow as pa
+from streamlit.testing.v1 import AppTest
+
+from dados import LOGO_PATH
+
+APP_PATH = Path(__file__).with_name("app.py")
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+TITULO_SITE = "Santa Rita Data"
+
+VEGA_CDN = [
+    "https://cdn.jsdelivr.net/npm/vega@5",
+    "https://cdn.jsdelivr.net/npm/vega-lite@5",
+    "https://cdn.jsdelivr.net/npm/vega-embed@6",
+]
+
+CSS = """
+body {
+  font-family: "Source Sans Pro", -apple-system, "Segoe UI", Roboto, sans-serif;
+  color: rgb(49, 51, 63);
+  margin: 0;
+}
+main { max-width: 736px; margin: 0 auto; padding: 48px 16px 96px; }
+img { max-width: 100%; }
+hr { border: none; border-top: 1px solid rgba(49, 51, 63, .2); margin: 32px 0; }
+.row { display: flex; flex-wrap: wrap; gap: 16px; }
+.row > .col { flex: 1 1 0; min-width: 200px; }
+.caption { color: rgba(49, 51, 63, .6); font-size: 14px; margin: 4px 0; white-space: pre-line; }
+.chart { width: 100%; margin: 16px 0; }
+.tabela { overflow-x: auto; margin: 16px 0; }
+.tabela table { border-collapse: collapse; width: 100%; font-size: 14px; }
+.tabela th, .tabela td { border: 1px solid rgba(49, 51, 63, .1); padding: 4px 8px; text-align: left; }
+.tabela th { background: rgba(49, 51, 63, .04); }
+.metrica { margin: 8px 0; }
+.metrica .rotulo { font-size: 14px; }
+.metrica .valor { font-size: 36px; line-height: 1.2; }
+.metrica .delta { font-size: 14px; }
+.delta.green { color: rgb(9, 171, 59); }
+.delta.red { color: rgb(255, 43, 43); }
+.delta.gray { color: rgba(49, 51, 63, .6); }
+.alerta { border-radius: 8px; padding: 12px 16px; margin: 16px 0; }
+.alerta.info { background: rgba(28, 131, 225, .1); }
+.alerta.success { background: rgba(33, 195, 84, .1); }
+.alerta.warning { background: rgba(255, 170, 0, .1); }
+.alerta.error { background: rgba(255, 43, 43, .09); }
+.controle { border-left: 3px solid rgba(49, 51, 63, .2); padding: 4px 12px; margin: 8px 0; font-size: 14px; }
+"""
+
+# controles do painel: no site, viram uma nota com o valor usado
+CONTROLES = {"selectbox", "radio", "multiselect", "slider", "select_slider", "number_input"}
+ALERTAS = {"info", "success", "warning", "error"}
+# blocos de layout que só agrupam os filhos
+BLOCOS = {"main", "flex_container", "column"}
+
+_markdown = mistune.create_markdown(escape=False, plugins=["table", "strikethrough"])
+_markdown_seguro = mistune.create_markdown(escape=True, plugins=["table", "strikethrough"])
+
+
+def _json_default(valor):
+    # datas e tipos do Arrow que não são nativos do json
+    return str(valor)
+
+
+class ExportadorSite:
+    def __init__(self, saida: Path):
+        self.saida = Path(saida)
+        self.n_graficos = 0
+        self.n_tabelas = 0
+
+    # ---------------------------------------------
+    # Elementos
+    # ---------------------------------------------
+    def _markdown_html(self, proto) -> str:
+        render = _markdown if proto.allow_html else _markdown_seguro
+        return render(proto.body)
+
+    def _grafico_html(self, proto) -> str:
+        self.n_graficos += 1
+        nome = f"grafico-{self.n_graficos:02d}.json"
+
+        spec = json.loads(proto.spec)
+        spec["datasets"] = {
+            ds.name: pa.ipc.open_stream(ds.data.data).read_all().to_pylist()
+            for ds in proto.datasets
+        }
+        if proto.use_container_width:
+            spec["width"] = "container"
+        spec.setdefault("$schema", "https://vega.github.io/schema/vega-lite/v5.json")
+
+        (self.saida / "specs" / nome).write_text(
+            json.dumps(spec, ensure_ascii=False, default=_json_default),
+            encoding="utf-8"
+        )
+        return f'<div class="chart" data-spec="specs/{nome}"></div>'
+
+    def _tabela_html(self, proto) -> str:
+        self.n_tabelas += 1
+        nome = f"tabela-{self.n_tabelas:02d}.csv"
+
+        df = pa.ipc.open_stream(proto.arrow_data.data).read_all().to_pandas()
+        df.to_csv(self.saida / "dados" / nome, index=False)
+
+        tabela = df.to_html(index=False, border=0, na_rep="", escape=True)
+        return (
+            f'<div class="tabela">{tabela}'
+            f'<p class="caption"><a href="dados/{nome}">Baixar CSV</a></p></div>'
+        )
+
+    def _metrica_html(self, proto) -> str:
+        delta = ""
+        if proto.delta:
+            seta = {"UP": "▲ ", "DOWN": "▼ "}.get(proto.MetricDirection.Name(proto.direction), "")
+            cor = proto.MetricColor.Name(proto.color).lower()
+            delta = f'<div class="delta {cor}">{seta}{html.escape(proto.delta)}</div>'
+        return (
+            f'<div class="metrica"><div class="rotulo">{html.escape(proto.label)}</div>'
+            f'<div class="valor">{html.escape(proto.body)}</div>{delta}</div>'
+        )
+
+    def _controle_html(self, no) -> str:
+        if no.type in ("selectbox", "radio"):
+            # opções com valor None (ex.: "Todas") não têm índice no AppTest: usa o padrão
+            valor = no.options[no.index if no.index is not None else no.proto.default]
+        elif no.type == "multiselect":
+            valor = ", ".join(no.options[i] for i in no.indices)
+        else:
+            valor = no.value
+        if isinstance(valor, (tuple, list)):
+            valor = " a ".join(str(v) for v in valor)
+        return (
+            f'<div class="controle">{html.escape(no.label)}: <b>{html.escape(str(valor))}</b>'
+            ' <span class="caption">(valor fixo no site; escolha outros no painel interativo)</span></div>'
+        )
+
+    def _imagem_html(self, proto) -> str:
+        # a única imagem do painel é o logo em assets/images
+        return f'<img src="{LOGO_PATH.as_posix()}" alt="{html.escape(TITULO_SITE)}">'
+
+    # ---------------------------------------------
+    # Árvore de elementos
+    # ---------------------------------------------
+    def renderizar(self, no) -> str:
+        tipo = getattr(no, "type", None)
+        filhos = list(getattr(no, "children", {}).values())
+
+        if tipo == "markdown":
+            return self._markdown_html(no.proto)
+        if tipo == "caption":
+            return f'<div class="caption">{self._markdown_html(no.proto)}</div>'
+        if tipo == "divider":
+            return "<hr>"
+        if tipo in ("vega_lite_chart", "arrow_vega_lite_chart"):
+            return self._grafico_html(no.proto)
+        if tipo == "dataframe":
+            return self._tabela_html(no.proto)
+        if tipo == "image":
+            return self._imagem_html(no.proto)
+        if tipo == "metric":
+            return self._metrica_html(no.proto)
+        if tipo in ALERTAS:
+            return f'<div class="alerta {tipo}">{_markdown_seguro(no.proto.body)}</div>'
+        if tipo in CONTROLES:
+            return self._controle_html(no)
+        if tipo not in BLOCOS:
+            raise ValueError(f"Elemento do painel sem exportação estática: {tipo!r}")
+
+        conteudo = "\n".join(self.renderizar(f) for f in filhos)
+        if tipo == "column":
+            return f'<div class="col">{conteudo}</div>'
+        if tipo == "flex_container" and any(getattr(f, "type", None) == "column" for f in filhos):
+            return f'<div class="row">{conteudo}</div>'
+        return conteudo
+
+    def exportar(self, arvore) -> Path:
+        # limpa apenas os artefatos gerados por exportações anteriores
+        for subdir, padrao in (("specs", "grafico-*.json"), ("dados", "tabela-*.csv")):
+            destino = self.saida / subdir
+            destino.mkdir(parents=True, exist_ok=True)
+            for antigo in destino.glob(padrao):
+                antigo.unlink()
+
+        principal = arvore.children[0]
+        corpo = self.renderizar(principal)
+
+        destino_logo = self.saida / LOGO_PATH
+        destino_logo.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(LOGO_PATH, destino_logo)
+
+        scripts = "\n".join(f'<script src="{url}"></script>' for url in VEGA_CDN)
+        pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(TITULO_SITE)}</title>
+<style>{CSS}</style>
+{scripts}
+</head>
+<body>
+<main>
+{corpo}
+</main>
+<script>
+document.querySelectorAll(".chart").forEach(function (el) {{
+  vegaEmbed(el, el.dataset.spec, {{actions: false}});
+}});
+</script>
+</body>
+</html>
+"""
+        index = self.saida / "index.html"
+        index.write_text(pagina, encoding="utf-8")
+        return index
+
+
+def exportar_site(saida: Path) -> Path:
+    at = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    at.run()
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    return ExportadorSite(saida).exportar(at._tree)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", default="site", help="diretório de saída (padrão: site/)")
+    args = parser.parse_args()
+
+    saida = Path(args.saida).resolve()
+
+    # caminhos do app (dados, imagens) são relativos à raiz do repositório
+    os.chdir(RAIZ_REPO)
+
+    index = exportar_site(saida)
+    print(f"Site estático gravado em {index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+import altair as alt
+import pandas as pd
+# mesma conversão que `st.altair_chart` aplica antes de enviar o gráfico
+from streamlit.elements.vega_charts import _convert_altair_to_vega_lite_spec
+
+from cache import CacheLimitado, chave_conteudo
+
+
+# ------------------------------------------------------------------
+# Construtores dos gráficos Altair do painel.
+#
+# Cada gráfico recebe um DataFrame já agregado e envia ao navegador
+# UM único dataset (declarado no nível do layer), contendo apenas as
+# colunas efetivamente codificadas. Rótulos, percentuais e valores em
+# reais são calculados no próprio Vega (transform_calculate /
+# transform_joinaggregate), em vez de trafegar colunas de texto.
+# ------------------------------------------------------------------
+
+DONUT_DOMAIN = ["Masculino", "Feminino"]
+DONUT_RANGE = ["#0068c9", "#e377c2"]
+
+COR_MASCULINO = "#0068c9"
+COR_FEMININO = "#e377c2"
+
+
+def expr_br_money(campo: str) -> str:
+    """Expressão Vega equivalente a `br_money` (ex.: R$ 12.345,67)."""
+    v = f"format(datum.{campo}, ',.2f')"
+    v = f"replace({v}, regexp(',', 'g'), 'X')"
+    v = f"replace({v}, regexp('\\\\.', 'g'), ',')"
+    v = f"replace({v}, regexp('X', 'g'), '.')"
+    return f"'R$ ' + {v}"
+
+
+def expr_brl_label(campo: str) -> str:
+    """Expressão Vega equivalente a `brl_label` (ex.: R$ 1.2 mi / R$ 850 mil)."""
+    v = f"datum.{campo}"
+    return (
+        f"{v} >= 1000000"
+        f" ? 'R$ ' + format({v} / 1000000, '.1f') + ' mi'"
+        f" : 'R$ ' + format({v} / 1000, '.0f') + ' mil'"
+    )
+
+
+def _titulo(texto: str) -> alt.TitleParams:
+    return alt.TitleParams(
+        text=texto,
+        anchor="middle",
+        fontSize=16,
+        fontWeight="bold",
+        offset=12
+    )
+
+
+# ---------------------------------------------
+# Distribuição geral por gênero
+# ---------------------------------------------
+def grafico_genero(contagem_genero: pd.DataFrame) -> alt.LayerChart:
+    dados = contagem_genero[["genero", "total_servidores"]]
+
+    base = alt.Chart().encode(
+        x=alt.X("genero:N", title="Gênero", axis=alt.Axis(labelAngle=0)),
+        y=alt.Y("total_servidores:Q", title="Total de Servidores")
+    )
+
+    bars = base.mark_bar(size=90)
+
+    # número absoluto em cima
+    labels_top = base.mark_text(
+        dy=-8,
+        fontSize=16,
+        fontWeight="bold"
+    ).encode(
+        text="total_servidores:Q"
+    )
+
+    # percentual no meio (com %), truncado como no cálculo original
+    labels_center = (
+        alt.Chart()
+        .mark_text(
+            fontSize=18,
+            fontWeight="bold",
+            color="white"
+        )
+        .encode(
+            x=alt.X("genero:N", axis=alt.Axis(labelAngle=0)),
+            y=alt.Y("y_mid:Q", title=None),
+            text=alt.Text("percentual_str:N")
+        )
+    )
+
+    return (
+        alt.layer(bars, labels_top, labels_center, data=dados)
+        .transform_joinaggregate(total="sum(total_servidores)")
+        .transform_calculate(
+            y_mid="datum.total_servidores / 2",
+            percentual_str=(
+                "toString(floor(round(datum.total_servidores / datum.total * 1000) / 10)) + '%'"
+            ),
+        )
+        .properties(width=500, height=350)
+    )
+
+
+# ---------------------------------------------
+# Donut de gênero por categoria
+# ---------------------------------------------
+def grafico_donut_genero(total_m: int, total_f: int, texto_centro: str) -> alt.LayerChart:
+    dados = pd.DataFrame({
+        "genero": ["Masculino", "Feminino"],
+        "total": [total_m, total_f],
+    })
+
+    donut = (
+        alt.Chart()
+        .mark_arc(innerRadius=68, outerRadius=110)
+        .encode(
+            theta=alt.Theta("total:Q"),
+            color=alt.Color(
+                "genero:N",
+                scale=alt.Scale(domain=DONUT_DOMAIN, range=DONUT_RANGE),
+                legend=None,
+            ),
+            tooltip=[
+                alt.Tooltip("genero:N", title="Gênero"),
+                alt.Tooltip("total:Q", title="Servidores"),
+                alt.Tooltip("percentual:Q", title="Percentual", format=".1f"),
+            ],
+        )
+        .properties(width=300, height=240)
+    )
+
+    # o texto central é constante: vai como valor literal, sem dataset próprio
+    center = (
+        alt.Chart()
+        .transform_aggregate(n="count()")
+        .mark_text(fontSize=16, fontWeight="bold", lineHeight=18, text=texto_centro)
+    )
+
+    return (
+        alt.layer(donut, center, data=dados)
+        .transform_joinaggregate(total_categoria="sum(total)")
+        .transform_calculate(
+            percentual="datum.total_categoria > 0 ? round(datum.total / datum.total_categoria * 1000) / 10 : 0"
+        )
+    )
+
+
+# ---------------------------------------------
+# Custo anual por categoria
+# ---------------------------------------------
+def grafico_custo_categoria(custo: pd.DataFrame, titulo: str = "Custo Anual Por Categoria") -> alt.LayerChart:
+    dados = custo[["categoria_cargo", "custo_folha_anual_categoria"]]
+    max_v = float(dados["custo_folha_anual_categoria"].max())
+
+    base = (
+        alt.Chart()
+        .encode(
+            y=alt.Y(
+                "categoria_cargo:N",
+                sort="-x",
+                title=None,
+                axis=alt.Axis(labelLimit=0)  # não truncar nomes
+            ),
+            x=alt.X(
+                "custo_folha_anual_categoria:Q",
+                title="Custo total anual (R$)",
+                axis=alt.Axis(format="~s"),  # exibe 1M, 2M, etc (apoio visual)
+                scale=alt.Scale(domain=[0, max_v * 1.18])  # folga para não cortar labels
+            ),
+            tooltip=[
+                alt.Tooltip("categoria_cargo:N", title="Categoria"),
+                alt.Tooltip("valor_str:N", title="Custo anual"),
+                alt.Tooltip("percentual:Q", title="% do total", format=".1f"),
+            ]
+        )
+    )
+
+    bars = base.mark_bar(size=28)
+
+    labels = base.mark_text(
+        align="left",
+        baseline="middle",
+        dx=10,
+        fontSize=14,
+        fontWeight="bold"
+    ).encode(
+        text="label:N"
+    )
+
+    return (
+        alt.layer(bars, labels, data=dados)
+        .transform_joinaggregate(total_geral="sum(custo_folha_anual_categoria)")
+        .transform_calculate(
+            percentual="round(datum.custo_folha_anual_categoria / datum.total_geral * 10000) / 100",
+            valor_str=expr_brl_label("custo_folha_anual_categoria"),
+        )
+        .transform_calculate(
+            label="datum.valor_str + ' (' + format(datum.percentual, '.1f') + '%)'"
+        )
+        .properties(
+            width=760,
+            height=min(700, 38 * len(dados) + 80),
+            padding={"right": 20},
+            title=_titulo(titulo)
+        )
+    )
+
+
+# ---------------------------------------------
+# Top 10 salários (geral / por gênero)
+# ---------------------------------------------
+def grafico_top_salarios(
+    top: pd.DataFrame,
+    titulo: str,
+    cor: str = COR_MASCULINO,
+    com_genero: bool = False,
+) -> alt.LayerChart:
+    colunas = ["rank", "cargo", "salario_maximo"] + (["genero"] if com_genero else [])
+    dados = top[colunas]
+    max_sal = float(dados["salario_maximo"].max())
+
+    tooltip = [
+        alt.Tooltip("rank:Q", title="Rank"),
+        alt.Tooltip("cargo:N", title="Cargo"),
+    ]
+    if com_genero:
+        tooltip.append(alt.Tooltip("genero:N", title="Gênero"))
+    tooltip.append(alt.Tooltip("salario_str:N", title="Salário Máximo"))
+
+    base = (
+        alt.Chart()
+        .encode(
+            y=alt.Y(
+                "rank_label:N",
+                sort=alt.SortField(field="rank", order="ascending"),
+                title=None,
+                axis=alt.Axis(labelAngle=0)
+            ),
+            x=alt.X(
+                "salario_maximo:Q",
+                title="Salário base mensal (R$)",
+                scale=alt.Scale(domain=[0, max_sal * 1.12])
+            ),
+            tooltip=tooltip
+        )
+    )
+
+    bars = base.mark_bar(size=26, color=cor)
+
+    labels = base.mark_text(
+        align="left",
+        baseline="middle",
+        dx=10,
+        fontSize=14,
+        fontWeight="bold"
+    ).encode(
+        text="salario_str:N"
+    )
+
+    return (
+        alt.layer(bars, labels, data=dados)
+        .transform_calculate(
+            rank_label="datum.rank + 'º'",
+            salario_str=expr_br_money("salario_maximo"),
+        )
+        .properties(
+            width=720,
+            height=430,
+            padding={"right": 20},
+            title=_titulo(titulo)
+        )
+    )
+
+
+# ---------------------------------------------
+# Comissionados por gênero
+# ---------------------------------------------
+def grafico_comissionados_genero(total_masc: int, total_fem: int, titulo: str) -> alt.LayerChart:
+    dados = pd.DataFrame({
+        "genero": ["Masculino", "Feminino"],
+        "quantidade": [int(total_masc), int(total_fem)],
+    })
+
+    base = alt.Chart()
+
+    bars = base.mark_bar(size=130).encode(
+        x=alt.X("genero:N", title="", axis=alt.Axis(labelAngle=0)),
+        y=alt.Y("quantidade:Q", title="Quantidade de Servidores"),
+        color=alt.Color(
+            "genero:N",
+            scale=alt.Scale(domain=DONUT_DOMAIN, range=DONUT_RANGE),
+            legend=None
+        ),
+        tooltip=[
+            alt.Tooltip("genero:N", title="Gênero"),
+            alt.Tooltip("quantidade:Q", title="Total"),
+            alt.Tooltip("percentual:Q", title="Percentual (%)", format=".0f")
+        ]
+    )
+
+    labels_top = base.mark_text(
+        dy=-12,
+        fontSize=16,
+        fontWeight="bold"
+    ).encode(
+        x="genero:N",
+        y="quantidade:Q",
+        text="quantidade:Q"
+    )
+
+    labels_inside = base.mark_text(
+        align="center",
+        baseline="middle",
+        color="white",
+        fontSize=16,
+        fontWeight="bold"
+    ).encode(
+        x="genero:N",
+        y=alt.Y("meio_barra:Q"),
+        text="percentual_formatado:N"
+    )
+
+    return (
+        alt.layer(bars, labels_top, labels_inside, data=dados)
+        .transform_joinaggregate(total="sum(quantidade)")
+        .transform_calculate(
+            percentual="round(datum.quantidade / datum.total * 1000) / 10",
+            meio_barra="datum.quantidade / 2",
+        )
+        .transform_calculate(
+            percentual_formatado="toString(round(datum.percentual)) + '%'"
+        )
+        .properties(
+            width=450,
+            height=420,
+            title=_titulo(titulo)
+        )
+    )
+
+
+# ---------------------------------------------
+# Histograma de salários mensais
+# ---------------------------------------------
+def grafico_histograma_salarios(
+    histograma: pd.DataFrame,
+    titulo: str,
+    cor: str = COR_MASCULINO,
+    salario_marcado: float | None = None,
+) -> alt.LayerChart:
+    dados = histograma[["inicio", "fim", "servidores"]]
+
+    barras = alt.Chart().mark_bar(color=cor, binSpacing=1).encode(
+        x=alt.X("inicio:Q", bin="binned", title="Salário mensal (R$)", axis=alt.Axis(format="~s")),
+        x2="fim:Q",
+        y=alt.Y("servidores:Q", title="Servidores"),
+        tooltip=[
+            alt.Tooltip("faixa:N", title="Faixa"),
+            alt.Tooltip("servidores:Q", title="Servidores"),
+        ],
+    )
+
+    camadas = [barras]
+    if salario_marcado is not None:
+        # linha com o salário consultado pelo usuário (valor literal, sem dataset próprio)
+        camadas.append(
+            alt.Chart().mark_rule(color="#d62728", strokeWidth=2)
+            .encode(x=alt.datum(float(salario_marcado)))
+        )
+
+    return (
+        alt.layer(*camadas, data=dados)
+        .transform_calculate(
+            faixa=f"{expr_br_money('inicio')} + ' a ' + {expr_br_money('fim')}",
+        )
+        .properties(
+            width=720,
+            height=320,
+            title=_titulo(titulo)
+        )
+    )
+
+
+# ---------------------------------------------
+# Diferença salarial entre gêneros
+# ---------------------------------------------
+def grafico_gap_genero(gap: pd.DataFrame, titulo: str) -> alt.LayerChart:
+    """Diferença (%) por grupo, com o intervalo de confiança (colunas grupo, gap, ic_inf, ic_sup)."""
+    dados = gap[["grupo", "gap", "ic_inf", "ic_sup"]]
+    y = alt.Y("grupo:N", title=None, sort=None)
+
+    intervalo = alt.Chart().mark_rule(color="#7f7f7f", strokeWidth=2).encode(
+        y=y,
+        x=alt.X("ic_inf:Q", title="Diferença a favor dos homens (%)"),
+        x2="ic_sup:Q",
+    )
+
+    pontos = alt.Chart().mark_point(filled=True, size=90).encode(
+        y=y,
+        x="gap:Q",
+        color=alt.condition(alt.datum.gap >= 0, alt.value(COR_MASCULINO), alt.value(COR_FEMININO)),
+        tooltip=[
+            alt.Tooltip("grupo:N", title="Grupo"),
+            alt.Tooltip("gap:Q", title="Diferença (%)", format=".1f"),
+            alt.Tooltip("ic_inf:Q", title="IC inferior (%)", format=".1f"),
+            alt.Tooltip("ic_sup:Q", title="IC superior (%)", format=".1f"),
+        ],
+    )
+
+    # referência de igualdade salarial (valor literal, sem dataset próprio)
+    zero = alt.Chart().mark_rule(strokeDash=[4, 4], color="#444444").encode(x=alt.datum(0))
+
+    return (
+        alt.layer(intervalo, pontos, zero, data=dados)
+        .properties(
+            width=720,
+            height=alt.Step(28),
+            title=_titulo(titulo)
+        )
+    )
+
+
+# ---------------------------------------------
+# Specs prontos (cache entre execuções e sessões)
+# ---------------------------------------------
+# Montar o gráfico Altair e validar o spec contra o esquema do Vega-Lite
+# é quase todo o custo de uma execução quente do painel. O spec convertido
+# (dados já em Arrow) é guardado por construtor e conteúdo dos argumentos e
+# desenhado com `st.vega_lite_chart`, que produz o mesmo elemento de
+# `st.altair_chart` sem reconstruir nada.
+_specs = CacheLimitado(max_entradas=512, max_bytes=64 * 2**20)
+
+
+def spec_grafico(construtor, *args, **kwargs) -> dict:
+    """Spec Vega-Lite de `construtor(*args, **kwargs)`, montado uma vez por conteúdo.
+
+    O dict é compartilhado: quem o usa não deve alterá-lo (o Streamlit
+    copia o spec antes de mexer nele).
+    """
+    chave = f"{construtor.__name__}{chave_conteudo(args)}{chave_conteudo(kwargs)}"
+    spec = _specs.obter(chave)
+    if spec is None:
+        spec = _convert_altair_to_vega_lite_spec(construtor(*args, **kwargs))
+        _specs.guardar(chave, spec)
+    return spec
+
+
+def estatisticas_specs() -> dict:
+    return _specs.estatisticas()
+
+
+def servidor_singular_plural(n: int) -> str:
+    return "servidor" if int(n) == 1 else "servidores"
+
+
+def texto_centro_donut(total: int) -> str:
+    return f"{total}\n{servidor_singular_plural(total)}"
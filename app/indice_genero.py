@@ -0,0 +1,245 @@
+"""Índice persistente do gênero inferido de cada servidor.
+
+O gênero não vem na base original: é inferido manualmente a partir do
+nome (ver `03_data_preparation`). Em vez de exportar todos os nomes a cada
+nova base e refazer a rotulação inteira, o índice guarda o gênero já
+rotulado de cada servidor em `data/interim/genero-servidores.parquet`,
+indexado pelo mesmo hash do nome normalizado que gera o `id_servidor`
+(o arquivo não contém nomes).
+
+A cada nova base:
+
+1. `nomes_pendentes` lista só os nomes que ainda não estão no índice e os
+   exporta para rotulação (mesmo formato de `sexo_servidores.csv`);
+2. `incorporar_rotulos` lê o CSV rotulado e acrescenta os novos servidores
+   ao índice;
+3. `anexar_genero` junta o gênero à base por hash do nome.
+
+O custo de cada passo acompanha o número de nomes distintos da base nova,
+não o histórico inteiro já rotulado.
+
+O índice versionado no repositório foi semeado a partir da base tratada
+(`semear_indice`), que já guarda `id_servidor -> genero` de todos os
+servidores rotulados até aqui; em um clone novo só os nomes realmente
+novos ficam pendentes.
+
+    python app/indice_genero.py --semear
+    python app/indice_genero.py --pendentes data/raw
+    python app/indice_genero.py --incorporar data/interim/inf_sexo_servidor.csv
+"""
+import argparse
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+INDICE_PATH = Path("data/interim/genero-servidores.parquet")
+PENDENTES_PATH = Path("data/interim/sexo_servidores.csv")
+
+GENEROS = ("M", "F")
+
+
+def normalizar_nome(nome: pd.Series) -> pd.Series:
+    """Mesma normalização usada para gerar o `id_servidor`."""
+    return nome.str.upper().str.strip()
+
+
+def hash_nomes(nomes: pd.Series) -> pd.Series:
+    """sha256 do nome normalizado (o `id_servidor` da base tratada)."""
+    return normalizar_nome(nomes).map(
+        lambda nome: hashlib.sha256(nome.encode("utf-8")).hexdigest(), na_action="ignore"
+    )
+
+
+def _nomes_distintos(nomes: pd.Series) -> pd.DataFrame:
+    """Nomes distintos (já normalizados) e seus hashes, calculados uma vez por nome."""
+    distintos = normalizar_nome(pd.Series(nomes, dtype="object").dropna()).drop_duplicates()
+    return pd.DataFrame({"nome_servidor": distintos.to_numpy(), "id_servidor": hash_nomes(distintos).to_numpy()})
+
+
+# ---------------------------------------------
+# Leitura e gravação do índice
+# ---------------------------------------------
+def carregar_indice(path: Path = INDICE_PATH) -> pd.Series:
+    """Gênero por `id_servidor` (vazio se o índice ainda não existe)."""
+    path = Path(path)
+    if not path.exists():
+        return pd.Series([], index=pd.Index([], name="id_servidor", dtype="object"), name="genero", dtype="object")
+    indice = pd.read_parquet(path)
+    return indice.set_index("id_servidor")["genero"]
+
+
+def salvar_indice(indice: pd.Series, path: Path = INDICE_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tabela = indice.rename("genero").rename_axis("id_servidor").sort_index().reset_index()
+    tmp = path.with_suffix(".tmp")
+    tabela.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def semear_indice(base_path: Path, path: Path = INDICE_PATH) -> tuple[pd.Series, int]:
+    """Acrescenta ao índice o gênero dos servidores de uma base tratada.
+
+    A base tratada tem `id_servidor` (o mesmo hash do índice) e `genero`:
+    os rótulos já feitos entram no índice sem reexportar nenhum nome. Como
+    em `incorporar_rotulos`, rótulos existentes não são sobrescritos.
+    """
+    indice = carregar_indice(path)
+    base = pd.read_parquet(base_path, columns=["id_servidor", "genero"])
+    base = base[base["genero"].isin(GENEROS)].drop_duplicates("id_servidor")
+    novos = pd.Series(
+        base["genero"].astype("object").to_numpy(),
+        index=pd.Index(base["id_servidor"].astype("object").to_numpy(), name="id_servidor"),
+        name="genero",
+    )
+    novos = novos[~novos.index.isin(indice.index)]
+
+    if len(novos):
+        indice = pd.concat([indice, novos])
+        salvar_indice(indice, path)
+    return indice, len(novos)
+
+
+# ---------------------------------------------
+# Passo incremental
+# ---------------------------------------------
+def nomes_pendentes(
+    nomes: pd.Series,
+    indice: pd.Series | None = None,
+    path: Path | None = PENDENTES_PATH,
+) -> pd.DataFrame:
+    """Nomes ainda sem gênero no índice; com `path`, exporta-os para rotulação."""
+    indice = carregar_indice() if indice is None else indice
+    distintos = _nomes_distintos(nomes)
+
+    pendentes = (
+        distintos.loc[~distintos["id_servidor"].isin(indice.index), ["nome_servidor"]]
+        .sort_values("nome_servidor")
+        .reset_index(drop=True)
+        .assign(genero_inferido=pd.NA)
+    )
+
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pendentes.to_csv(path, index=False, encoding="utf-8")
+    return pendentes
+
+
+def ler_rotulos(path: Path) -> pd.DataFrame:
+    """CSV rotulado (`nome_servidor;sexo_inferido`, ou o próprio CSV de pendentes preenchido)."""
+    rotulos = pd.read_csv(path, sep=None, engine="python", dtype=str)
+    coluna = "sexo_inferido" if "sexo_inferido" in rotulos.columns else "genero_inferido"
+    rotulos = rotulos.rename(columns={coluna: "genero"})[["nome_servidor", "genero"]]
+    rotulos["genero"] = rotulos["genero"].str.strip().str.upper()
+    return rotulos[rotulos["genero"].isin(GENEROS)]
+
+
+def incorporar_rotulos(
+    rotulos: pd.DataFrame,
+    path: Path = INDICE_PATH,
+) -> tuple[pd.Series, int]:
+    """Acrescenta ao índice os servidores rotulados que ainda não estão nele.
+
+    Rótulos já existentes não são sobrescritos: corrigir um gênero é uma
+    edição explícita do índice, não efeito colateral de uma nova base.
+    """
+    indice = carregar_indice(path)
+    rotulos = rotulos.dropna(subset=["nome_servidor"]).drop_duplicates("nome_servidor")
+    novos = pd.Series(
+        rotulos["genero"].to_numpy(),
+        index=pd.Index(hash_nomes(rotulos["nome_servidor"]), name="id_servidor"),
+        name="genero",
+    )
+    novos = novos[~novos.index.duplicated() & ~novos.index.isin(indice.index)]
+
+    if len(novos):
+        indice = pd.concat([indice, novos])
+        salvar_indice(indice, path)
+    return indice, len(novos)
+
+
+# ---------------------------------------------
+# Junção com a base
+# ---------------------------------------------
+def anexar_genero(
+    df: pd.DataFrame,
+    coluna_nome: str = "nome",
+    indice: pd.Series | None = None,
+    coluna: str = "sexo_inferido",
+) -> pd.DataFrame:
+    """Base com o gênero do índice (NaN para nomes ainda não rotulados).
+
+    O hash é calculado uma vez por nome distinto e a junção é uma busca no
+    índice por hash (`get_indexer`), sem `merge` sobre as linhas da base.
+    """
+    indice = carregar_indice() if indice is None else indice
+
+    codigos, nomes = pd.factorize(df[coluna_nome])
+    ids = hash_nomes(pd.Series(nomes, dtype="object"))
+    # posição -1 (nome fora do índice, nome nulo) aponta para o None acrescentado no fim
+    genero_por_nome = np.append(indice.to_numpy(dtype="object"), None).take(indice.index.get_indexer(ids))
+    genero = np.append(genero_por_nome, None).take(codigos)
+    return df.assign(**{coluna: pd.Series(genero, index=df.index, dtype="object")})
+
+
+def _ler_brutos(pasta: Path) -> pd.Series:
+    nomes = [
+        pd.read_csv(arquivo, encoding="latin1", sep=";", usecols=["Nome"])["Nome"]
+        for arquivo in sorted(Path(pasta).glob("*.csv"))
+    ]
+    return pd.concat(nomes, ignore_index=True) if nomes else pd.Series([], dtype="object")
+
+
+def main():
+    from dados import DATA_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--semear",
+        metavar="PARQUET",
+        type=Path,
+        nargs="?",
+        const=RAIZ_REPO / DATA_PATH,
+        help=f"acrescenta ao índice o gênero já presente em uma base tratada (padrão: {DATA_PATH})",
+    )
+    parser.add_argument(
+        "--pendentes",
+        metavar="PASTA",
+        type=Path,
+        help=f"exporta para {PENDENTES_PATH} os nomes dos CSVs brutos ainda sem gênero",
+    )
+    parser.add_argument(
+        "--incorporar",
+        metavar="CSV",
+        type=Path,
+        help="acrescenta ao índice os nomes rotulados do CSV",
+    )
+    args = parser.parse_args()
+
+    # caminhos relativos ao diretório de onde o comando foi chamado
+    semear, incorporar, pendentes = (a.resolve() if a else None for a in (args.semear, args.incorporar, args.pendentes))
+    os.chdir(RAIZ_REPO)
+
+    if semear:
+        indice, novos = semear_indice(semear)
+        print(f"{novos} servidores semeados de {semear}; índice com {len(indice)} servidores")
+
+    if incorporar:
+        indice, novos = incorporar_rotulos(ler_rotulos(incorporar))
+        print(f"{novos} servidores incorporados; índice com {len(indice)} servidores")
+
+    if pendentes:
+        exportados = nomes_pendentes(_ler_brutos(pendentes))
+        print(f"{len(exportados)} nomes sem gênero exportados para {PENDENTES_PATH}")
+
+    if not (semear or incorporar or pendentes):
+        print(f"índice com {len(carregar_indice())} servidores ({INDICE_PATH})")
+
+
+if __name__ == "__main__":
+    main()
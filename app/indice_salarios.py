@@ -0,0 +1,122 @@
+"""Índice ordenado de salários mensais por servidor.
+
+O salário mensal de um servidor é o maior valor de `folha_mensal` observado
+no ano (o mesmo critério do ranking de maiores salários). O índice guarda,
+para cada grupo (geral, categoria, gênero e categoria x gênero), um array
+ordenado desses salários. Consultas de percentil, quantis e histogramas são
+respondidas com `searchsorted` sobre o array do grupo, sem reordenar nem
+reagrupar a base: mover um controle do painel custa microssegundos.
+"""
+import numpy as np
+import pandas as pd
+
+TODOS = None
+
+
+def salarios_por_servidor(df: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por servidor com o maior salário mensal (folha_mensal) do ano."""
+    mensal = df.loc[
+        df["tipo_pagamento"] == "folha_mensal",
+        ["id_servidor", "genero", "categoria_cargo", "cargo", "proventos"],
+    ]
+    return (
+        mensal
+        .dropna(subset=["proventos"])
+        .sort_values(["id_servidor", "proventos"], ascending=[True, False])
+        .drop_duplicates(subset="id_servidor", keep="first")
+        .rename(columns={"proventos": "salario"})
+        .reset_index(drop=True)
+    )
+
+
+def _quantil(ordenado: np.ndarray, q: float) -> float:
+    # mesmo critério do np.quantile/pd.Series.quantile (interpolação linear)
+    if len(ordenado) == 0:
+        return float("nan")
+    pos = q * (len(ordenado) - 1)
+    i = int(np.floor(pos))
+    j = min(i + 1, len(ordenado) - 1)
+    return float(ordenado[i] + (ordenado[j] - ordenado[i]) * (pos - i))
+
+
+class IndiceSalarios:
+    # arrays numpy: recalculado da base após um reinício (ver cache_disco.py)
+    persistir_em_disco = False
+
+    def __init__(self, df: pd.DataFrame):
+        servidores = salarios_por_servidor(df)
+
+        self._grupos: dict[tuple, np.ndarray] = {
+            (TODOS, TODOS): np.sort(servidores["salario"].to_numpy(dtype="float64")),
+        }
+        for categoria, grupo in servidores.groupby("categoria_cargo")["salario"]:
+            self._grupos[(categoria, TODOS)] = np.sort(grupo.to_numpy(dtype="float64"))
+        for genero, grupo in servidores.groupby("genero")["salario"]:
+            self._grupos[(TODOS, genero)] = np.sort(grupo.to_numpy(dtype="float64"))
+        for (categoria, genero), grupo in servidores.groupby(["categoria_cargo", "genero"])["salario"]:
+            self._grupos[(categoria, genero)] = np.sort(grupo.to_numpy(dtype="float64"))
+
+        self.categorias = sorted(servidores["categoria_cargo"].dropna().unique().tolist())
+        self.generos = sorted(servidores["genero"].dropna().unique().tolist())
+        self.por_cargo = self._resumo_cargos(servidores)
+
+    @staticmethod
+    def _resumo_cargos(servidores: pd.DataFrame) -> pd.DataFrame:
+        linhas = []
+        for cargo, grupo in servidores.groupby("cargo")["salario"]:
+            ordenado = np.sort(grupo.to_numpy(dtype="float64"))
+            q1, mediana, q3 = (_quantil(ordenado, q) for q in (0.25, 0.5, 0.75))
+            linhas.append((cargo, len(ordenado), q1, mediana, q3, q3 - q1))
+
+        return (
+            pd.DataFrame(linhas, columns=["cargo", "servidores", "q1", "mediana", "q3", "iqr"])
+            .sort_values("mediana", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + sum(a.nbytes for a in self._grupos.values())
+            + int(self.por_cargo.memory_usage(deep=True).sum())
+        )
+
+    def salarios(self, categoria: str | None = TODOS, genero: str | None = TODOS) -> np.ndarray:
+        """Array ordenado (somente leitura na prática) dos salários do grupo."""
+        return self._grupos.get((categoria, genero), np.empty(0))
+
+    def total(self, categoria: str | None = TODOS, genero: str | None = TODOS) -> int:
+        return len(self.salarios(categoria, genero))
+
+    def percentil(self, salario: float, categoria: str | None = TODOS, genero: str | None = TODOS) -> float:
+        """Percentual (0-100) dos servidores do grupo que recebem até `salario`."""
+        ordenado = self.salarios(categoria, genero)
+        if len(ordenado) == 0:
+            return float("nan")
+        return 100.0 * np.searchsorted(ordenado, salario, side="right") / len(ordenado)
+
+    def quantil(self, q: float, categoria: str | None = TODOS, genero: str | None = TODOS) -> float:
+        return _quantil(self.salarios(categoria, genero), q)
+
+    def histograma(
+        self,
+        largura: float,
+        categoria: str | None = TODOS,
+        genero: str | None = TODOS,
+    ) -> pd.DataFrame:
+        """Contagem de servidores por faixa de `largura` reais (faixas [inicio, fim))."""
+        ordenado = self.salarios(categoria, genero)
+        if len(ordenado) == 0:
+            return pd.DataFrame({"inicio": [], "fim": [], "servidores": []})
+
+        inicio = np.floor(ordenado[0] / largura) * largura
+        fim = (np.floor(ordenado[-1] / largura) + 1) * largura
+        bordas = np.arange(inicio, fim + largura / 2, largura)
+
+        # contagens acumuladas em cada borda; a diferença é a contagem da faixa
+        acumulado = np.searchsorted(ordenado, bordas, side="left")
+        return pd.DataFrame({
+            "inicio": bordas[:-1],
+            "fim": bordas[1:],
+            "servidores": np.diff(acumulado),
+        })
@@ -0,0 +1,210 @@
+"""Leitura em streaming dos CSVs brutos do Portal da Transparência.
+
+Cada arquivo de `data/raw` era lido inteiro para colunas de texto antes
+de qualquer tratamento. Uma exportação de vários anos pode ter centenas de
+MB, e o pico de memória acompanhava o tamanho do arquivo.
+
+`ingerir` lê cada CSV em blocos de `LINHAS_POR_BLOCO` linhas (decodificação
+latin1 incremental do leitor do pandas), aplica `preparacao.preparar_lote`
+a cada bloco e acrescenta o resultado, já tipado, a um parquet aberto com
+`pq.ParquetWriter`. O pico de memória depende do tamanho do bloco, não do
+arquivo; a saída é uma fração do texto bruto (números, datas e categorias).
+
+`finalizar` percorre a base tipada mês a mês (filtro do `pyarrow.dataset`)
+e passa cada lote direto para o parquet tratado, gravado com o layout de
+leitura (`layout_parquet.escrever_lotes`): a saída fica ordenada por mês
+sem carregar a base inteira, e o pico de memória continua dependendo do
+tamanho do lote. Só o layout `agrupado`, que reordena a base toda, a lê
+inteira em memória.
+
+    python app/ingestao.py data/raw
+    python app/ingestao.py data/raw --linhas-por-bloco 20000 --saida /tmp/folha.parquet
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from categorias_cargo import ClassificadorCargos, classificador_padrao
+from indice_genero import carregar_indice
+from layout_parquet import LAYOUT_PADRAO, LAYOUTS, Layout, colunas_dicionario_arquivo, escrever_folha, escrever_lotes
+from preparacao import (
+    COLUNAS_BRUTAS,
+    COLUNAS_FINAIS,
+    ENCODING_BRUTO,
+    ORDEM_MESES,
+    SEPARADOR_BRUTO,
+    ordenar_por_mes,
+    preparar_lote,
+)
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+LINHAS_POR_BLOCO = 50_000
+
+TIPADA_PATH = Path("data/interim/folha-tipada.parquet")
+SAIDA_PATH = Path("data/processed/folha-pagamento-2025.parquet")
+
+# esquema fixo: blocos sem nenhum valor em uma coluna não mudam o tipo dela
+ESQUEMA = pa.schema([
+    ("id_servidor", pa.string()),
+    ("genero", pa.string()),
+    ("cargo", pa.string()),
+    ("categoria_cargo", pa.string()),
+    ("tipo_pagamento", pa.string()),
+    ("proventos", pa.float64()),
+    ("descontos", pa.float64()),
+    ("liquido", pa.float64()),
+    ("carga_horaria_semanal", pa.int64()),
+    ("data_admissao", pa.timestamp("ns")),
+    ("data_desligamento", pa.timestamp("ns")),
+    ("status_servidor", pa.string()),
+    ("mes", pa.dictionary(pa.int8(), pa.string(), ordered=True)),
+])
+
+
+def ler_blocos(path: Path, linhas_por_bloco: int = LINHAS_POR_BLOCO):
+    """Blocos de linhas de um CSV bruto, todas as colunas como texto."""
+    return pd.read_csv(
+        path,
+        encoding=ENCODING_BRUTO,
+        sep=SEPARADOR_BRUTO,
+        dtype=str,
+        usecols=lambda coluna: coluna in COLUNAS_BRUTAS,
+        chunksize=linhas_por_bloco,
+    )
+
+
+def ingerir(
+    arquivos: list[Path],
+    destino: Path = TIPADA_PATH,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+    classificador: ClassificadorCargos | None = None,
+    indice_genero: pd.Series | None = None,
+) -> dict:
+    """Grava em `destino` as linhas tratadas de todos os arquivos, bloco a bloco."""
+    classificador = classificador_padrao() if classificador is None else classificador
+    indice_genero = carregar_indice() if indice_genero is None else indice_genero
+
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(destino.name + ".tmp")
+
+    estatisticas = {"arquivos": 0, "blocos": 0, "linhas_brutas": 0, "linhas": 0}
+    with pq.ParquetWriter(tmp, ESQUEMA, compression="zstd") as escritor:
+        for arquivo in arquivos:
+            estatisticas["arquivos"] += 1
+            for bruto in ler_blocos(arquivo, linhas_por_bloco):
+                lote = preparar_lote(bruto, classificador, indice_genero)
+                escritor.write_table(pa.Table.from_pandas(lote[COLUNAS_FINAIS], schema=ESQUEMA, preserve_index=False))
+
+                estatisticas["blocos"] += 1
+                estatisticas["linhas_brutas"] += len(bruto)
+                estatisticas["linhas"] += len(lote)
+
+    os.replace(tmp, destino)
+    return estatisticas
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    # os blocos gravam `mes` só com os meses presentes; a ordem vem das categorias
+    df["mes"] = pd.Categorical(df["mes"].astype(str), categories=ORDEM_MESES, ordered=True)
+    df["carga_horaria_semanal"] = df["carga_horaria_semanal"].astype("Int64")
+    return df
+
+
+def ler_tipada(path: Path = TIPADA_PATH) -> pd.DataFrame:
+    return _tipar(pd.read_parquet(path))
+
+
+def esquema_final(tipada: Path = TIPADA_PATH) -> pa.Schema:
+    """Esquema do parquet tratado, com os metadados do pandas (mesmo de `escrever_folha`)."""
+    arquivo = pq.ParquetFile(tipada)
+    # os tipos vêm do próprio arquivo; os metadados do pandas, de uma linha tipada
+    amostra = next(arquivo.iter_batches(batch_size=1), None)
+    amostra = arquivo.schema_arrow.empty_table() if amostra is None else pa.Table.from_batches([amostra])
+    metadados = pa.Schema.from_pandas(_tipar(amostra.to_pandas()), preserve_index=False).metadata
+    return arquivo.schema_arrow.with_metadata(metadados)
+
+
+def lotes_por_mes(tipada: Path = TIPADA_PATH, esquema: pa.Schema | None = None):
+    """Lotes da base tipada em ordem de mês, mantendo a ordem de leitura dentro do mês.
+
+    Mesma ordem de `ordenar_por_mes` (linhas sem mês no fim). Cada mês é um
+    filtro sobre o parquet tipado; `mes` é regravado com o dicionário
+    completo de `ORDEM_MESES`, igual em todos os lotes.
+    """
+    esquema = esquema_final(tipada) if esquema is None else esquema
+    dataset = ds.dataset(tipada, format="parquet")
+    posicao_mes = dataset.schema.get_field_index("mes")
+    meses = pa.array(ORDEM_MESES)
+
+    filtros = [ds.field("mes") == mes for mes in ORDEM_MESES] + [ds.field("mes").is_null()]
+    for i, filtro in enumerate(filtros):
+        # sem threads, os lotes saem na ordem do arquivo
+        for lote in dataset.to_batches(filter=filtro, use_threads=False, batch_readahead=1, fragment_readahead=1):
+            if lote.num_rows == 0:
+                continue
+            if i < len(ORDEM_MESES):
+                indices = pa.array(np.full(lote.num_rows, i, dtype=np.int8))
+            else:
+                indices = pa.nulls(lote.num_rows, pa.int8())
+            mes = pa.DictionaryArray.from_arrays(indices, meses, ordered=True)
+            yield pa.Table.from_batches([lote]).set_column(posicao_mes, "mes", mes).cast(esquema)
+
+
+def finalizar(tipada: Path = TIPADA_PATH, saida: Path = SAIDA_PATH, layout: Layout = LAYOUT_PADRAO) -> int:
+    """Base tratada final: ordenada por mês e gravada com o layout de leitura.
+
+    Devolve o número de linhas gravadas.
+    """
+    if layout.agrupar_por:
+        # o agrupamento ordena a base inteira: precisa dela em memória
+        df = ordenar_por_mes(ler_tipada(tipada))
+        escrever_folha(df, saida, layout)
+        return len(df)
+
+    return escrever_lotes(
+        lotes_por_mes(tipada),
+        esquema_final(tipada),
+        saida,
+        layout,
+        dicionario=colunas_dicionario_arquivo(tipada),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pasta", type=Path, help="pasta com os CSVs brutos do portal")
+    parser.add_argument("--linhas-por-bloco", type=int, default=LINHAS_POR_BLOCO)
+    parser.add_argument("--saida", type=Path, default=SAIDA_PATH, help="parquet tratado")
+    parser.add_argument("--layout", choices=list(LAYOUTS), default=LAYOUT_PADRAO.nome, help="layout do parquet (layout_parquet.py)")
+    args = parser.parse_args()
+
+    pasta = args.pasta.resolve()
+    saida = args.saida.resolve()
+    os.chdir(RAIZ_REPO)
+
+    arquivos = sorted(pasta.glob("*.csv"))
+    if not arquivos:
+        raise SystemExit(f"Nenhum CSV em {pasta}")
+
+    inicio = time.perf_counter()
+    estatisticas = ingerir(arquivos, linhas_por_bloco=args.linhas_por_bloco)
+    linhas = finalizar(saida=saida, layout=LAYOUTS[args.layout])
+
+    print(
+        f"{estatisticas['arquivos']} arquivos, {estatisticas['blocos']} blocos, "
+        f"{estatisticas['linhas_brutas']:,} linhas brutas -> {linhas:,} linhas em {saida} "
+        f"({time.perf_counter() - inicio:.1f} s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Layout do parquet da base tratada, otimizado para leitura.
+
+A base era gravada com as opções padrão do pandas: um único row group,
+snappy e linhas ordenadas só por mês. Qualquer leitura filtrada precisava
+descomprimir o arquivo inteiro.
+
+`escrever_folha` grava com um `Layout` configurável:
+
+- agrupamento (clustering) das linhas por colunas escolhidas, para que
+  cada row group cubra poucos valores de cada uma e as estatísticas
+  min/max descartem os demais na leitura filtrada;
+- row groups e páginas de tamanho ajustado;
+- zstd;
+- dicionário forçado nas colunas de baixa cardinalidade;
+- estatísticas por coluna e page index (column index/offset index).
+
+O layout padrão (`zstd`) mantém a ordem original das linhas e as colunas
+da base: o parquet publicado é lido com um `pd.read_parquet` comum. O
+agrupamento (`agrupado`) é opcional, para bases grandes (vários anos ou
+municípios) lidas com filtros; na escala atual a leitura completa em
+memória é mais rápida que qualquer leitura filtrada (ver `diferencial.py`).
+
+Reordenar as linhas mudaria resultados que dependem da primeira linha de
+cada servidor (`drop_duplicates`). Por isso, com agrupamento, a posição
+original de cada linha é gravada em `COLUNA_POSICAO`, e `restaurar_ordem`
+(aplicada por `dados.ler_folha`) devolve a base na ordem original, sem
+essa coluna: os números do painel não mudam.
+
+Comparação dos layouts (tamanho, leitura completa e leituras filtradas):
+
+    python app/layout_parquet.py
+    python app/layout_parquet.py --sintetico 20 --repeticoes 7
+"""
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+# posição da linha na base antes do agrupamento
+COLUNA_POSICAO = "_posicao"
+
+# colunas de texto com até este número de valores distintos usam dicionário
+MAX_DISTINTOS_DICIONARIO = 1024
+
+# row group de `escrever_lotes` quando o layout não fixa um: é o que fica
+# acumulado em memória antes de cada gravação
+LINHAS_POR_GRUPO_LOTES = 131072
+
+
+@dataclass(frozen=True)
+class Layout:
+    nome: str
+    agrupar_por: tuple[str, ...] = ()
+    linhas_por_grupo: int | None = None
+    tamanho_pagina: int | None = None
+    compressao: str = "snappy"
+    nivel_compressao: int | None = None
+    dicionario_forcado: bool = False
+    page_index: bool = False
+
+
+# o layout antigo (opções padrão do pandas) e os otimizados
+LAYOUTS = {
+    "padrao": Layout("padrao"),
+    "zstd": Layout(
+        "zstd",
+        linhas_por_grupo=8192,
+        tamanho_pagina=64 * 1024,
+        compressao="zstd",
+        nivel_compressao=3,
+        dicionario_forcado=True,
+        page_index=True,
+    ),
+    "agrupado": Layout(
+        "agrupado",
+        agrupar_por=("tipo_pagamento", "categoria_cargo", "id_servidor"),
+        linhas_por_grupo=8192,
+        tamanho_pagina=64 * 1024,
+        compressao="zstd",
+        nivel_compressao=3,
+        dicionario_forcado=True,
+        page_index=True,
+    ),
+}
+
+# ordem original e colunas da base; "agrupado" só por escolha explícita
+LAYOUT_PADRAO = LAYOUTS["zstd"]
+
+
+def colunas_dicionario(df: pd.DataFrame, max_distintos: int = MAX_DISTINTOS_DICIONARIO) -> list[str]:
+    """Colunas de texto/categóricas de baixa cardinalidade."""
+    colunas = []
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+            if serie.nunique(dropna=True) <= max_distintos:
+                colunas.append(coluna)
+    return colunas
+
+
+def colunas_dicionario_arquivo(path: Path, max_distintos: int = MAX_DISTINTOS_DICIONARIO) -> list[str]:
+    """Como `colunas_dicionario`, lendo um parquet em lotes.
+
+    Cada coluna de texto guarda no máximo `max_distintos` + 1 valores antes
+    de ser descartada: a memória não depende do tamanho do arquivo.
+    """
+    arquivo = pq.ParquetFile(path)
+    texto = [
+        campo.name for campo in arquivo.schema_arrow
+        if pa.types.is_string(campo.type) or pa.types.is_large_string(campo.type) or pa.types.is_dictionary(campo.type)
+    ]
+    distintos = {coluna: set() for coluna in texto}
+    for lote in arquivo.iter_batches(columns=texto):
+        for coluna in list(distintos):
+            valores = lote.column(coluna)
+            if pa.types.is_dictionary(valores.type):
+                valores = valores.dictionary_decode()
+            distintos[coluna].update(v for v in pc.unique(valores).to_pylist() if v is not None)
+            if len(distintos[coluna]) > max_distintos:
+                del distintos[coluna]
+    return [coluna for coluna in texto if coluna in distintos]
+
+
+def _opcoes_escrita(layout: Layout, dicionario: list[str]) -> dict:
+    opcoes = {
+        "compression": layout.compressao,
+        "compression_level": layout.nivel_compressao,
+        "write_statistics": True,
+    }
+    if layout.tamanho_pagina:
+        opcoes["data_page_size"] = layout.tamanho_pagina
+    if layout.dicionario_forcado:
+        opcoes["use_dictionary"] = dicionario
+    if layout.page_index:
+        opcoes["write_page_index"] = True
+    return opcoes
+
+
+def escrever_folha(df: pd.DataFrame, path: Path, layout: Layout = LAYOUT_PADRAO) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if layout.agrupar_por:
+        df = (
+            df.assign(**{COLUNA_POSICAO: np.arange(len(df), dtype=np.int64)})
+            .sort_values(list(layout.agrupar_por), kind="stable")
+            .reset_index(drop=True)
+        )
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    opcoes = _opcoes_escrita(layout, colunas_dicionario(df))
+    if layout.linhas_por_grupo:
+        opcoes["row_group_size"] = layout.linhas_por_grupo
+
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(tabela, tmp, **opcoes)
+    os.replace(tmp, path)
+
+
+def escrever_lotes(
+    lotes,
+    esquema: pa.Schema,
+    path: Path,
+    layout: Layout = LAYOUT_PADRAO,
+    dicionario: list[str] | None = None,
+) -> int:
+    """Grava uma sequência de tabelas Arrow, na ordem recebida, com o layout de leitura.
+
+    Equivalente a `escrever_folha` sobre a concatenação dos lotes, sem
+    montar a base em memória: só um row group fica acumulado por vez. O
+    agrupamento precisa da base inteira para ordenar as linhas e não é
+    aceito aqui. Devolve o número de linhas gravadas.
+    """
+    if layout.agrupar_por:
+        raise ValueError(f"O layout {layout.nome!r} reordena a base inteira: use escrever_folha")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    por_grupo = layout.linhas_por_grupo or LINHAS_POR_GRUPO_LOTES
+    opcoes = _opcoes_escrita(layout, dicionario if dicionario is not None else [c.name for c in esquema])
+
+    tmp = path.with_name(path.name + ".tmp")
+    pendentes, n_pendentes, total = [], 0, 0
+    with pq.ParquetWriter(tmp, esquema, **opcoes) as escritor:
+        for lote in lotes:
+            pendentes.append(lote)
+            n_pendentes += lote.num_rows
+            if n_pendentes >= por_grupo:
+                grupo = pa.concat_tables(pendentes)
+                cheios = (n_pendentes // por_grupo) * por_grupo
+                escritor.write_table(grupo.slice(0, cheios), row_group_size=por_grupo)
+                pendentes, n_pendentes = [grupo.slice(cheios)], n_pendentes - cheios
+                total += cheios
+        if n_pendentes:
+            escritor.write_table(pa.concat_tables(pendentes), row_group_size=por_grupo)
+            total += n_pendentes
+    os.replace(tmp, path)
+    return total
+
+
+def restaurar_ordem(df: pd.DataFrame) -> pd.DataFrame:
+    """Base na ordem anterior ao agrupamento (sem a coluna de posição)."""
+    if COLUNA_POSICAO not in df.columns:
+        return df
+    ordem = np.argsort(df[COLUNA_POSICAO].to_numpy(), kind="stable")
+    return df.take(ordem).drop(columns=COLUNA_POSICAO).reset_index(drop=True)
+
+
+# ---------------------------------------------
+# Benchmark de leitura
+# ---------------------------------------------
+def consultas_benchmark(df: pd.DataFrame) -> dict:
+    """Leituras típicas: base inteira e recortes usados pelas seções do painel."""
+    servidor = df["id_servidor"].iloc[len(df) // 2]
+    return {
+        "completa": None,
+        "rescisao": ds.field("tipo_pagamento") == "rescisao",
+        "comissionados": ds.field("categoria_cargo") == "comissionado",
+        "um servidor": ds.field("id_servidor") == servidor,
+        "folha mensal educacao": (ds.field("tipo_pagamento") == "folha_mensal")
+        & (ds.field("categoria_cargo") == "educacao"),
+    }
+
+
+def row_groups_lidos(path: Path, filtro) -> tuple[int, int]:
+    """Row groups que as estatísticas não conseguem descartar, e o total."""
+    fragmento = next(iter(ds.dataset(path, format="parquet").get_fragments()))
+    total = fragmento.metadata.num_row_groups
+    if filtro is None:
+        return total, total
+    return len(fragmento.split_by_row_group(filter=filtro)), total
+
+
+def _mediana_tempo(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return float(np.median(tempos))
+
+
+def benchmark(df: pd.DataFrame, layouts=None, repeticoes: int = 5) -> pd.DataFrame:
+    layouts = list(LAYOUTS.values()) if layouts is None else layouts
+    consultas = consultas_benchmark(df)
+
+    linhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for layout in layouts:
+            path = Path(pasta) / f"{layout.nome}.parquet"
+            escrever_folha(df, path, layout)
+
+            for nome, filtro in consultas.items():
+                dataset = ds.dataset(path, format="parquet")
+                tempo = _mediana_tempo(lambda: dataset.to_table(filter=filtro), repeticoes)
+                lidos, total = row_groups_lidos(path, filtro)
+                linhas.append({
+                    "layout": layout.nome,
+                    "consulta": nome,
+                    "tamanho_kib": path.stat().st_size / 2**10,
+                    "tempo_ms": tempo * 1000,
+                    "row_groups_lidos": f"{lidos}/{total}",
+                    "linhas": dataset.count_rows(filter=filtro),
+                })
+
+    return pd.DataFrame(linhas)
+
+
+def main():
+    from dados import ler_folha
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sintetico", type=int, default=1, help="replica a base N vezes (ver teste_carga.py)")
+    parser.add_argument("--repeticoes", type=int, default=5, help="leituras por medição (mediana)")
+    args = parser.parse_args()
+
+    os.chdir(RAIZ_REPO)
+    df = ler_folha()
+    if args.sintetico > 1:
+        from teste_carga import gerar_base_sintetica
+        df = gerar_base_sintetica(df, args.sintetico)
+
+    print(f"{len(df):,} linhas")
+    resultado = benchmark(df, repeticoes=args.repeticoes)
+    with pd.option_context("display.width", 120, "display.float_format", "{:,.1f}".format):
+        print(resultado.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Medição do payload enviado ao navegador pelo painel.
+
+Executa `app/app.py` de forma headless (API de testes do Streamlit) e
+reporta o tamanho serializado de cada mensagem de gráfico e de tabela.
+
+Uso (a partir da raiz do repositório):
+
+    python app/payload.py
+    python app/payload.py --todos      # inclui markdown, imagens, etc.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+from streamlit.testing.v1 import AppTest
+
+APP_PATH = Path(__file__).with_name("app.py")
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+TIPOS_MEDIDOS = {"vega_lite_chart", "arrow_vega_lite_chart", "dataframe"}
+
+
+def _percorrer(no):
+    yield no
+    for filho in getattr(no, "children", {}).values():
+        yield from _percorrer(filho)
+
+
+def _descricao(elemento) -> str:
+    proto = elemento.proto
+    tipo = elemento.type
+
+    if tipo in ("vega_lite_chart", "arrow_vega_lite_chart"):
+        spec = json.loads(proto.spec) if proto.spec else {}
+        titulo = spec.get("title", "")
+        if isinstance(titulo, dict):
+            titulo = titulo.get("text", "")
+        spec_bytes = len(proto.spec.encode("utf-8"))
+        dados_bytes = sum(d.ByteSize() for d in proto.datasets)
+        return f"{titulo or '(sem título)'} [spec={spec_bytes} B, dados={dados_bytes} B]"
+
+    if tipo == "dataframe":
+        tabela = pa.ipc.open_stream(proto.arrow_data.data).read_all()
+        return f"{tabela.num_rows} linhas x {tabela.num_columns} colunas"
+
+    if tipo == "markdown":
+        return proto.body.strip().splitlines()[0][:60] if proto.body.strip() else ""
+
+    return ""
+
+
+def medir_payload(todos: bool = False) -> list[dict]:
+    """Roda o app uma vez e devolve uma linha por elemento medido."""
+    at = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    at.run()
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    linhas = []
+    for elemento in _percorrer(at._tree):
+        tipo = getattr(elemento, "type", None)
+        proto = getattr(elemento, "proto", None)
+        if proto is None or tipo is None:
+            continue
+        if not todos and tipo not in TIPOS_MEDIDOS:
+            continue
+
+        linhas.append({
+            "tipo": tipo,
+            "bytes": proto.ByteSize(),
+            "descricao": _descricao(elemento),
+        })
+
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--todos",
+        action="store_true",
+        help="mede todos os elementos da página, não só gráficos e tabelas",
+    )
+    args = parser.parse_args()
+
+    # DATA_PATH do app é relativo à raiz do repositório
+    os.chdir(RAIZ_REPO)
+
+    linhas = medir_payload(todos=args.todos)
+
+    total = 0
+    por_tipo: dict[str, int] = {}
+    for i, linha in enumerate(linhas, start=1):
+        total += linha["bytes"]
+        por_tipo[linha["tipo"]] = por_tipo.get(linha["tipo"], 0) + linha["bytes"]
+        print(f"{i:>3}  {linha['tipo']:<22} {linha['bytes']:>9,} B  {linha['descricao']}")
+
+    print()
+    for tipo, n in sorted(por_tipo.items(), key=lambda kv: -kv[1]):
+        print(f"     {tipo:<22} {n:>9,} B")
+    print(f"     {'TOTAL':<22} {total:>9,} B")
+
+
+if __name__ == "__main__":
+    main()
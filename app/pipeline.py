@@ -0,0 +1,315 @@
+"""Pipeline de preparação sem notebook, com cache por etapa.
+
+Executa as etapas do `03_data_preparation` como um job de linha de
+comando (agendável):
+
+    carregar -> categorizar, genero, ids, mandato -> montar -> validar -> escrever
+
+- `carregar`: lê os CSVs brutos em blocos e tipa cada bloco (`ingestao.py`);
+- `categorizar`: categoria de cada cargo (`categorias_cargo.py`);
+- `genero`: gênero pelo índice persistente (`indice_genero.py`);
+- `ids`: `id_servidor` (hash do nome normalizado);
+- `mandato`: linhas de prefeito/vice de mandatos anteriores;
+- `montar`: colunas finais, ordenadas por mês;
+- `validar`: contrato de dados (`contrato.py`); uma base reprovada não é gravada;
+- `escrever`: parquet tratado (layout de leitura), resumo, sketches de
+  salário e HyperLogLogs de servidores do painel.
+
+O resultado de cada etapa fica em `data/interim/pipeline/`, identificado
+pelo hash das entradas (hashes das etapas anteriores), do código (fonte da
+etapa e dos módulos que ela usa) e da configuração que ela lê (regras de
+cargo, conteúdo dos CSVs e do índice de gênero, início do mandato). Uma
+nova execução só refaz as etapas cujo hash mudou e as que dependem delas:
+mudar uma regra de cargo refaz `categorizar`, `montar` e `escrever`, e os
+CSVs brutos não são relidos.
+
+    python app/pipeline.py
+    python app/pipeline.py --raw data/raw --regras regras.json --forcar
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from cache_disco import versao_codigo
+from categorias_cargo import REGRAS_PADRAO, ClassificadorCargos, carregar_regras
+from contagem_distinta import caminho_hll, salvar_hll
+from contrato import contrato_padrao, validar as validar_contrato
+from indice_genero import INDICE_PATH, anexar_genero, carregar_indice
+from ingestao import LINHAS_POR_BLOCO, SAIDA_PATH, ler_blocos
+from layout_parquet import LAYOUT_PADRAO, LAYOUTS, escrever_folha
+from preparacao import (
+    INICIO_MANDATO,
+    gerar_id_servidor,
+    mascara_mandato,
+    montar_final,
+    normalizar_lote,
+    ordenar_por_mes,
+)
+from registro import MUNICIPIO_PADRAO, UF_PADRAO
+from resumo import caminho_resumo, salvar_resumo
+from secoes import ANO_REFERENCIA
+from sketches import caminho_sketches, salvar_sketches
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+CACHE_PIPELINE = Path("data/interim/pipeline")
+MANIFESTO = "manifesto.json"
+
+# versões guardadas de cada etapa (as mais antigas são apagadas)
+MAX_VERSOES_ETAPA = 3
+
+
+@dataclass(frozen=True)
+class Configuracao:
+    pasta_bruta: Path = Path("data/raw")
+    regras: dict = field(default_factory=lambda: REGRAS_PADRAO)
+    indice_genero: Path = INDICE_PATH
+    inicio_mandato: str = str(INICIO_MANDATO.date())
+    saida: Path = SAIDA_PATH
+    linhas_por_bloco: int = LINHAS_POR_BLOCO
+    ano: int = ANO_REFERENCIA
+    municipio: str = MUNICIPIO_PADRAO
+    uf: str = UF_PADRAO
+    # nome em `layout_parquet.LAYOUTS`
+    layout: str = LAYOUT_PADRAO.nome
+
+    def arquivos_brutos(self) -> list[Path]:
+        return sorted(Path(self.pasta_bruta).glob("*.csv"))
+
+
+def hash_arquivo(path: Path) -> str:
+    path = Path(path)
+    if not path.exists():
+        return "ausente"
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(2**20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+# ---------------------------------------------
+# Etapas
+# ---------------------------------------------
+def carregar(config: Configuracao) -> pd.DataFrame:
+    lotes = [
+        normalizar_lote(bruto)
+        for arquivo in config.arquivos_brutos()
+        for bruto in ler_blocos(arquivo, config.linhas_por_bloco)
+    ]
+    if not lotes:
+        raise FileNotFoundError(f"Nenhum CSV em {config.pasta_bruta}")
+    return pd.concat(lotes, ignore_index=True)
+
+
+def categorizar(config: Configuracao, normalizada: pd.DataFrame) -> pd.DataFrame:
+    return ClassificadorCargos(config.regras).categorizar(normalizada["cargo"]).to_frame()
+
+
+def genero(config: Configuracao, normalizada: pd.DataFrame) -> pd.DataFrame:
+    indice = carregar_indice(config.indice_genero)
+    return anexar_genero(normalizada[["nome"]], indice=indice, coluna="genero")[["genero"]]
+
+
+def ids(config: Configuracao, normalizada: pd.DataFrame) -> pd.DataFrame:
+    return gerar_id_servidor(normalizada["nome"]).to_frame("id_servidor")
+
+
+def mandato(config: Configuracao, normalizada: pd.DataFrame) -> pd.DataFrame:
+    return mascara_mandato(normalizada, config.inicio_mandato).to_frame("manter")
+
+
+def montar(config, normalizada, categoria, genero, ids, mandato) -> pd.DataFrame:
+    final = montar_final(
+        normalizada,
+        categoria["categoria_cargo"],
+        genero["genero"],
+        ids["id_servidor"],
+        mandato["manter"],
+    )
+    return ordenar_por_mes(final)
+
+
+def validar(config: Configuracao, final: pd.DataFrame) -> pd.DataFrame:
+    relatorio = validar_contrato(final, contrato_padrao(config.ano, config.regras)).exigir()
+    return relatorio.tabela
+
+
+def escrever(config: Configuracao, final: pd.DataFrame, validacao: pd.DataFrame) -> None:
+    escrever_folha(final, config.saida, LAYOUTS[config.layout])
+    salvar_resumo(final, path=caminho_resumo(config.saida), dados_path=config.saida)
+    salvar_sketches(final, config.municipio, config.uf, config.ano, dados_path=config.saida)
+    salvar_hll(final, config.municipio, config.uf, config.ano, dados_path=config.saida)
+
+
+def arquivos_escritos(saida: Path) -> list[Path]:
+    """Arquivos gravados por `escrever`: um deles alterado ou apagado refaz a etapa."""
+    return [Path(saida), caminho_resumo(saida), caminho_sketches(saida), caminho_hll(saida)]
+
+
+@dataclass(frozen=True)
+class Etapa:
+    nome: str
+    funcao: object
+    entradas: tuple[str, ...] = ()
+    # parte da configuração lida pela etapa (entra no hash)
+    parametros: object = None
+    # funções cujo módulo inteiro entra no hash (o código que a etapa chama)
+    modulos: tuple = ()
+    # etapas finais gravam arquivos em vez de devolver um resultado
+    efeito: bool = False
+
+
+ETAPAS = [
+    Etapa(
+        "carregar",
+        carregar,
+        parametros=lambda c: [(a.name, hash_arquivo(a)) for a in c.arquivos_brutos()],
+        modulos=(normalizar_lote, ler_blocos),
+    ),
+    Etapa("categorizar", categorizar, ("carregar",), parametros=lambda c: c.regras, modulos=(ClassificadorCargos,)),
+    Etapa("genero", genero, ("carregar",), parametros=lambda c: hash_arquivo(c.indice_genero), modulos=(anexar_genero,)),
+    Etapa("ids", ids, ("carregar",), modulos=(gerar_id_servidor,)),
+    Etapa("mandato", mandato, ("carregar",), parametros=lambda c: c.inicio_mandato, modulos=(mascara_mandato,)),
+    Etapa("montar", montar, ("carregar", "categorizar", "genero", "ids", "mandato"), modulos=(montar_final,)),
+    Etapa(
+        "validar",
+        validar,
+        ("montar",),
+        parametros=lambda c: [c.ano, c.regras],
+        modulos=(validar_contrato,),
+    ),
+    Etapa(
+        "escrever",
+        escrever,
+        ("montar", "validar"),
+        parametros=lambda c: [
+            str(c.saida),
+            [(a.name, hash_arquivo(a)) for a in arquivos_escritos(c.saida)],
+            c.municipio,
+            c.uf,
+            c.layout,
+        ],
+        modulos=(escrever_folha, salvar_resumo, salvar_sketches, salvar_hll),
+        efeito=True,
+    ),
+]
+
+
+# ---------------------------------------------
+# Execução
+# ---------------------------------------------
+class Pipeline:
+    def __init__(self, config: Configuracao, etapas: list[Etapa] = ETAPAS, diretorio: Path = CACHE_PIPELINE):
+        self.config = config
+        self.etapas = etapas
+        self.diretorio = Path(diretorio)
+
+    def _hash(self, etapa: Etapa, hashes: dict[str, str]) -> str:
+        parametros = etapa.parametros(self.config) if etapa.parametros else None
+        partes = [
+            etapa.nome,
+            inspect.getsource(etapa.funcao),
+            *[versao_codigo(m) for m in etapa.modulos],
+            json.dumps(parametros, sort_keys=True, default=str),
+            *[hashes[e] for e in etapa.entradas],
+        ]
+        return hashlib.sha1("\n".join(partes).encode("utf-8")).hexdigest()[:16]
+
+    def _caminho(self, etapa: Etapa, h: str) -> Path:
+        return self.diretorio / f"{etapa.nome}-{h}.parquet"
+
+    def _ler_manifesto(self) -> dict:
+        try:
+            return json.loads((self.diretorio / MANIFESTO).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _podar(self, etapa: Etapa):
+        versoes = sorted(self.diretorio.glob(f"{etapa.nome}-*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for antiga in versoes[MAX_VERSOES_ETAPA:]:
+            antiga.unlink(missing_ok=True)
+
+    def executar(self, forcar: bool = False) -> list[dict]:
+        """Executa as etapas em ordem; devolve, por etapa, o hash, a origem e o tempo."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        manifesto = self._ler_manifesto()
+
+        hashes, resultados, relatorio = {}, {}, []
+        for etapa in self.etapas:
+            inicio = time.perf_counter()
+            h = hashes[etapa.nome] = self._hash(etapa, hashes)
+
+            if etapa.efeito:
+                # o hash inclui o conteúdo atual das saídas: arquivo apagado ou alterado à mão é regravado
+                if not forcar and manifesto.get(etapa.nome) == h:
+                    origem = "cache"
+                else:
+                    etapa.funcao(self.config, *[self._obter(e, hashes, resultados) for e in etapa.entradas])
+                    # registra o hash com a saída recém-gravada
+                    h = hashes[etapa.nome] = self._hash(etapa, hashes)
+                    origem = "executada"
+            else:
+                caminho = self._caminho(etapa, h)
+                if not forcar and caminho.exists():
+                    origem = "cache"
+                else:
+                    resultado = etapa.funcao(self.config, *[self._obter(e, hashes, resultados) for e in etapa.entradas])
+                    tmp = caminho.with_name(caminho.name + ".tmp")
+                    resultado.to_parquet(tmp, index=False)
+                    os.replace(tmp, caminho)
+                    resultados[etapa.nome] = resultado
+                    self._podar(etapa)
+                    origem = "executada"
+
+            manifesto[etapa.nome] = h
+            relatorio.append({
+                "etapa": etapa.nome,
+                "hash": h,
+                "origem": origem,
+                "segundos": time.perf_counter() - inicio,
+            })
+
+        (self.diretorio / MANIFESTO).write_text(json.dumps(manifesto, indent=2), encoding="utf-8")
+        return relatorio
+
+    def _obter(self, nome: str, hashes: dict[str, str], resultados: dict) -> pd.DataFrame:
+        """Resultado de uma etapa anterior (em memória ou lido do cache)."""
+        if nome not in resultados:
+            etapa = next(e for e in self.etapas if e.nome == nome)
+            resultados[nome] = pd.read_parquet(self._caminho(etapa, hashes[nome]))
+        return resultados[nome]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raw", type=Path, help=f"pasta com os CSVs brutos (padrão: {Configuracao.pasta_bruta})")
+    parser.add_argument("--regras", type=Path, help="JSON de regras de cargo (padrão: REGRAS_PADRAO)")
+    parser.add_argument("--saida", type=Path, help=f"parquet tratado (padrão: {Configuracao.saida})")
+    parser.add_argument("--layout", choices=list(LAYOUTS), default=Configuracao.layout, help="layout do parquet (layout_parquet.py)")
+    parser.add_argument("--forcar", action="store_true", help="refaz todas as etapas, ignorando o cache")
+    args = parser.parse_args()
+
+    # caminhos passados na linha de comando são relativos ao diretório atual;
+    # os padrões, à raiz do repositório
+    regras = carregar_regras(args.regras.resolve()) if args.regras else REGRAS_PADRAO
+    pasta_bruta = args.raw.resolve() if args.raw else Configuracao.pasta_bruta
+    saida = args.saida.resolve() if args.saida else Configuracao.saida
+    os.chdir(RAIZ_REPO)
+
+    config = Configuracao(pasta_bruta=pasta_bruta, regras=regras, saida=saida, layout=args.layout)
+    inicio = time.perf_counter()
+    for linha in Pipeline(config).executar(forcar=args.forcar):
+        print(f"{linha['etapa']:<12} {linha['origem']:<10} {linha['segundos']:>7.2f} s  {linha['hash']}")
+    print(f"total {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
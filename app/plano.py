@@ -0,0 +1,438 @@
+"""Seções do painel declaradas como especificações e executadas em um plano.
+
+Várias seções recalculavam as mesmas subexpressões com nomes diferentes
+(`df_unico`, `df_com_unico`, `df_comissionados`, `df_cargos_c_unico`,
+`df_mensal_unico`...): a primeira linha de cada servidor, o filtro de
+`folha_mensal`, o filtro de comissionados. Aqui cada seção é uma `Secao`:
+
+- `fonte`: sequência de passos sobre a base (filtros, uma linha por
+  servidor, descarte de nulos);
+- `grupo`, `medidas`, `ordem` e `limite`: o agregado em si;
+- `formato`: ajuste opcional do resultado para o formato usado pelo painel.
+
+`compilar` junta as fontes de todas as seções em um plano: cada prefixo de
+fonte é um nó, e seções com o mesmo prefixo usam o mesmo nó. Na execução
+cada nó é calculado uma única vez, a partir do nó pai, e as seções fazem só
+o trabalho próprio delas. Uma seção nova que reaproveita uma fonte existente
+custa apenas o seu agrupamento.
+
+As funções de `secoes.py` continuam como referência; `diferencial.py`
+compara o plano com elas (motor `plano`).
+
+    python app/plano.py
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from secoes import ANO_REFERENCIA, first_notna, flag_comissionado
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+
+# ---------------------------------------------
+# Passos de fonte
+# ---------------------------------------------
+@dataclass(frozen=True)
+class Filtro:
+    coluna: str
+    valor: object
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[df[self.coluna] == self.valor]
+
+
+@dataclass(frozen=True)
+class Comissionado:
+    """Linhas com marcador de comissionado no cargo (regras de `categorias_cargo.py`)."""
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[flag_comissionado(df["cargo"])]
+
+
+@dataclass(frozen=True)
+class SemNulos:
+    coluna: str
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.dropna(subset=[self.coluna])
+
+
+@dataclass(frozen=True)
+class PrimeiraPorServidor:
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.drop_duplicates(subset="id_servidor")
+
+
+@dataclass(frozen=True)
+class MaiorPorServidor:
+    """Linha de maior valor de cada servidor (o salário mensal dos rankings)."""
+
+    coluna: str = "proventos"
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return (
+            df.sort_values(["id_servidor", self.coluna], ascending=[True, False])
+            .drop_duplicates(subset=["id_servidor"], keep="first")
+        )
+
+
+FOLHA_MENSAL = Filtro("tipo_pagamento", "folha_mensal")
+CATEGORIA_COMISSIONADO = Filtro("categoria_cargo", "comissionado")
+UM_POR_SERVIDOR = PrimeiraPorServidor()
+SALARIO_MENSAL = MaiorPorServidor()
+
+
+@dataclass(frozen=True)
+class SalarioOuVazioPorServidor:
+    """Linha do salário mensal de cada servidor (`com_folha`); quem não tem
+    folha_mensal com proventos (só rescisão, por exemplo) fica com a primeira
+    linha e proventos vazio."""
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        mensal = SALARIO_MENSAL.aplicar(SemNulos("proventos").aplicar(FOLHA_MENSAL.aplicar(df)))
+        sem_folha = UM_POR_SERVIDOR.aplicar(df[~df["id_servidor"].isin(mensal["id_servidor"])])
+        return pd.concat(
+            [mensal.assign(com_folha=True), sem_folha.assign(com_folha=False, proventos=np.nan)],
+            ignore_index=True,
+        )
+
+
+@dataclass(frozen=True)
+class PerfilPorServidor:
+    """Gênero e categoria de cada servidor; qualquer cargo comissionado faz dele comissionado."""
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        perfil = (
+            df[["id_servidor", "genero", "categoria_cargo"]]
+            .assign(comissionado=flag_comissionado(df["cargo"]))
+            .groupby("id_servidor", as_index=False)
+            .agg(
+                genero=("genero", first_notna),
+                categoria_cargo=("categoria_cargo", first_notna),
+                comissionado=("comissionado", "any"),
+            )
+        )
+        perfil.loc[perfil["comissionado"], "categoria_cargo"] = "comissionado"
+        categoria = perfil["categoria_cargo"].astype(str).str.strip().str.lower().replace({"nan": None})
+        return perfil.assign(categoria_cargo=categoria, feminino=perfil["genero"] == "F")
+
+
+@dataclass(frozen=True)
+class DesligadoNoAno:
+    """Marca (`desligado`) as linhas com desligamento no ano."""
+
+    ano: int
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.assign(desligado=df["data_desligamento"].dt.year == self.ano)
+
+
+# ---------------------------------------------
+# Seções
+# ---------------------------------------------
+def _moda(valores: pd.Series):
+    return valores.mode().iloc[0]
+
+
+def _contagem_moda(valores: pd.Series) -> int:
+    return int((valores == _moda(valores)).sum())
+
+
+# agregações além das do pandas (`sum`, `max`, `nunique`, `size`...)
+AGREGACOES = {
+    "moda": _moda,
+    "contagem_moda": _contagem_moda,
+}
+
+
+@dataclass(frozen=True)
+class Secao:
+    nome: str
+    fonte: tuple = ()
+    grupo: tuple[str, ...] = ()
+    # (coluna de saída, coluna de entrada, agregação)
+    medidas: tuple[tuple[str, str, str], ...] = ()
+    # (coluna, crescente)
+    ordem: tuple[tuple[str, bool], ...] = ()
+    limite: int | None = None
+    # coluna `rank` com a posição (1, 2, ...)
+    ranking: bool = False
+    # grupos com chave nula entram no resultado (o formato decide o que fazer com eles)
+    grupos_nulos: bool = False
+    formato: object = None
+
+    def calcular(self, fonte: pd.DataFrame):
+        if not self.grupo:
+            # sem grupo: um valor por medida (ou o próprio valor, se for uma só)
+            valores = {
+                saida: _python(fonte[coluna].agg(AGREGACOES.get(agregacao, agregacao)))
+                for saida, coluna, agregacao in self.medidas
+            }
+            resultado = next(iter(valores.values())) if len(valores) == 1 else valores
+        else:
+            resultado = (
+                fonte.groupby(list(self.grupo), dropna=not self.grupos_nulos)
+                .agg(**{saida: (coluna, AGREGACOES.get(agregacao, agregacao)) for saida, coluna, agregacao in self.medidas})
+                .reset_index()
+            )
+            if self.ordem:
+                resultado = resultado.sort_values(
+                    [coluna for coluna, _ in self.ordem],
+                    ascending=[crescente for _, crescente in self.ordem],
+                )
+            if self.limite is not None:
+                resultado = resultado.head(self.limite)
+            resultado = resultado.reset_index(drop=True)
+            if self.ranking:
+                resultado["rank"] = resultado.index + 1
+
+        return self.formato(resultado) if self.formato else resultado
+
+
+def _python(valor):
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+def _por_genero(contagem: pd.DataFrame) -> dict:
+    por_genero = dict(zip(contagem["genero"], contagem["servidores"]))
+    return {g: int(por_genero.get(g, 0)) for g in ("M", "F")}
+
+
+def _tabela_comissionados(tabela: pd.DataFrame) -> dict:
+    return {
+        "tabela": tabela.drop(columns="com_folha"),
+        "total_comissionados": int(tabela["quantidade_pessoas"].sum()),
+        "somente_rescisao": int(tabela.loc[~tabela["com_folha"], "quantidade_pessoas"].sum()),
+    }
+
+
+def _perfil_genero(perfil: pd.DataFrame) -> pd.DataFrame:
+    perfil = perfil.assign(total_masculino=perfil["total_categoria"] - perfil["total_feminino"])
+    for genero in ("feminino", "masculino"):
+        # evita divisão por zero
+        perfil[f"percentual_{genero}"] = (
+            (perfil[f"total_{genero}"] / perfil["total_categoria"].replace({0: pd.NA})) * 100
+        ).round(1).fillna(0.0)
+    return perfil.sort_values("total_categoria", ascending=False)
+
+
+def _desligamentos(tabela: pd.DataFrame) -> dict:
+    total_desligados = int(tabela["quantidade_servidores"].sum())
+    total_servidores = int(tabela["servidores"].sum())
+    por_categoria = tabela.loc[
+        tabela["categoria_cargo"].notna() & (tabela["quantidade_servidores"] > 0),
+        ["categoria_cargo", "quantidade_servidores"],
+    ].sort_values("quantidade_servidores", ascending=False)
+    return {
+        "total_desligados": total_desligados,
+        "total_servidores": total_servidores,
+        "pct_desligados": round((total_desligados / total_servidores) * 100, 2),
+        "por_categoria": por_categoria,
+    }
+
+
+def _top_salarios(nome: str, genero: str | None = None) -> Secao:
+    fonte = (FOLHA_MENSAL, SALARIO_MENSAL) + ((Filtro("genero", genero),) if genero else ())
+    return Secao(
+        nome,
+        fonte=fonte,
+        grupo=("id_servidor", "cargo") + (("genero",) if genero is None else ()),
+        medidas=(("salario_maximo", "proventos", "max"),),
+        # empates de salário em ordem de servidor (como `secoes.top_salarios`)
+        ordem=(("salario_maximo", False), ("id_servidor", True)),
+        limite=10,
+        ranking=True,
+    )
+
+
+def secoes_plano(ano: int = ANO_REFERENCIA) -> list[Secao]:
+    """Seções do painel; `ano` é o dos desligamentos."""
+    return [
+        Secao("total_servidores", medidas=(("total_servidores", "id_servidor", "nunique"),)),
+        Secao("total_proventos", medidas=(("total_proventos", "proventos", "sum"),)),
+        Secao(
+            "contagem_genero",
+            fonte=(UM_POR_SERVIDOR,),
+            grupo=("genero",),
+            medidas=(("total_servidores", "id_servidor", "size"),),
+            ordem=(("total_servidores", False),),
+        ),
+        Secao(
+            "custo_por_categoria",
+            grupo=("categoria_cargo",),
+            medidas=(("custo_folha_anual_categoria", "proventos", "sum"),),
+            ordem=(("custo_folha_anual_categoria", False),),
+        ),
+        _top_salarios("top_salarios"),
+        _top_salarios("top_salarios_masculino", "M"),
+        _top_salarios("top_salarios_feminino", "F"),
+        Secao(
+            "comissionados_lista",
+            fonte=(Comissionado(), UM_POR_SERVIDOR),
+            grupo=("cargo",),
+            medidas=(("quantidade_servidores", "id_servidor", "nunique"),),
+            ordem=(("quantidade_servidores", False),),
+        ),
+        Secao(
+            "comissionados_genero",
+            fonte=(CATEGORIA_COMISSIONADO, UM_POR_SERVIDOR),
+            grupo=("genero",),
+            medidas=(("servidores", "id_servidor", "size"),),
+            formato=_por_genero,
+        ),
+        Secao("gasto_comissionados", fonte=(CATEGORIA_COMISSIONADO,), medidas=(("gasto", "proventos", "sum"),)),
+        Secao(
+            "carga_horaria_comissionados",
+            fonte=(CATEGORIA_COMISSIONADO, UM_POR_SERVIDOR),
+            medidas=(
+                ("carga_min", "carga_horaria_semanal", "min"),
+                ("carga_max", "carga_horaria_semanal", "max"),
+                ("carga_moda", "carga_horaria_semanal", "moda"),
+                # quantos servidores têm essa carga predominante
+                ("qtd_moda", "carga_horaria_semanal", "contagem_moda"),
+                ("total_com", "id_servidor", "nunique"),
+            ),
+        ),
+        Secao(
+            "carga_horaria_categorias",
+            fonte=(UM_POR_SERVIDOR,),
+            grupo=("carga_horaria_semanal", "categoria_cargo"),
+            medidas=(("quantidade_servidores", "id_servidor", "nunique"),),
+            ordem=(("carga_horaria_semanal", True), ("quantidade_servidores", False)),
+        ),
+        Secao(
+            "comissionados_salarios",
+            fonte=(CATEGORIA_COMISSIONADO, SalarioOuVazioPorServidor()),
+            grupo=("cargo", "com_folha"),
+            medidas=(
+                ("salario_base_mensal", "proventos", "max"),
+                ("quantidade_pessoas", "id_servidor", "nunique"),
+            ),
+            ordem=(("salario_base_mensal", False),),
+            formato=_tabela_comissionados,
+        ),
+        Secao(
+            "perfil_genero_categoria",
+            fonte=(PerfilPorServidor(),),
+            grupo=("categoria_cargo",),
+            medidas=(("total_categoria", "id_servidor", "nunique"), ("total_feminino", "feminino", "sum")),
+            formato=_perfil_genero,
+        ),
+        Secao(
+            "desligamentos",
+            fonte=(UM_POR_SERVIDOR, DesligadoNoAno(ano)),
+            grupo=("categoria_cargo",),
+            medidas=(("quantidade_servidores", "desligado", "sum"), ("servidores", "id_servidor", "nunique")),
+            # servidores sem categoria contam nos totais
+            grupos_nulos=True,
+            formato=_desligamentos,
+        ),
+    ]
+
+
+SECOES_PLANO = secoes_plano()
+
+
+# ---------------------------------------------
+# Plano
+# ---------------------------------------------
+class Plano:
+    def __init__(self, secoes: list[Secao]):
+        self.secoes = list(secoes)
+        nomes = [s.nome for s in self.secoes]
+        if len(set(nomes)) != len(nomes):
+            raise ValueError("Seções com nomes repetidos no plano")
+
+        # nó = prefixo de fonte; valor = seções que passam por ele
+        self.nos: dict[tuple, list[str]] = {}
+        for secao in self.secoes:
+            for i in range(len(secao.fonte) + 1):
+                self.nos.setdefault(secao.fonte[:i], []).append(secao.nome)
+
+    def executar(self, df: pd.DataFrame) -> dict:
+        """Resultado de cada seção; cada nó de fonte é calculado uma vez."""
+        calculados = {(): df}
+
+        def no(prefixo: tuple) -> pd.DataFrame:
+            if prefixo not in calculados:
+                calculados[prefixo] = prefixo[-1].aplicar(no(prefixo[:-1]))
+            return calculados[prefixo]
+
+        return {secao.nome: secao.calcular(no(secao.fonte)) for secao in self.secoes}
+
+    def descrever(self) -> str:
+        """Nós do plano, com as seções que compartilham cada um."""
+        linhas = []
+        for prefixo, secoes in sorted(self.nos.items(), key=lambda item: len(item[0])):
+            passos = " -> ".join(_nome_passo(p) for p in prefixo) or "base"
+            linhas.append(f"{passos}: {len(secoes)} seção(ões) ({', '.join(secoes)})")
+        return "\n".join(linhas)
+
+
+def _nome_passo(passo) -> str:
+    if isinstance(passo, Filtro):
+        return f"{passo.coluna} = {passo.valor}"
+    if isinstance(passo, SemNulos):
+        return f"{passo.coluna} não nulo"
+    if isinstance(passo, DesligadoNoAno):
+        return f"desligamento em {passo.ano}"
+    return type(passo).__name__
+
+
+def compilar(secoes: list[Secao] = SECOES_PLANO) -> Plano:
+    return Plano(secoes)
+
+
+PLANO_PADRAO = compilar()
+
+
+@lru_cache(maxsize=8)
+def plano_do_ano(ano: int) -> Plano:
+    return PLANO_PADRAO if ano == ANO_REFERENCIA else compilar(secoes_plano(ano))
+
+
+def executar_plano(df: pd.DataFrame, ano: int = ANO_REFERENCIA) -> dict:
+    """Todas as seções do plano sobre a base (guardado pelo registro); `ano` é o dos desligamentos."""
+    return plano_do_ano(ano).executar(df)
+
+
+def main():
+    from dados import ler_folha
+    from diferencial import SECOES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sintetico", type=int, default=1, help="replica a base N vezes (ver teste_carga.py)")
+    args = parser.parse_args()
+
+    os.chdir(RAIZ_REPO)
+    df = ler_folha()
+    if args.sintetico > 1:
+        from teste_carga import gerar_base_sintetica
+        df = gerar_base_sintetica(df, args.sintetico)
+
+    print(PLANO_PADRAO.descrever())
+
+    inicio = time.perf_counter()
+    for secao in PLANO_PADRAO.secoes:
+        SECOES[secao.nome](df)
+    separadas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    executar_plano(df)
+    plano = time.perf_counter() - inicio
+
+    print(
+        f"\n{len(df):,} linhas, {len(PLANO_PADRAO.secoes)} seções: "
+        f"separadas {separadas * 1000:.0f} ms, plano {plano * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
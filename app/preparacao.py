@@ -0,0 +1,173 @@
+"""Tratamento das linhas brutas do Portal da Transparência.
+
+As transformações do notebook `03_data_preparation`, escritas como
+funções vetorizadas sobre um lote de linhas. Todas atuam linha a linha
+(nenhuma depende das demais linhas da base), então podem ser aplicadas a
+um arquivo inteiro ou a cada bloco de uma leitura em streaming
+(`ingestao.py`) com o mesmo resultado.
+
+A única etapa global é `ordenar_por_mes`, aplicada sobre a base já tipada.
+"""
+import hashlib
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from categorias_cargo import ClassificadorCargos, classificador_padrao
+from indice_genero import anexar_genero
+
+ENCODING_BRUTO = "latin1"
+SEPARADOR_BRUTO = ";"
+
+COLUNAS_BRUTAS = {
+    "Referência": "referencia",
+    "Nome": "nome",
+    "Cargo": "cargo",
+    "Data Admissão": "data_admissao",
+    "Tipo de Regime": "tipo_regime",
+    "Descontos": "descontos",
+    "Liquido": "liquido",
+    "Data Desligamento": "data_desligamento",
+    "Proventos": "proventos",
+    "Contrato": "contrato",
+    "Atividade": "atividade",
+    "Nome Atividade": "nome_atividade",
+    "Tipo de Contrato": "tipo_contrato",
+    "Data Prevista Termino Contrato": "data_prevista_termino_contrato",
+    "Carga Horária (Sem.)": "carga_horaria_semanal",
+}
+
+TIPOS_PAGAMENTO = {
+    "Folha Mensal": "folha_mensal",
+    "Folha Complementar": "vale_alimentacao",
+    "Adiantamento 13º Salário": "adiantamento_13_salario",
+    "Folha Complementar c/ Encargos": "folha_complementar_com_encargos",
+    "Rescisão": "rescisao",
+    "Fechamento 13º Salário": "fechamento_13_salario",
+}
+
+ORDEM_MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+
+# prefeito e vice de mandatos anteriores saem da base
+INICIO_MANDATO = pd.Timestamp("2025-01-01")
+
+COLUNAS_FINAIS = [
+    "id_servidor",
+    "genero",
+    "cargo",
+    "categoria_cargo",
+    "tipo_pagamento",
+    "proventos",
+    "descontos",
+    "liquido",
+    "carga_horaria_semanal",
+    "data_admissao",
+    "data_desligamento",
+    "status_servidor",
+    "mes",
+]
+
+
+def valor_monetario(valores: pd.Series) -> pd.Series:
+    """Texto no formato brasileiro (`1.500,00`) para float."""
+    return (
+        valores.astype("string")
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+        .astype("float64")
+    )
+
+
+def data_brasileira(valores: pd.Series) -> pd.Series:
+    return pd.to_datetime(valores, format="%d/%m/%Y", errors="coerce")
+
+
+def normalizar_mes(mes: pd.Series) -> pd.Categorical:
+    """`Janeiro` (ou `Março`, etc.) para a categoria ordenada `jan`..`dez`."""
+    distintos = mes.dropna().unique()
+    abreviados = {
+        m: unicodedata.normalize("NFKD", m.strip().lower()).encode("ascii", "ignore").decode("utf-8")[:3]
+        for m in distintos
+    }
+    return pd.Categorical(mes.map(abreviados), categories=ORDEM_MESES, ordered=True)
+
+
+def gerar_id_servidor(nome: pd.Series) -> pd.Series:
+    """sha256 do nome normalizado, calculado uma vez por nome distinto."""
+    codigos, distintos = pd.factorize(nome.str.upper().str.strip())
+    hashes = np.array([hashlib.sha256(n.encode("utf-8")).hexdigest() for n in distintos] + [None], dtype=object)
+    return pd.Series(hashes.take(codigos), index=nome.index, dtype="object")
+
+
+def normalizar_lote(bruto: pd.DataFrame) -> pd.DataFrame:
+    """Linhas brutas (colunas do portal, texto) tipadas, ainda com nome e sem categoria."""
+    df = bruto.rename(columns=COLUNAS_BRUTAS)
+    # linha de totais no fim de cada arquivo mensal
+    df = df.dropna(subset=["referencia"])
+
+    partes = df["referencia"].str.split(" - ", n=1, expand=True).reindex(columns=[0, 1])
+    tipo_pagamento = partes[0].map(TIPOS_PAGAMENTO).fillna(partes[0])
+
+    descontos = valor_monetario(df["descontos"]).fillna(0.0)
+    descontos = descontos.where(tipo_pagamento != "vale_alimentacao", 0.0)
+
+    return pd.DataFrame({
+        "nome": df["nome"],
+        "cargo": df["cargo"],
+        "tipo_pagamento": tipo_pagamento,
+        "proventos": valor_monetario(df["proventos"]),
+        "descontos": descontos,
+        "liquido": valor_monetario(df["liquido"]).fillna(0.0),
+        "carga_horaria_semanal": pd.to_numeric(df["carga_horaria_semanal"], errors="coerce").astype("Int64"),
+        "data_admissao": data_brasileira(df["data_admissao"]),
+        "data_desligamento": data_brasileira(df["data_desligamento"]),
+        "status_servidor": np.where(df["data_desligamento"].isna(), "ATIVO", "DESLIGADO"),
+        "mes": normalizar_mes(partes[1]),
+    }).reset_index(drop=True)
+
+
+def mascara_mandato(df: pd.DataFrame, inicio_mandato: pd.Timestamp = INICIO_MANDATO) -> pd.Series:
+    """Linhas mantidas: todos, menos prefeito e vice admitidos antes do mandato atual."""
+    agente_politico = df["cargo"].str.contains(r"\bPREFEITO\b", case=False, na=False)
+    return ~agente_politico | (df["data_admissao"] >= pd.Timestamp(inicio_mandato))
+
+
+def montar_final(
+    normalizada: pd.DataFrame,
+    categoria_cargo: pd.Series,
+    genero: pd.Series,
+    id_servidor: pd.Series,
+    manter: pd.Series,
+) -> pd.DataFrame:
+    """Colunas finais da base, só com as linhas mantidas."""
+    final = normalizada.drop(columns="nome").assign(
+        id_servidor=id_servidor.to_numpy(),
+        genero=genero.to_numpy(),
+        categoria_cargo=categoria_cargo.to_numpy(),
+    )
+    return final.loc[manter.to_numpy(), COLUNAS_FINAIS].reset_index(drop=True)
+
+
+def preparar_lote(
+    bruto: pd.DataFrame,
+    classificador: ClassificadorCargos | None = None,
+    indice_genero: pd.Series | None = None,
+    inicio_mandato: pd.Timestamp = INICIO_MANDATO,
+) -> pd.DataFrame:
+    """Linhas brutas para as colunas finais tipadas (todas as etapas de uma vez)."""
+    classificador = classificador_padrao() if classificador is None else classificador
+
+    df = normalizar_lote(bruto)
+    return montar_final(
+        df,
+        classificador.categorizar(df["cargo"]),
+        anexar_genero(df, coluna_nome="nome", indice=indice_genero, coluna="genero")["genero"],
+        gerar_id_servidor(df["nome"]),
+        mascara_mandato(df, inicio_mandato),
+    )
+
+
+def ordenar_por_mes(df: pd.DataFrame) -> pd.DataFrame:
+    """Ordem final da base: por mês, mantendo a ordem de leitura dentro do mês."""
+    return df.sort_values("mes", kind="stable").reset_index(drop=True)
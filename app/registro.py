@@ -0,0 +1,304 @@
+"""Registro das bases de folha disponíveis (anos e municípios).
+
+O catálogo `data/processed/catalogo.json` lista as bases tratadas que o
+painel pode exibir:
+
+    [
+      {"municipio": "Santa Rita do Passa Quatro", "uf": "SP", "ano": 2025,
+       "arquivo": "folha-pagamento-2025.parquet", "narrativas": true,
+       "portal": "https://www.transparencia.prefsrpq.com.br/transparencia/"}
+    ]
+
+`portal` é o endereço do Portal da Transparência de onde vieram os dados
+(opcional; sem ele o painel cita a fonte sem link).
+
+As bases são lidas sob demanda, na primeira vez em que alguém as seleciona,
+e ficam em memória junto com os agregados derivados delas. O conjunto
+carregado é um LRU limitado por um orçamento de memória: quando o total
+passa do orçamento, as bases menos usadas recentemente (e seus derivados)
+são descartadas.
+
+O orçamento padrão é de 1024 MiB e pode ser ajustado pela variável de
+ambiente `FOLHA_MEMORIA_MB`. Os derivados de cada base ficam em um
+`CacheLimitado` próprio (entradas, TTL e bytes limitados), que conta para
+o orçamento e é descartado junto com a base. Com um `CacheDisco`, os
+derivados também são gravados em disco e sobrevivem a reinícios: um
+derivado já gravado para a versão atual da base é lido do disco sem que a
+base seja carregada.
+
+Os locks do registro medem o tempo que as sessões passam esperando por
+eles (`estatisticas()["espera_locks"]`), a disputa real entre sessões
+simultâneas pelas bases e pelos derivados.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+import dados
+from cache import CacheLimitado, chave_conteudo, tamanho_em_memoria
+from cache_disco import CacheDisco, persistir_em_disco
+from dados import copia_compartilhada, fingerprint_dataset, ler_folha
+
+CATALOGO_PATH = Path("data/processed/catalogo.json")
+
+MUNICIPIO_PADRAO = "Santa Rita do Passa Quatro"
+UF_PADRAO = "SP"
+ANO_PADRAO = 2025
+PORTAL_PADRAO = "https://www.transparencia.prefsrpq.com.br/transparencia/"
+
+ORCAMENTO_MEMORIA = int(os.environ.get("FOLHA_MEMORIA_MB", "1024")) * 2**20
+
+
+@dataclass(frozen=True)
+class Dataset:
+    municipio: str
+    uf: str
+    ano: int
+    path: Path
+    # textos interpretativos do painel escritos para esta base
+    narrativas: bool = False
+    # Portal da Transparência de onde vieram os dados
+    portal: str | None = None
+
+    @property
+    def chave(self) -> str:
+        return f"{self.path.stem}:{self.uf}:{self.ano}"
+
+    @property
+    def nome(self) -> str:
+        return f"{self.municipio} ({self.uf}) — {self.ano}"
+
+
+def dataset_padrao() -> Dataset:
+    # lê dados.DATA_PATH na chamada: respeita FOLHA_DATA_PATH e ajustes em tempo de execução
+    return Dataset(
+        MUNICIPIO_PADRAO, UF_PADRAO, ANO_PADRAO, Path(dados.DATA_PATH), narrativas=True, portal=PORTAL_PADRAO
+    )
+
+
+def carregar_catalogo(path: Path = CATALOGO_PATH) -> list[Dataset]:
+    """Bases do catálogo; sem catálogo (ou com FOLHA_DATA_PATH), só a base padrão."""
+    path = Path(path)
+    if "FOLHA_DATA_PATH" in os.environ or not path.exists():
+        return [dataset_padrao()]
+
+    entradas = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        Dataset(
+            municipio=e["municipio"],
+            uf=e["uf"],
+            ano=int(e["ano"]),
+            path=path.parent / e["arquivo"],
+            narrativas=bool(e.get("narrativas", False)),
+            portal=e.get("portal"),
+        )
+        for e in entradas
+    ]
+
+
+class LockMedido:
+    """`threading.Lock` que soma o tempo gasto esperando por ele."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # atualizados só por quem acabou de adquirir o lock
+        self.espera = 0.0
+        self.disputas = 0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            t0 = time.perf_counter()
+            self._lock.acquire()
+            self.espera += time.perf_counter() - t0
+            self.disputas += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+@dataclass
+class _Carregado:
+    # None enquanto só os derivados foram pedidos (vindos do disco)
+    df: pd.DataFrame | None
+    fingerprint: str
+    tamanho_df: int
+    derivados: CacheLimitado = field(default_factory=CacheLimitado)
+
+    @property
+    def tamanho(self) -> int:
+        return self.tamanho_df + self.derivados.bytes_em_uso
+
+
+class RegistroDatasets:
+    """Bases carregadas sob demanda, em um LRU limitado por memória."""
+
+    def __init__(
+        self,
+        datasets: list[Dataset],
+        orcamento_bytes: int = ORCAMENTO_MEMORIA,
+        disco: CacheDisco | None = None,
+    ):
+        self.datasets = {d.chave: d for d in datasets}
+        self.orcamento_bytes = orcamento_bytes
+        self.disco = disco
+
+        self._carregados: OrderedDict[str, _Carregado] = OrderedDict()
+        self._lock = LockMedido()
+        # um lock por base: leituras simultâneas da mesma base acontecem uma vez só
+        self._locks_leitura: dict[str, LockMedido] = {}
+
+        self.acertos = 0
+        self.leituras = 0
+        self.descartes = 0
+
+    @property
+    def padrao(self) -> Dataset:
+        return next(iter(self.datasets.values()))
+
+    def dataset(self, chave: str) -> Dataset:
+        return self.datasets[chave]
+
+    def _entrada(self, chave: str, com_base: bool = True) -> _Carregado:
+        """Entrada da versão atual da base; `com_base=False` não lê o parquet."""
+        dataset = self.datasets[chave]
+        fingerprint = fingerprint_dataset(dataset.path)
+
+        with self._lock:
+            entrada = self._carregados.get(chave)
+            if entrada is not None and entrada.fingerprint == fingerprint:
+                if entrada.df is not None or not com_base:
+                    self._carregados.move_to_end(chave)
+                    if com_base:
+                        self.acertos += 1
+                    return entrada
+            elif not com_base:
+                entrada = _Carregado(None, fingerprint, 0)
+                self._carregados[chave] = entrada
+                return entrada
+            lock_leitura = self._locks_leitura.setdefault(chave, LockMedido())
+
+        with lock_leitura:
+            with self._lock:
+                entrada = self._carregados.get(chave)
+                if entrada is not None and entrada.fingerprint == fingerprint and entrada.df is not None:
+                    self._carregados.move_to_end(chave)
+                    self.acertos += 1
+                    return entrada
+
+            df = ler_folha(dataset.path)
+
+            with self._lock:
+                self.leituras += 1
+                entrada = self._carregados.get(chave)
+                if entrada is not None and entrada.fingerprint == fingerprint:
+                    # os derivados já obtidos do disco continuam valendo
+                    entrada.df, entrada.tamanho_df = df, tamanho_em_memoria(df)
+                else:
+                    entrada = _Carregado(df, fingerprint, tamanho_em_memoria(df))
+                    self._carregados[chave] = entrada
+                self._carregados.move_to_end(chave)
+                self._respeitar_orcamento(manter=chave)
+            return entrada
+
+    def _respeitar_orcamento(self, manter: str):
+        # a base recém-usada nunca é descartada, mesmo que sozinha passe do orçamento
+        while self.bytes_em_uso() > self.orcamento_bytes and len(self._carregados) > 1:
+            chave = next(iter(self._carregados))
+            if chave == manter:
+                self._carregados.move_to_end(chave)
+                continue
+            del self._carregados[chave]
+            self.descartes += 1
+
+    def obter(self, chave: str) -> pd.DataFrame:
+        """Base completa; lê o arquivo na primeira vez ou quando ele muda.
+
+        Com copy-on-write (ligado pelo painel) devolve uma cópia rasa: os
+        dados são os mesmos para todas as sessões, sem cópia, e alterações
+        feitas por quem recebe (novas colunas, atribuições) ficam só na
+        cópia dele (`dados.copia_compartilhada`).
+        """
+        return copia_compartilhada(self._entrada(chave).df)
+
+    def derivado(self, chave: str, nome: str, funcao, *args, **kwargs):
+        """Resultado de `funcao(df, *args, **kwargs)`, guardado junto com a base.
+
+        A memória e o disco são consultados antes da base: ela só é lida
+        quando o resultado precisa ser calculado. O resultado é
+        compartilhado entre sessões: quem o usa não deve alterá-lo no lugar.
+        """
+        entrada = self._entrada(chave, com_base=False)
+        chave_derivado = f"{nome}{chave_conteudo(args)}{chave_conteudo(kwargs)}"
+
+        ausente = object()
+        resultado = entrada.derivados.obter(chave_derivado, ausente)
+        if resultado is not ausente:
+            return resultado
+
+        disco = self.disco if persistir_em_disco(funcao) else None
+        if disco is not None:
+            resultado = disco.obter(entrada.fingerprint, funcao, chave_derivado, ausente)
+
+        if resultado is ausente:
+            # a base pode ter mudado desde a consulta: calcula e guarda na versão lida
+            entrada = self._entrada(chave)
+            resultado = funcao(copia_compartilhada(entrada.df), *args, **kwargs)
+            if disco is not None:
+                disco.guardar(entrada.fingerprint, funcao, chave_derivado, resultado)
+
+        entrada.derivados.guardar(chave_derivado, resultado)
+
+        with self._lock:
+            if chave in self._carregados:
+                self._respeitar_orcamento(manter=chave)
+        return resultado
+
+    def bytes_em_uso(self) -> int:
+        return sum(e.tamanho for e in self._carregados.values())
+
+    def espera_locks(self) -> dict:
+        """Tempo (s) e vezes que alguma sessão esperou pelos locks do registro."""
+        leitura = list(self._locks_leitura.values())
+        return {
+            "registro": {"espera_s": self._lock.espera, "disputas": self._lock.disputas},
+            "leitura": {
+                "espera_s": sum(lock.espera for lock in leitura),
+                "disputas": sum(lock.disputas for lock in leitura),
+            },
+        }
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "bytes_em_uso": self.bytes_em_uso(),
+                "orcamento_bytes": self.orcamento_bytes,
+                "acertos": self.acertos,
+                "leituras": self.leituras,
+                "descartes": self.descartes,
+                "disco": self.disco.estatisticas() if self.disco is not None else None,
+                "espera_locks": self.espera_locks(),
+                "carregadas": {
+                    chave: {"bytes_base": e.tamanho_df, "derivados": e.derivados.estatisticas()}
+                    for chave, e in self._carregados.items()
+                },
+            }
+
+
+_registro_global: RegistroDatasets | None = None
+_lock_global = threading.Lock()
+
+
+def registro_global() -> RegistroDatasets:
+    """Registro único do processo, compartilhado pelas sessões e pelo aquecimento."""
+    global _registro_global
+    with _lock_global:
+        if _registro_global is None:
+            _registro_global = RegistroDatasets(carregar_catalogo(), disco=CacheDisco())
+        return _registro_global
@@ -0,0 +1,106 @@
+"""Resumo pré-calculado da folha para a primeira pintura do painel.
+
+O arquivo de resumo é um JSON pequeno com os KPIs do panorama geral, a
+contagem por gênero, o custo anual por categoria e a amostra de linhas
+exibida no topo da página. O painel lê esse arquivo antes de carregar a
+base completa, de modo que o cabeçalho e os cards aparecem sem esperar
+a leitura do parquet.
+
+Geração (a partir da raiz do repositório):
+
+    python app/resumo.py
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from dados import DATA_PATH, fingerprint_dataset, ler_folha
+
+
+def caminho_resumo(dados_path: Path) -> Path:
+    dados_path = Path(dados_path)
+    return dados_path.with_name(dados_path.stem + "-resumo.json")
+
+
+RESUMO_PATH = caminho_resumo(DATA_PATH)
+
+COLUNAS_DATA = ["data_admissao", "data_desligamento"]
+LINHAS_AMOSTRA = 5
+
+
+def gerar_resumo(df: pd.DataFrame) -> dict:
+    df_unico = df.drop_duplicates(subset="id_servidor")
+
+    contagem_genero = df_unico["genero"].value_counts()
+
+    custo_anual_categoria = (
+        df.groupby("categoria_cargo")["proventos"]
+        .sum()
+        .sort_values(ascending=False)
+    )
+
+    amostra = df.head(LINHAS_AMOSTRA)
+    amostra = amostra.assign(**{col: amostra[col].dt.strftime("%Y-%m-%d") for col in COLUNAS_DATA})
+
+    return {
+        "total_servidores": int(df["id_servidor"].nunique()),
+        "total_proventos": float(df["proventos"].sum()),
+        "genero": {str(g): int(n) for g, n in contagem_genero.items()},
+        "custo_categoria": {str(c): float(v) for c, v in custo_anual_categoria.items()},
+        "amostra": json.loads(amostra.to_json(orient="records", force_ascii=False)),
+    }
+
+
+def salvar_resumo(df: pd.DataFrame, path: Path = RESUMO_PATH, dados_path: Path = DATA_PATH) -> dict:
+    """Grava o resumo de `df`, vinculado à versão atual de `dados_path`."""
+    resumo = gerar_resumo(df)
+    resumo["fingerprint"] = fingerprint_dataset(dados_path)
+
+    Path(path).write_text(
+        json.dumps(resumo, ensure_ascii=False, indent=2),
+        encoding="utf-8"
+    )
+    return resumo
+
+
+def ler_resumo(fingerprint: str, path: Path = RESUMO_PATH) -> dict | None:
+    """Lê o resumo; devolve None se não existir ou estiver desatualizado."""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    resumo = json.loads(path.read_text(encoding="utf-8"))
+    if resumo.get("fingerprint") != fingerprint:
+        return None
+
+    return resumo
+
+
+# -----------------------------------------
+# Visões em DataFrame usadas pelo painel
+# -----------------------------------------
+def amostra_df(resumo: dict) -> pd.DataFrame:
+    amostra = pd.DataFrame.from_records(resumo["amostra"])
+    for col in COLUNAS_DATA:
+        amostra[col] = pd.to_datetime(amostra[col])
+    return amostra
+
+
+def contagem_genero_df(resumo: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        list(resumo["genero"].items()),
+        columns=["genero", "total_servidores"]
+    )
+
+
+def custo_categoria_df(resumo: dict) -> pd.DataFrame:
+    return pd.DataFrame(
+        list(resumo["custo_categoria"].items()),
+        columns=["categoria_cargo", "custo_folha_anual_categoria"]
+    )
+
+
+if __name__ == "__main__":
+    resumo = salvar_resumo(ler_folha(DATA_PATH))
+    print(f"Resumo gravado em {RESUMO_PATH} (fingerprint {resumo['fingerprint']})")
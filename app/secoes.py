@@ -0,0 +1,352 @@
+import pandas as pd
+
+from categorias_cargo import classificador_padrao
+
+
+# ------------------------------------------------------------------
+# Cálculos das seções do painel.
+#
+# Funções puras sobre a base da folha (um DataFrame por linha de
+# pagamento), sem dependência do Streamlit. São usadas pelo painel,
+# pela API de agregados e pelas ferramentas de exportação.
+#
+# A base recebida é compartilhada e nunca é alterada: as funções
+# trabalham sobre filtros e seleções dela, e o copy-on-write do pandas
+# (ligado pelo painel em `app.py` e `servidor.py`) copia só as colunas
+# que cada uma modifica.
+#
+# Tipos e valores da base são garantidos pelo contrato de dados
+# (`contrato.py`, verificado na preparação): as funções não reconvertem
+# colunas nem descartam nulos que o contrato não admite.
+# ------------------------------------------------------------------
+
+ANO_REFERENCIA = 2025
+
+
+# Helper: primeiro valor não nulo
+def first_notna(s: pd.Series):
+    s = s.dropna()
+    return s.iloc[0] if len(s) else None
+
+
+def flag_comissionado(cargo: pd.Series) -> pd.Series:
+    # Flag comissionado por LINHA (marcador ".c" das regras de cargo, robusto a NaN e espaços)
+    return classificador_padrao().comissionado(cargo)
+
+
+# ---------------------
+# Panorama geral
+# ---------------------
+def contagem_genero(df: pd.DataFrame) -> pd.DataFrame:
+    df_unico = df.drop_duplicates(subset="id_servidor")
+
+    return (
+        df_unico["genero"]
+        .value_counts()
+        .rename_axis("genero")
+        .reset_index(name="total_servidores")
+    )
+
+
+# ---------------------------------------------
+# Percentual de gênero por categoria de cargo
+# ---------------------------------------------
+def perfil_genero_categoria(df: pd.DataFrame) -> pd.DataFrame:
+    df_base = df[["id_servidor", "genero", "categoria_cargo"]].assign(
+        is_comissionado=flag_comissionado(df["cargo"])
+    )
+
+    df_unico = (
+        df_base.groupby("id_servidor", as_index=False)
+        .agg(
+            genero=("genero", first_notna),
+            categoria_cargo=("categoria_cargo", first_notna),
+            is_comissionado=("is_comissionado", "any"),
+        )
+    )
+
+    # Se ANY ".c" => categoria vira comissionado (regra por servidor)
+    df_unico.loc[df_unico["is_comissionado"], "categoria_cargo"] = "comissionado"
+
+    # padroniza categoria para evitar inconsistências de casing/espaço
+    df_unico["categoria_cargo"] = (
+        df_unico["categoria_cargo"]
+        .astype(str)
+        .str.strip()
+        .str.lower()
+        .replace({"nan": None})
+    )
+
+    df_unico = df_unico.drop(columns=["is_comissionado"])
+
+    # Agregações por categoria
+    total_categoria = (
+        df_unico.groupby("categoria_cargo")["id_servidor"]
+        .nunique()
+        .reset_index(name="total_categoria")
+    )
+
+    total_feminino = (
+        df_unico[df_unico["genero"] == "F"]
+        .groupby("categoria_cargo")["id_servidor"]
+        .nunique()
+        .reset_index(name="total_feminino")
+    )
+
+    perfil = total_categoria.merge(total_feminino, on="categoria_cargo", how="left")
+
+    perfil["total_feminino"] = perfil["total_feminino"].fillna(0).astype(int)
+    perfil["total_masculino"] = (perfil["total_categoria"] - perfil["total_feminino"]).astype(int)
+
+    # evita divisão por zero
+    perfil["percentual_feminino"] = (
+        (perfil["total_feminino"] / perfil["total_categoria"].replace({0: pd.NA})) * 100
+    ).round(1).fillna(0.0)
+
+    perfil["percentual_masculino"] = (
+        (perfil["total_masculino"] / perfil["total_categoria"].replace({0: pd.NA})) * 100
+    ).round(1).fillna(0.0)
+
+    # Ordena por tamanho da categoria
+    return perfil.sort_values("total_categoria", ascending=False)
+
+
+# --------------------------
+# Custo anual por categoria
+# --------------------------
+def custo_por_categoria(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby("categoria_cargo")["proventos"]
+        .sum()
+        .reset_index(name="custo_folha_anual_categoria")
+        .sort_values("custo_folha_anual_categoria", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+# -----------------------
+# Top 10 salários
+# -----------------------
+def top_salarios(df: pd.DataFrame, genero: str | None = None, n: int = 10) -> pd.DataFrame:
+    """Maior salário mensal (folha_mensal) por servidor, ranqueado.
+
+    Sem `genero`, devolve o ranking geral com a coluna `genero`.
+    """
+    filtro = df["tipo_pagamento"] == "folha_mensal"
+    if genero is not None:
+        filtro &= df["genero"] == genero
+
+    df_mensal = df[filtro]
+
+    # Mantém somente 1 linha por servidor (maior salário mensal observado no ano)
+    df_mensal_unico = (
+        df_mensal
+        .sort_values(["id_servidor", "proventos"], ascending=[True, False])
+        .drop_duplicates(subset=["id_servidor"], keep="first")
+    )
+
+    chaves = ["id_servidor", "cargo"] + (["genero"] if genero is None else [])
+
+    top = (
+        df_mensal_unico.groupby(chaves)["proventos"]
+        .max()
+        .reset_index(name="salario_maximo")
+        # empates de salário em ordem de servidor: o ranking não depende da ordem das linhas
+        .sort_values(["salario_maximo", "id_servidor"], ascending=[False, True])
+        .head(n)
+        .reset_index(drop=True)
+    )
+
+    # ranking numerico
+    top["rank"] = top.index + 1
+    return top
+
+
+# ---------------------
+# Cargos comissionados
+# ---------------------
+def comissionados_lista(df: pd.DataFrame) -> pd.DataFrame:
+    df_cargos_c = df[flag_comissionado(df["cargo"])]
+
+    df_cargos_c_unico = df_cargos_c.drop_duplicates(subset="id_servidor")
+
+    return (
+        df_cargos_c_unico
+        .groupby("cargo")["id_servidor"]
+        .nunique()
+        .reset_index(name="quantidade_servidores")
+        .sort_values("quantidade_servidores", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def comissionados_genero(df: pd.DataFrame) -> dict:
+    df_comissionados = df[df["categoria_cargo"] == "comissionado"].drop_duplicates("id_servidor")
+
+    return {
+        "M": int((df_comissionados["genero"] == "M").sum()),
+        "F": int((df_comissionados["genero"] == "F").sum()),
+    }
+
+
+def comissionados_salarios(df: pd.DataFrame) -> dict:
+    """Salário base mensal por cargo comissionado.
+
+    Servidores comissionados sem nenhuma folha_mensal no ano (só rescisão,
+    por exemplo) entram na tabela com salário vazio.
+    """
+    df_com_all = df[df["categoria_cargo"] == "comissionado"]
+
+    df_com = df[
+        (df["categoria_cargo"] == "comissionado") &
+        (df["tipo_pagamento"] == "folha_mensal")
+    ]
+
+    # proventos pode ser nulo (contrato.py); id_servidor e cargo, não
+    df_com = df_com.dropna(subset=["proventos"])
+
+    df_com_1por_servidor = (
+        df_com.sort_values(["id_servidor", "proventos"], ascending=[True, False])
+        .drop_duplicates(subset=["id_servidor"], keep="first")
+    )
+
+    tabela_completa = (
+        df_com_1por_servidor.groupby("cargo", as_index=False)
+        .agg(
+            salario_base_mensal=("proventos", "max"),
+            quantidade_pessoas=("id_servidor", "nunique")
+        )
+    )
+
+    ids_all = set(df_com_all["id_servidor"].unique())
+    ids_fm = set(df_com["id_servidor"].unique())
+    faltantes_ids = list(ids_all - ids_fm)
+
+    df_faltantes = (
+        df_com_all[df_com_all["id_servidor"].isin(faltantes_ids)][
+            ["id_servidor", "cargo", "tipo_pagamento"]
+        ]
+        .drop_duplicates(subset=["id_servidor"])
+    )
+
+    if not df_faltantes.empty:
+        linhas_extra = (
+            df_faltantes.groupby("cargo", as_index=False)
+            .agg(quantidade_pessoas=("id_servidor", "nunique"))
+        )
+        linhas_extra["salario_base_mensal"] = float("nan")
+        tabela_completa = pd.concat([tabela_completa, linhas_extra], ignore_index=True)
+
+    tabela_completa = tabela_completa.sort_values(
+        by="salario_base_mensal",
+        ascending=False,
+        na_position="last"
+    ).reset_index(drop=True)
+
+    return {
+        "tabela": tabela_completa,
+        "total_comissionados": len(ids_all),
+        "somente_rescisao": len(faltantes_ids),
+    }
+
+
+def gasto_comissionados(df: pd.DataFrame) -> float:
+    df_com_gastos = df[df["categoria_cargo"] == "comissionado"]
+
+    return float(df_com_gastos["proventos"].sum())
+
+
+def carga_horaria_comissionados(df: pd.DataFrame) -> dict:
+    df_com_unico = (
+        df[df["categoria_cargo"] == "comissionado"]
+        .drop_duplicates(subset="id_servidor")
+    )
+
+    # carga horária é inteira e obrigatória (contrato.py)
+    df_ch = df_com_unico
+
+    carga_moda = int(df_ch["carga_horaria_semanal"].mode().iloc[0])
+
+    return {
+        "carga_min": int(df_ch["carga_horaria_semanal"].min()),
+        "carga_max": int(df_ch["carga_horaria_semanal"].max()),
+        "carga_moda": carga_moda,
+        # quantos servidores têm essa carga predominante
+        "qtd_moda": int((df_ch["carga_horaria_semanal"] == carga_moda).sum()),
+        "total_com": int(df_ch["id_servidor"].nunique()),
+    }
+
+
+# -------------------------
+# Carga Horária Semanal
+# -------------------------
+def carga_horaria_categorias(df: pd.DataFrame) -> pd.DataFrame:
+    df_unico = df.drop_duplicates(subset="id_servidor")
+
+    categorias_por_carga = (
+        df_unico
+        .groupby(["carga_horaria_semanal", "categoria_cargo"])["id_servidor"]
+        .nunique()
+        .reset_index(name="quantidade_servidores")
+    )
+
+    return categorias_por_carga.sort_values(
+        ["carga_horaria_semanal", "quantidade_servidores"],
+        ascending=[True, False]
+    )
+
+
+# ----------------------------
+# Desligamentos
+# ----------------------------
+def desligamentos(df: pd.DataFrame, ano: int = ANO_REFERENCIA) -> dict:
+    df_unico = df.drop_duplicates(subset="id_servidor")
+
+    df_desligados = df_unico[df_unico["data_desligamento"].dt.year == ano]
+
+    total_desligados = df_desligados["id_servidor"].nunique()
+    total_servidores = df_unico["id_servidor"].nunique()
+
+    por_categoria = (
+        df_desligados.groupby("categoria_cargo")["id_servidor"]
+        .nunique()
+        .reset_index(name="quantidade_servidores")
+        .sort_values("quantidade_servidores", ascending=False)
+    )
+
+    return {
+        "total_desligados": int(total_desligados),
+        "total_servidores": int(total_servidores),
+        "pct_desligados": round((total_desligados / total_servidores) * 100, 2),
+        "por_categoria": por_categoria,
+    }
+
+
+# -------------------------------------
+# Servidores com mais tempo de serviço
+# -------------------------------------
+def servidores_mais_antigos(df: pd.DataFrame, hoje: pd.Timestamp | None = None) -> pd.DataFrame:
+    df_unico = df.drop_duplicates(subset="id_servidor")
+
+    hoje = pd.Timestamp.today() if hoje is None else hoje
+
+    df_unico = df_unico.assign(
+        tempo_trabalho_anos=((hoje - df_unico["data_admissao"]).dt.days / 365.25).round(0)
+    )
+
+    servidor_mais_antigo = (
+        df_unico[df_unico["genero"] == "M"]
+        .sort_values("tempo_trabalho_anos", ascending=False)
+        .head(1)
+    )
+
+    servidora_mais_antiga = (
+        df_unico[df_unico["genero"] == "F"]
+        .sort_values("tempo_trabalho_anos", ascending=False)
+        .head(1)
+    )
+
+    return pd.concat([
+        servidor_mais_antigo,
+        servidora_mais_antiga
+    ], axis=0)
@@ -0,0 +1,49 @@
+"""Inicia o painel com os caches já aquecidos.
+
+Aquece a base padrão (leitura, resumo, agregados e gráficos) antes de
+subir o servidor do Streamlit, no mesmo processo. Enquanto o aquecimento
+não termina o servidor não aceita conexões, então o health check
+(`/_stcore/health`) só responde quando a primeira visita já é quente.
+Depois disso, uma thread em segundo plano reaquece os caches sempre que o
+fingerprint de uma base muda.
+
+Uso (a partir da raiz do repositório):
+
+    python app/servidor.py
+    python app/servidor.py --server.port 8080   # opções repassadas ao streamlit run
+"""
+import logging
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+from streamlit.web import cli as stcli
+
+from aquecimento import aquecer, iniciar_vigia
+from registro import registro_global
+
+APP_PATH = Path(__file__).with_name("app.py")
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+    # caminhos do app (dados, imagens) são relativos à raiz do repositório
+    os.chdir(RAIZ_REPO)
+
+    # o aquecimento guarda no registro as bases que as sessões vão
+    # compartilhar: copy-on-write desde o início, como em `app.py`
+    pd.set_option("mode.copy_on_write", True)
+
+    registro = registro_global()
+    aquecer(registro)
+    iniciar_vigia(registro)
+
+    sys.argv = ["streamlit", "run", str(APP_PATH), "--server.headless", "true", *sys.argv[1:]]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
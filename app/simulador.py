@@ -0,0 +1,143 @@
+"""Simulação de reajustes sobre a folha mensal.
+
+`BaseSimulacao` guarda, uma única vez por base, as linhas de
+`folha_mensal` como arrays NumPy (valor, servidor, mês, categoria, cargo,
+carga horária). Cada regra de reajuste é uma máscara booleana sobre esses
+arrays e cada simulação é uma sequência de operações vetorizadas seguida
+de `np.bincount` por categoria: mover um controle do painel custa
+milissegundos, sem refazer os agregados da página.
+
+Regras suportadas (aplicadas em ordem, cada uma sobre o resultado da
+anterior):
+
+- `percentual`: reajuste de X% (`valor` = 5 para 5%);
+- `piso`: salário mensal mínimo de `valor` reais, sobre o total que o
+  servidor recebe no mês (a soma dos pagamentos de folha_mensal dele no
+  mês); o complemento vai para o primeiro pagamento atingido do mês;
+- `acrescimo`: valor fixo em reais somado a cada pagamento mensal.
+
+O alvo de cada regra pode ser restringido por categoria, cargo, faixa de
+carga horária semanal e faixa salarial (valor do pagamento antes da regra).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TIPOS_REGRA = ("percentual", "piso", "acrescimo")
+
+
+@dataclass(frozen=True)
+class Regra:
+    tipo: str
+    valor: float
+    categoria: str | None = None
+    cargo: str | None = None
+    carga_min: float | None = None
+    carga_max: float | None = None
+    salario_min: float | None = None
+    salario_max: float | None = None
+
+    def __post_init__(self):
+        if self.tipo not in TIPOS_REGRA:
+            raise ValueError(f"Tipo de regra desconhecido: {self.tipo!r} (use {', '.join(TIPOS_REGRA)})")
+
+
+class BaseSimulacao:
+    # arrays numpy: recalculado da base após um reinício (ver cache_disco.py)
+    persistir_em_disco = False
+
+    def __init__(self, df: pd.DataFrame):
+        mensal = df.loc[df["tipo_pagamento"] == "folha_mensal"].dropna(subset=["proventos"])
+
+        self.valores = mensal["proventos"].to_numpy(dtype="float64")
+        self.servidor, _ = pd.factorize(mensal["id_servidor"])
+        # servidor x mês: o grão do piso (mês vazio é um grupo à parte)
+        mes, meses = pd.factorize(mensal["mes"], use_na_sentinel=False)
+        self.servidor_mes, _ = pd.factorize(self.servidor.astype(np.int64) * max(len(meses), 1) + mes)
+        self.categoria, categorias = pd.factorize(mensal["categoria_cargo"], sort=True)
+        self.cargo, cargos = pd.factorize(mensal["cargo"], sort=True)
+        self.carga = pd.to_numeric(mensal["carga_horaria_semanal"], errors="coerce").to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+
+        self.categorias = list(categorias)
+        self.cargos = list(cargos)
+        self._codigo_categoria = {c: i for i, c in enumerate(self.categorias)}
+        self._codigo_cargo = {c: i for i, c in enumerate(self.cargos)}
+
+        self.custo_atual = self._por_categoria(self.valores)
+
+        # limites dos controles de faixa no painel
+        self.carga_maxima = int(np.nanmax(self.carga)) if np.isfinite(self.carga).any() else 0
+        self.salario_maximo = float(np.ceil(self.valores.max() / 1000) * 1000) if len(self.valores) else 0.0
+
+    def __sizeof__(self) -> int:
+        arrays = (
+            self.valores, self.servidor, self.servidor_mes, self.categoria, self.cargo, self.carga, self.custo_atual
+        )
+        return object.__sizeof__(self) + sum(a.nbytes for a in arrays)
+
+    def _por_categoria(self, valores: np.ndarray) -> np.ndarray:
+        return np.bincount(self.categoria, weights=valores, minlength=len(self.categorias))
+
+    def mascara(self, regra: Regra, valores: np.ndarray) -> np.ndarray:
+        """Pagamentos atingidos pela regra (`valores` = salários antes da regra)."""
+        alvo = np.ones(len(valores), dtype=bool)
+        if regra.categoria is not None:
+            alvo &= self.categoria == self._codigo_categoria.get(regra.categoria, -1)
+        if regra.cargo is not None:
+            alvo &= self.cargo == self._codigo_cargo.get(regra.cargo, -1)
+        # comparações com NaN (carga desconhecida) dão False: fora do alvo
+        if regra.carga_min is not None:
+            alvo &= self.carga >= regra.carga_min
+        if regra.carga_max is not None:
+            alvo &= self.carga <= regra.carga_max
+        if regra.salario_min is not None:
+            alvo &= valores >= regra.salario_min
+        if regra.salario_max is not None:
+            alvo &= valores <= regra.salario_max
+        return alvo
+
+    def aplicar(self, regras: list[Regra]) -> tuple[np.ndarray, np.ndarray]:
+        """Valores simulados de cada pagamento e a máscara dos pagamentos alterados."""
+        valores = self.valores.copy()
+        for regra in regras:
+            alvo = self.mascara(regra, valores)
+            if regra.tipo == "percentual":
+                valores[alvo] *= 1 + regra.valor / 100
+            elif regra.tipo == "piso":
+                self._aplicar_piso(valores, alvo, regra.valor)
+            else:
+                valores[alvo] += regra.valor
+        return valores, valores != self.valores
+
+    def _aplicar_piso(self, valores: np.ndarray, alvo: np.ndarray, piso: float):
+        """Completa até `piso` o total mensal de cada servidor com algum pagamento no alvo."""
+        totais = np.bincount(self.servidor_mes, weights=valores)
+        linhas_alvo = np.flatnonzero(alvo)
+        grupos, primeiras = np.unique(self.servidor_mes[linhas_alvo], return_index=True)
+        valores[linhas_alvo[primeiras]] += np.maximum(piso - totais[grupos], 0)
+
+    def simular(self, regras: list[Regra]) -> dict:
+        valores, alterados = self.aplicar(regras)
+        custo_simulado = self._por_categoria(valores)
+
+        por_categoria = pd.DataFrame({
+            "categoria_cargo": self.categorias,
+            "custo_atual": self.custo_atual,
+            "custo_simulado": custo_simulado,
+        })
+        por_categoria["diferenca"] = por_categoria["custo_simulado"] - por_categoria["custo_atual"]
+        por_categoria["participacao_atual"] = por_categoria["custo_atual"] / self.custo_atual.sum() * 100
+        por_categoria["participacao_simulada"] = por_categoria["custo_simulado"] / custo_simulado.sum() * 100
+        por_categoria["ranking_atual"] = por_categoria["custo_atual"].rank(ascending=False, method="min").astype(int)
+        por_categoria["ranking_simulado"] = por_categoria["custo_simulado"].rank(ascending=False, method="min").astype(int)
+
+        return {
+            "custo_atual": float(self.custo_atual.sum()),
+            "custo_simulado": float(custo_simulado.sum()),
+            "pagamentos_alterados": int(alterados.sum()),
+            "servidores_afetados": int(np.count_nonzero(np.bincount(self.servidor[alterados]))),
+            "por_categoria": por_categoria.sort_values("ranking_simulado").reset_index(drop=True),
+        }
@@ -0,0 +1,291 @@
+"""Sketches de quantis mescláveis para as distribuições de salário.
+
+Para cada célula (município, ano, mês, categoria, gênero, cargo) guarda-se
+um sketch dos `proventos` das linhas de `folha_mensal`, em vez de todos os
+valores. Qualquer seleção de meses, anos ou municípios é respondida somando
+os sketches das células escolhidas, sem voltar à base.
+
+O sketch é um histograma com baldes em escala logarítmica (o mesmo
+princípio do DDSketch): cada valor x > 0 cai no balde ceil(log(x)/log(gama)),
+com gama = (1 + alfa) / (1 - alfa). Quantis estimados têm erro relativo de
+no máximo `alfa` (1% por padrão), a memória cresce com o log da amplitude
+dos valores (não com a quantidade) e a mescla é a soma das contagens.
+
+Os sketches de cada base do catálogo ficam em `<base>-sketches.parquet`,
+ao lado do parquet tratado e vinculados à versão dele (fingerprint nos
+metadados do arquivo). O painel lê esses arquivos e mescla os das bases
+selecionadas (anos, municípios) sem carregar as bases; um arquivo ausente
+ou desatualizado é recalculado a partir da base. A preparação
+(`pipeline.py`) grava o arquivo junto com a base.
+
+O cálculo exato continua disponível para verificação:
+
+    python app/sketches.py              # grava <base>-sketches.parquet
+    python app/sketches.py --verificar  # compara com os quantis exatos
+"""
+import argparse
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dados import fingerprint_dataset
+
+ALFA = 0.01
+
+MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+
+GRAO = ["municipio", "uf", "ano", "mes", "categoria_cargo", "genero", "cargo"]
+
+QUANTIS_VERIFICACAO = [0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+
+class SketchQuantis:
+    def __init__(self, alfa: float = ALFA):
+        self.alfa = alfa
+        self.gama = (1 + alfa) / (1 - alfa)
+        self._log_gama = math.log(self.gama)
+
+        # contagens[i] é o número de valores no balde `inicio + i`
+        self.inicio = 0
+        self.contagens = np.zeros(0, dtype=np.int64)
+        self.nao_positivos = 0
+
+    @property
+    def n(self) -> int:
+        return int(self.contagens.sum()) + self.nao_positivos
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self.contagens.nbytes
+
+    def indices(self, valores) -> np.ndarray:
+        """Balde de cada valor positivo."""
+        return np.ceil(np.log(np.asarray(valores, dtype="float64")) / self._log_gama).astype(np.int64)
+
+    def _somar_baldes(self, inicio: int, contagens: np.ndarray):
+        if len(contagens) == 0:
+            return
+        if len(self.contagens) == 0:
+            self.inicio, self.contagens = inicio, contagens.astype(np.int64)
+            return
+
+        novo_inicio = min(self.inicio, inicio)
+        novo_fim = max(self.inicio + len(self.contagens), inicio + len(contagens))
+        soma = np.zeros(novo_fim - novo_inicio, dtype=np.int64)
+        soma[self.inicio - novo_inicio:self.inicio - novo_inicio + len(self.contagens)] += self.contagens
+        soma[inicio - novo_inicio:inicio - novo_inicio + len(contagens)] += contagens
+        self.inicio, self.contagens = novo_inicio, soma
+
+    def adicionar(self, valores) -> "SketchQuantis":
+        valores = np.asarray(valores, dtype="float64")
+        valores = valores[~np.isnan(valores)]
+
+        positivos = valores[valores > 0]
+        self.nao_positivos += int(len(valores) - len(positivos))
+
+        if len(positivos):
+            idx = self.indices(positivos)
+            inicio = int(idx.min())
+            self._somar_baldes(inicio, np.bincount(idx - inicio))
+        return self
+
+    def mesclar(self, outro: "SketchQuantis") -> "SketchQuantis":
+        if outro.alfa != self.alfa:
+            raise ValueError("Sketches com alfa diferentes não podem ser mesclados")
+        self._somar_baldes(outro.inicio, outro.contagens)
+        self.nao_positivos += outro.nao_positivos
+        return self
+
+    def quantil(self, q: float) -> float:
+        n = self.n
+        if n == 0:
+            return float("nan")
+
+        posicao = q * (n - 1)
+        if posicao < self.nao_positivos:
+            return 0.0
+
+        acumulado = np.cumsum(self.contagens)
+        i = int(np.searchsorted(acumulado, posicao - self.nao_positivos, side="right"))
+        balde = self.inicio + i
+        # ponto do balde (gama^(k-1), gama^k] com erro relativo <= alfa
+        return float(2 * self.gama ** balde / (self.gama + 1))
+
+
+# ---------------------------------------------
+# Tabela de sketches por célula
+# ---------------------------------------------
+def tabela_sketches(
+    df: pd.DataFrame,
+    municipio: str,
+    uf: str,
+    ano: int,
+    alfa: float = ALFA,
+) -> pd.DataFrame:
+    """Um sketch de `proventos` (folha_mensal) por célula do GRAO."""
+    mensal = df.loc[
+        (df["tipo_pagamento"] == "folha_mensal") & df["proventos"].notna(),
+        ["mes", "categoria_cargo", "genero", "cargo", "proventos"],
+    ]
+    mensal["mes"] = mensal["mes"].astype(str)
+
+    positivo = mensal["proventos"] > 0
+    mensal["balde"] = SketchQuantis(alfa).indices(mensal["proventos"].where(positivo, 1.0))
+    mensal.loc[~positivo, "balde"] = np.iinfo(np.int64).min
+
+    celulas = ["mes", "categoria_cargo", "genero", "cargo"]
+    linhas = []
+    for chave, grupo in mensal.groupby(celulas, observed=True, sort=True):
+        baldes = grupo["balde"].to_numpy()
+        validos = baldes[baldes != np.iinfo(np.int64).min]
+        inicio = int(validos.min()) if len(validos) else 0
+        linhas.append((
+            *chave,
+            len(baldes),
+            int(len(baldes) - len(validos)),
+            inicio,
+            np.bincount(validos - inicio) if len(validos) else np.zeros(0, dtype=np.int64),
+        ))
+
+    tabela = pd.DataFrame(linhas, columns=celulas + ["n", "nao_positivos", "inicio", "contagens"])
+    tabela.insert(0, "municipio", municipio)
+    tabela.insert(1, "uf", uf)
+    tabela.insert(2, "ano", int(ano))
+    tabela["alfa"] = alfa
+    return tabela
+
+
+def meses_disponiveis(tabela: pd.DataFrame) -> list[str]:
+    presentes = set(tabela["mes"])
+    return [m for m in MESES if m in presentes]
+
+
+def filtrar_celulas(tabela: pd.DataFrame, filtros: dict) -> pd.Series:
+    mascara = pd.Series(True, index=tabela.index)
+    for coluna, valor in filtros.items():
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            mascara &= tabela[coluna].isin(list(valor))
+        else:
+            mascara &= tabela[coluna] == valor
+    return mascara
+
+
+def combinar(tabela: pd.DataFrame, **filtros) -> SketchQuantis:
+    """Sketch das células que atendem aos filtros (valor único ou lista por coluna do GRAO)."""
+    selecao = tabela[filtrar_celulas(tabela, filtros)]
+
+    alfas = selecao["alfa"].unique() if len(selecao) else [ALFA]
+    if len(alfas) > 1:
+        raise ValueError("A seleção mistura sketches com alfa diferentes")
+
+    sketch = SketchQuantis(float(alfas[0]))
+    for inicio, contagens, nao_positivos in zip(
+        selecao["inicio"], selecao["contagens"], selecao["nao_positivos"]
+    ):
+        sketch._somar_baldes(int(inicio), np.asarray(contagens, dtype=np.int64))
+        sketch.nao_positivos += int(nao_positivos)
+    return sketch
+
+
+# ---------------------------------------------
+# Modo exato (verificação)
+# ---------------------------------------------
+def quantis_exatos(df: pd.DataFrame, quantis: list[float], **filtros) -> list[float]:
+    """Quantis exatos de `proventos` (folha_mensal) com os mesmos filtros de `combinar`."""
+    mensal = df.loc[
+        (df["tipo_pagamento"] == "folha_mensal") & df["proventos"].notna()
+    ].assign(mes=lambda d: d["mes"].astype(str))
+
+    filtros = {k: v for k, v in filtros.items() if k not in ("municipio", "uf", "ano")}
+    valores = np.sort(mensal.loc[filtrar_celulas(mensal, filtros), "proventos"].to_numpy(dtype="float64"))
+    if len(valores) == 0:
+        return [float("nan")] * len(quantis)
+    # mesma definição de posição do sketch: o valor na posição floor(q * (n - 1))
+    return [float(valores[int(q * (len(valores) - 1))]) for q in quantis]
+
+
+def verificar(
+    tabela: pd.DataFrame,
+    df: pd.DataFrame,
+    quantis: list[float] = QUANTIS_VERIFICACAO,
+    **filtros,
+) -> pd.DataFrame:
+    sketch = combinar(tabela, **filtros)
+    exatos = quantis_exatos(df, quantis, **filtros)
+    aproximados = [sketch.quantil(q) for q in quantis]
+
+    resultado = pd.DataFrame({"quantil": quantis, "aproximado": aproximados, "exato": exatos})
+    resultado["erro_relativo"] = (resultado["aproximado"] - resultado["exato"]).abs() / resultado["exato"]
+    return resultado
+
+
+def caminho_sketches(dados_path: Path) -> Path:
+    dados_path = Path(dados_path)
+    return dados_path.with_name(dados_path.stem + "-sketches.parquet")
+
+
+def salvar_sketches(
+    df: pd.DataFrame,
+    municipio: str,
+    uf: str,
+    ano: int,
+    dados_path: Path,
+    path: Path | None = None,
+) -> pd.DataFrame:
+    """Grava os sketches de `df`, vinculados à versão atual de `dados_path`."""
+    tabela = tabela_sketches(df, municipio, uf, ano)
+    arrow = pa.Table.from_pandas(tabela, preserve_index=False)
+    metadados = {**(arrow.schema.metadata or {}), b"fingerprint": fingerprint_dataset(dados_path).encode("utf-8")}
+    pq.write_table(arrow.replace_schema_metadata(metadados), path or caminho_sketches(dados_path))
+    return tabela
+
+
+def ler_sketches(fingerprint: str, path: Path) -> pd.DataFrame | None:
+    """Lê os sketches; devolve None se o arquivo não existir ou estiver desatualizado."""
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    metadados = pq.read_schema(path).metadata or {}
+    if metadados.get(b"fingerprint", b"").decode("utf-8") != fingerprint:
+        return None
+
+    return pd.read_parquet(path)
+
+
+def main():
+    from dados import ler_folha
+    from registro import carregar_catalogo
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--verificar",
+        action="store_true",
+        help="compara os quantis dos sketches com os exatos (geral e por categoria)",
+    )
+    args = parser.parse_args()
+
+    os.chdir(RAIZ_REPO)
+
+    for dataset in carregar_catalogo():
+        df = ler_folha(dataset.path)
+        tabela = salvar_sketches(df, dataset.municipio, dataset.uf, dataset.ano, dataset.path)
+        print(f"{dataset.nome}: {len(tabela)} sketches gravados em {caminho_sketches(dataset.path)}")
+
+        if args.verificar:
+            for categoria in [None] + sorted(tabela["categoria_cargo"].unique()):
+                resultado = verificar(tabela, df, categoria_cargo=categoria)
+                pior = resultado["erro_relativo"].max()
+                print(f"  {categoria or 'geral':<20} erro relativo máximo {pior:.4%} (limite {ALFA:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Teste de carga do painel com sessões simultâneas.
+
+Simula N visitantes executando `app/app.py` ao mesmo tempo, pela API de
+testes headless do Streamlit (AppTest). Cada sessão faz a execução inicial
+e depois R reruns, como um visitante interagindo com a página.
+
+Três modos:
+
+- `threads`   (padrão) todas as sessões no mesmo processo, compartilhando
+              os caches do Streamlit, como em um único servidor;
+- `processos` cada sessão em um subprocesso, isolando memória e CPU;
+- `registro`  sem AppTest: N threads pedem ao mesmo tempo, a um registro
+              compartilhado, a base e todos os derivados da visão padrão
+              (`aquecimento.secoes_padrao`), como as sessões de um servidor.
+
+O AppTest não é reentrante: cada execução instala e remove o `Runtime`
+global do Streamlit. Dentro de um processo as execuções do AppTest passam
+por uma fila do próprio teste (um lock), então nos modos `threads` e
+`processos` o tempo nessa fila é do harness, não disputa do painel, e é
+reportado à parte. A disputa real aparece no tempo de espera pelos locks
+do registro (`RegistroDatasets.espera_locks`), reportado em todos os
+modos; o modo `registro` é o que exercita esses locks com execuções de
+fato simultâneas.
+
+Métricas reportadas: percentis de latência por rerun (fria e quente, fila
+incluída), tempo de execução e de CPU por rerun, crescimento de memória por
+sessão, a fração do tempo das sessões passada na fila do harness e a
+espera pelos locks do registro.
+
+Uso (a partir da raiz do repositório):
+
+    python app/teste_carga.py --sessoes 8 --reruns 5
+    python app/teste_carga.py --sessoes 4 --modo processos
+    python app/teste_carga.py --sessoes 8 --modo registro --sintetico 10
+    python app/teste_carga.py --sessoes 8 --sintetico 10   # base 10x maior
+"""
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import psutil
+
+import dados
+import registro
+from aquecimento import secoes_padrao
+from dados import DATA_PATH, ler_folha
+from layout_parquet import escrever_folha
+
+APP_PATH = Path(__file__).with_name("app.py")
+RAIZ_REPO = Path(__file__).resolve().parent.parent
+
+TIMEOUT_RERUN = 600
+
+# serializa as execuções do AppTest dentro de um mesmo processo (fila do harness)
+_FILA_APPTEST = threading.Lock()
+
+
+# ---------------------------------------------
+# Base sintética
+# ---------------------------------------------
+def gerar_base_sintetica(df: pd.DataFrame, fator: int, seed: int = 42) -> pd.DataFrame:
+    """Replica a base `fator` vezes, com novos servidores e salários perturbados."""
+    rng = np.random.default_rng(seed)
+    partes = []
+
+    for k in range(fator):
+        parte = df.copy()
+        if k > 0:
+            parte["id_servidor"] = parte["id_servidor"].astype(str) + f"-{k:03d}"
+
+            # mesmo fator de ajuste para todas as linhas de um servidor
+            codigos, _ = pd.factorize(parte["id_servidor"])
+            ajuste = rng.lognormal(mean=0.0, sigma=0.15, size=codigos.max() + 1)[codigos]
+            for col in ("proventos", "descontos"):
+                parte[col] = (parte[col] * ajuste).round(2)
+            # proventos nulo tem líquido zero na base real
+            parte["liquido"] = (parte["proventos"].fillna(0.0) - parte["descontos"]).round(2)
+        partes.append(parte)
+
+    return pd.concat(partes, ignore_index=True)
+
+
+# ---------------------------------------------
+# Sessões
+# ---------------------------------------------
+def _usar_base(data_path: Path):
+    # o módulo `dados` já foi importado neste processo: atualiza também o
+    # atributo, que é relido pelo app a cada execução do script
+    os.environ["FOLHA_DATA_PATH"] = str(data_path)
+    dados.DATA_PATH = Path(data_path)
+
+
+def _executar_sessao(reruns: int, barreira=None) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    processo = psutil.Process()
+    rss_inicial = processo.memory_info().rss
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=TIMEOUT_RERUN)
+
+    if barreira is not None:
+        barreira.wait()
+
+    # o AppTest executa o script em outra thread: o CPU é medido por processo,
+    # o que é exato por rerun porque só uma execução roda por vez
+    latencias, execucoes, cpus = [], [], []
+    for _ in range(reruns + 1):
+        t0 = time.perf_counter()
+        with _FILA_APPTEST:
+            t1, c1 = time.perf_counter(), time.process_time()
+            at.run()
+            cpus.append(time.process_time() - c1)
+            execucoes.append(time.perf_counter() - t1)
+        latencias.append(time.perf_counter() - t0)
+
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+
+    return {
+        "latencias": latencias,
+        "execucoes": execucoes,
+        "cpus": cpus,
+        "rss_delta": processo.memory_info().rss - rss_inicial,
+    }
+
+
+def _executar_sessao_processo(args) -> dict:
+    reruns, data_path = args
+    os.chdir(RAIZ_REPO)
+    _usar_base(data_path)
+    resultado = _executar_sessao(reruns)
+    resultado["espera_locks"] = registro.registro_global().espera_locks()
+    return resultado
+
+
+def _somar_esperas(esperas: list[dict]) -> dict:
+    return {
+        lock: {
+            "espera_s": sum(e[lock]["espera_s"] for e in esperas),
+            "disputas": sum(e[lock]["disputas"] for e in esperas),
+        }
+        for lock in ("registro", "leitura")
+    }
+
+
+def rodar_threads(sessoes: int, reruns: int) -> tuple[list[dict], int, dict]:
+    processo = psutil.Process()
+    rss_inicial = processo.memory_info().rss
+
+    barreira = threading.Barrier(sessoes)
+    resultados: list[dict] = [None] * sessoes
+    erros: list[BaseException] = []
+
+    def alvo(i):
+        try:
+            resultados[i] = _executar_sessao(reruns, barreira)
+        except BaseException as exc:  # propaga depois do join
+            erros.append(exc)
+            barreira.abort()
+
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if erros:
+        raise erros[0]
+
+    # em threads o RSS é do processo inteiro: crescimento total dividido por sessão
+    crescimento = (processo.memory_info().rss - rss_inicial) // sessoes
+    for r in resultados:
+        r["rss_delta"] = crescimento
+
+    # o registro do processo é o que o app usou (criado na primeira execução)
+    return resultados, crescimento, registro.registro_global().espera_locks()
+
+
+def rodar_processos(sessoes: int, reruns: int, data_path: Path) -> tuple[list[dict], int, dict]:
+    contexto = mp.get_context("spawn")
+    with contexto.Pool(processes=sessoes) as pool:
+        resultados = pool.map(_executar_sessao_processo, [(reruns, data_path)] * sessoes)
+
+    crescimento = int(statistics.mean(r["rss_delta"] for r in resultados))
+    return resultados, crescimento, _somar_esperas([r["espera_locks"] for r in resultados])
+
+
+def rodar_registro(sessoes: int, reruns: int, data_path: Path) -> tuple[list[dict], int, dict]:
+    """Sessões simultâneas de fato, direto no registro (sem AppTest e sem cache em disco)."""
+    processo = psutil.Process()
+    rss_inicial = processo.memory_info().rss
+
+    dataset = registro.Dataset(
+        registro.MUNICIPIO_PADRAO, registro.UF_PADRAO, registro.ANO_PADRAO, Path(data_path)
+    )
+    compartilhado = registro.RegistroDatasets([dataset])
+    derivados = secoes_padrao(dataset)
+
+    barreira = threading.Barrier(sessoes)
+    resultados: list[dict] = [None] * sessoes
+    erros: list[BaseException] = []
+
+    def alvo(i):
+        try:
+            barreira.wait()
+            latencias, cpus = [], []
+            for _ in range(reruns + 1):
+                t0, c0 = time.perf_counter(), time.thread_time()
+                compartilhado.obter(dataset.chave)
+                for funcao, *args in derivados:
+                    compartilhado.derivado(dataset.chave, funcao.__name__, funcao, *args)
+                cpus.append(time.thread_time() - c0)
+                latencias.append(time.perf_counter() - t0)
+            resultados[i] = {"latencias": latencias, "execucoes": latencias, "cpus": cpus}
+        except BaseException as exc:  # propaga depois do join
+            erros.append(exc)
+            barreira.abort()
+
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(sessoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if erros:
+        raise erros[0]
+
+    crescimento = (processo.memory_info().rss - rss_inicial) // sessoes
+    return resultados, crescimento, compartilhado.espera_locks()
+
+
+# ---------------------------------------------
+# Relatório
+# ---------------------------------------------
+def _percentis(valores: list[float]) -> str:
+    if not valores:
+        return "-"
+    p50, p90, p99 = np.percentile(valores, [50, 90, 99])
+    return f"p50={p50 * 1000:8.1f} ms  p90={p90 * 1000:8.1f} ms  p99={p99 * 1000:8.1f} ms"
+
+
+def relatorio(
+    resultados: list[dict],
+    crescimento: int,
+    esperas: dict,
+    duracao: float,
+    n_linhas: int,
+    modo: str,
+):
+    frias = [r["latencias"][0] for r in resultados]
+    quentes = [lat for r in resultados for lat in r["latencias"][1:]]
+    execucoes_quentes = [e for r in resultados for e in r["execucoes"][1:]]
+    cpu_quentes = [c for r in resultados for c in r["cpus"][1:]]
+
+    latencia_total = sum(sum(r["latencias"]) for r in resultados)
+    execucao_total = sum(sum(r["execucoes"]) for r in resultados)
+    n_reruns = sum(len(r["latencias"]) for r in resultados)
+    fila = 1 - execucao_total / latencia_total if latencia_total else 0.0
+
+    print(f"modo={modo}  sessões={len(resultados)}  linhas na base={n_linhas:,}")
+    print(f"duração total:           {duracao:8.2f} s  ({n_reruns / duracao:.2f} reruns/s)")
+    print(f"latência fria (1ª):      {_percentis(frias)}")
+    print(f"latência quente:         {_percentis(quentes)}")
+    print(f"execução quente:         {_percentis(execucoes_quentes)}")
+    print(f"CPU por rerun quente:    {_percentis(cpu_quentes)}")
+    print(f"memória por sessão:      {crescimento / 2**20:8.1f} MiB")
+    if modo != "registro":
+        print(f"fila do harness:         {fila * 100:8.1f} %  (AppTest serializado; não é disputa do painel)")
+    for lock, espera in esperas.items():
+        print(
+            f"espera lock {lock + ':':<13}{espera['espera_s'] * 1000:8.1f} ms  "
+            f"({espera['disputas']} disputa(s), {espera['espera_s'] / latencia_total * 100:.2f} % do tempo das sessões)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=4, help="sessões simultâneas")
+    parser.add_argument("--reruns", type=int, default=3, help="reruns por sessão após a execução inicial")
+    parser.add_argument("--modo", choices=["threads", "processos", "registro"], default="threads")
+    parser.add_argument(
+        "--sintetico",
+        type=int,
+        default=0,
+        metavar="FATOR",
+        help="usa uma base sintética FATOR vezes maior que a real",
+    )
+    args = parser.parse_args()
+
+    os.chdir(RAIZ_REPO)
+    # como no servidor: a base do registro é compartilhada em copy-on-write
+    pd.set_option("mode.copy_on_write", True)
+
+    data_path = DATA_PATH.resolve()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.sintetico > 1:
+            df = gerar_base_sintetica(ler_folha(DATA_PATH), args.sintetico)
+            data_path = Path(tmp) / f"folha-sintetica-x{args.sintetico}.parquet"
+            escrever_folha(df, data_path)
+            n_linhas = len(df)
+            del df
+        else:
+            n_linhas = len(ler_folha(data_path))
+
+        _usar_base(data_path)
+
+        t0 = time.perf_counter()
+        if args.modo == "threads":
+            resultados, crescimento, esperas = rodar_threads(args.sessoes, args.reruns)
+        elif args.modo == "processos":
+            resultados, crescimento, esperas = rodar_processos(args.sessoes, args.reruns, data_path)
+        else:
+            resultados, crescimento, esperas = rodar_registro(args.sessoes, args.reruns, data_path)
+        duracao = time.perf_counter() - t0
+
+    relatorio(resultados, crescimento, esperas, duracao, n_linhas, args.modo)
+
+
+if __name__ == "__main__":
+    main()